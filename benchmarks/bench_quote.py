@@ -0,0 +1,42 @@
+import timeit
+
+from pytex.dex.quote import (
+    DedustStablePool,
+    DedustVolatilePool,
+    StonfiPool,
+    StonfiStablePool,
+)
+
+# per call cost of the local quote engine, best of 5:
+#   python benchmarks/bench_quote.py
+
+A = "0:" + "00" * 32
+B = "0:" + "11" * 32
+RESERVES = (10**13, 12 * 10**12)
+AMOUNT = 10**10
+REPEAT = 5
+NUMBER = 20000
+
+POOLS = [
+    StonfiPool("stonfi", (A, B), RESERVES, lp_fee=20, protocol_fee=10),
+    StonfiStablePool("stonfi stable", (A, B), RESERVES, 10, 5, amp=200),
+    DedustVolatilePool("dedust", (A, B), RESERVES, 25, 10000),
+    DedustStablePool("dedust stable", (A, B), RESERVES, 5, 10000),
+]
+
+
+def best(statement) -> float:
+    return min(timeit.repeat(statement, number=NUMBER, repeat=REPEAT)) / NUMBER
+
+
+def main():
+    print(f"{'pool':<16}{'quote':>12}{'amount_in':>12}")
+    for pool in POOLS:
+        out = pool.quote(0, AMOUNT).out
+        quote = best(lambda: pool.quote(0, AMOUNT))
+        amount_in = best(lambda: pool.amount_in(0, out))
+        print(f"{pool.address:<16}{quote * 1e6:>10.2f}us{amount_in * 1e6:>10.2f}us")
+
+
+if __name__ == "__main__":
+    main()
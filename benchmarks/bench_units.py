@@ -0,0 +1,65 @@
+import timeit
+from decimal import Decimal
+
+from pytex.dex.quote import StonfiPool
+from pytex.units import Amount, Asset, AssetType, Reserve
+
+# per call cost of amounts kept as Decimal against raw int units, best of 5:
+#   python benchmarks/bench_units.py
+
+A = "0:" + "00" * 32
+B = "0:" + "11" * 32
+TON = Asset(AssetType.NATIVE)
+JETTON = Asset(address="EQCxE6mUtQJKFnGfaROTKOt1lZbDiiX1kCixRv7Nw2Id_sDs", decimals=6)
+RAW = (10**13, 12 * 10**10)
+OFFER = 10**10
+GAS = 3 * 10**8
+REPEAT = 5
+NUMBER = 20000
+
+
+def best(statement) -> float:
+    return min(timeit.repeat(statement, number=NUMBER, repeat=REPEAT)) / NUMBER
+
+
+def decimal_reserves() -> int:
+    # reserves as Decimal, scaled to nano and back to int for the quote
+    reserve0 = Decimal(RAW[0]) * 10 ** (9 - TON.decimals)
+    reserve1 = Decimal(RAW[1]) * 10 ** (9 - JETTON.decimals)
+    pool = StonfiPool("pool", (A, B), (int(reserve0), int(reserve1)), 20, 10)
+    return pool.quote(0, OFFER).out
+
+
+def int_reserves() -> int:
+    reserve0 = Reserve(TON, RAW[0]).reserve_nano()
+    reserve1 = Reserve(JETTON, RAW[1]).reserve_nano()
+    pool = StonfiPool("pool", (A, B), (reserve0, reserve1), 20, 10)
+    return pool.quote(0, OFFER).out
+
+
+CASES = [
+    ("reserves -> quote", decimal_reserves, int_reserves),
+    (
+        "offer + gas",
+        lambda: int(Decimal(OFFER) + Decimal(GAS)),
+        lambda: int(OFFER + GAS),
+    ),
+    (
+        "add amounts",
+        lambda: Decimal(OFFER).scaleb(-9) + Decimal(GAS).scaleb(-9),
+        lambda: Amount(OFFER) + Amount(GAS),
+    ),
+]
+
+
+def main():
+    assert decimal_reserves() == int_reserves()
+    print(f"{'case':<20}{'Decimal':>12}{'int':>12}")
+    for name, decimal_path, int_path in CASES:
+        decimal_time = best(decimal_path)
+        int_time = best(int_path)
+        print(f"{name:<20}{decimal_time * 1e6:>10.2f}us{int_time * 1e6:>10.2f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import atexit
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Iterator, MutableMapping
+
+# bump when the encoding of stored values changes, drops every namespace
+CACHE_VERSION = 1
+
+
+class CacheNamespace(MutableMapping[str, Any]):
+    # in-memory view of one namespace, values must be json serializable
+    def __init__(self, cache: "Cache", name: str, data: dict[str, Any]):
+        self.cache = cache
+        self.name = name
+        self._data = data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any):
+        self._data[key] = value
+        self.cache.write(self.name, key, value)
+
+    def __delitem__(self, key: str):
+        del self._data[key]
+        self.cache.delete(self.name, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+
+class Cache:
+    # process memory only, subclasses persist writes and load on warmup
+    def __init__(self):
+        self._namespaces: dict[str, CacheNamespace] = {}
+
+    def namespace(self, name: str, version: int = 1) -> CacheNamespace:
+        # a new version of a namespace starts empty
+        versioned_name = f"{name}@{version}"
+        namespace = self._namespaces.get(versioned_name)
+        if namespace is None:
+            namespace = CacheNamespace(self, versioned_name, self.load(versioned_name))
+            self._namespaces[versioned_name] = namespace
+        return namespace
+
+    def load(self, name: str) -> dict[str, Any]:
+        return {}
+
+    def write(self, name: str, key: str, value: Any):
+        pass
+
+    def delete(self, name: str, key: str):
+        pass
+
+    def warmup(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class SQLiteCache(Cache):
+    def __init__(self, path: str, flush_size: int = 256):
+        super().__init__()
+        self.path = path
+        self.flush_size = flush_size
+        self._pending: dict[tuple[str, str], str | None] = {}
+        self._loaded: dict[str, dict[str, Any]] = {}
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "namespace TEXT, key TEXT, value TEXT, PRIMARY KEY (namespace, key))"
+        )
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'version'"
+        ).fetchone()
+        if row is None or int(row[0]) != CACHE_VERSION:
+            self.connection.execute("DELETE FROM entries")
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('version', ?)",
+                (str(CACHE_VERSION),),
+            )
+        self.connection.commit()
+        atexit.register(self.close)
+
+    def load(self, name: str) -> dict[str, Any]:
+        loaded = self._loaded.pop(name, None)
+        if loaded is not None:
+            return loaded
+        rows = self.connection.execute(
+            "SELECT key, value FROM entries WHERE namespace = ?", (name,)
+        )
+        return {key: json.loads(value) for key, value in rows}
+
+    def warmup(self):
+        # one scan for every namespace, namespaces opened later start from it
+        loaded: dict[str, dict[str, Any]] = {}
+        for name, key, value in self.connection.execute(
+            "SELECT namespace, key, value FROM entries"
+        ):
+            loaded.setdefault(name, {})[key] = json.loads(value)
+        for name, data in loaded.items():
+            if name not in self._namespaces:
+                self._loaded[name] = data
+
+    def write(self, name: str, key: str, value: Any):
+        self._pending[(name, key)] = json.dumps(value)
+        if len(self._pending) >= self.flush_size:
+            self.flush()
+
+    def delete(self, name: str, key: str):
+        self._pending[(name, key)] = None
+        if len(self._pending) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending or self.connection is None:
+            return
+        pending, self._pending = self._pending, {}
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+            [(n, k, v) for (n, k), v in pending.items() if v is not None],
+        )
+        self.connection.executemany(
+            "DELETE FROM entries WHERE namespace = ? AND key = ?",
+            [(n, k) for (n, k), v in pending.items() if v is None],
+        )
+        self.connection.commit()
+
+    def close(self):
+        if self.connection is None:
+            return
+        self.flush()
+        self.connection.close()
+        self.connection = None
+        atexit.unregister(self.close)
+
+
+class CachedState:
+    def __init__(self, value: Any, lt: int, checked_at: float):
+        self.value = value
+        # last_transaction_lt of the account the value was read at
+        self.lt = lt
+        # monotonic time the value was last known to be current
+        self.checked_at = checked_at
+
+    def age(self) -> float:
+        return time.monotonic() - self.checked_at
+
+
+class ReserveCache:
+    # volatile pool state, only valid while the pool has no new transactions
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, CachedState] = OrderedDict()
+        # hits are values served from the cache, fresh or confirmed by a
+        # probe; probes are account state reads, misses full reads
+        self.hits = 0
+        self.probes = 0
+        self.misses = 0
+
+    def get(self, key: str) -> CachedState | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, value: Any, lt: int | None, checked_at: float):
+        if lt is None:
+            self._entries.pop(key, None)
+            return
+        entry = self._entries.get(key)
+        if entry is not None and entry.lt > lt:
+            return  # a newer read finished first
+        self._entries[key] = CachedState(value, lt, checked_at)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str | None = None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+MEMORY_CACHE = Cache()
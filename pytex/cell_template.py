@@ -0,0 +1,106 @@
+import math
+from hashlib import sha256
+
+from tonsdk.boc import Cell as TonSdkCell
+
+from pytex.state_init import cell_bits
+
+
+class Slot:
+    def __init__(self, name: str, bits: int | None = None):
+        # fixed width uint, or coins when bits is None
+        self.name = name
+        self.bits = bits
+        # wide value unlikely to occur in any other cell bits, coins stay
+        # within the 28 digits of Decimal since providers add Decimal gas
+        size = 11 if bits is None else bits // 8
+        digest = int.from_bytes(sha256(name.encode()).digest()[:size], "big")
+        self.sentinel = digest | 1 << (size * 8 - 1)
+        value, length = self.encode(self.sentinel)
+        self.pattern = format(value, f"0{length}b")
+
+    def encode(self, value: int) -> tuple[int, int]:
+        if self.bits is not None:
+            if not 0 <= value < 1 << self.bits:
+                raise ValueError(f"{self.name} does not fit uint{self.bits}: {value}")
+            return value, self.bits
+        # var_uint$_ {n:#} len:(#< 16) value:(uint (len * 8))
+        size = math.ceil(value.bit_length() / 8)
+        if value < 0 or size > 15:
+            raise ValueError(f"{self.name} does not fit coins: {value}")
+        return size << size * 8 | value, 4 + size * 8
+
+    def __repr__(self) -> str:
+        return f"Slot({self.name!r})"
+
+
+OFFER_AMOUNT = Slot("offer_amount")
+MIN_OUT = Slot("min_out")
+QUERY_ID = Slot("query_id", 64)
+# unix time, written as uint32 by dedust and as uint64 by stonfi
+DEADLINE = Slot("deadline", 32)
+
+
+class CellTemplate:
+    def __init__(
+        self,
+        segments: list[tuple[int, int] | Slot],
+        refs: list["CellTemplate | TonSdkCell"],
+    ):
+        # cell bits as fixed segments and slots, refs without slots are shared
+        self.segments = segments
+        self.refs = refs
+
+    def fill(self, values: dict[Slot, int]) -> TonSdkCell:
+        value = length = 0
+        for segment in self.segments:
+            if isinstance(segment, Slot):
+                segment_value, segment_length = segment.encode(values[segment])
+            else:
+                segment_value, segment_length = segment
+            value = value << segment_length | segment_value
+            length += segment_length
+
+        cell = TonSdkCell()
+        if length > cell.bits.length:
+            raise ValueError(f"cell overflow: {length} bits")
+        size = math.ceil(length / 8)
+        cell.bits.array[:size] = (value << (size * 8 - length)).to_bytes(size, "big")
+        cell.bits.cursor = length
+        cell.refs = [
+            ref.fill(values) if isinstance(ref, CellTemplate) else ref
+            for ref in self.refs
+        ]
+        return cell
+
+    @classmethod
+    def learn(cls, cell: TonSdkCell, slots: list[Slot]) -> "CellTemplate | TonSdkCell":
+        # cell built with slot sentinels as values, cells that hold none of
+        # them in their tree are returned as they are
+        refs = [cls.learn(ref, slots) for ref in cell.refs]
+        value, length = cell_bits(cell)
+        bits = format(value, f"0{length}b") if length else ""
+
+        found: list[tuple[int, Slot]] = []
+        for slot in slots:
+            position = bits.find(slot.pattern)
+            while position >= 0:
+                found.append((position, slot))
+                position = bits.find(slot.pattern, position + len(slot.pattern))
+        if not found and not any(isinstance(ref, CellTemplate) for ref in refs):
+            return cell
+
+        segments: list[tuple[int, int] | Slot] = []
+        position = 0
+        for slot_position, slot in sorted(found, key=lambda item: item[0]):
+            if slot_position < position:
+                raise ValueError(f"overlapping slots at bit {slot_position}")
+            if slot_position > position:
+                segments.append(
+                    (int(bits[position:slot_position], 2), slot_position - position)
+                )
+            segments.append(slot)
+            position = slot_position + len(slot.pattern)
+        if position < length:
+            segments.append((int(bits[position:], 2), length - position))
+        return cls(segments, refs)
@@ -0,0 +1,290 @@
+import math
+from typing import Any, NamedTuple
+
+from tonsdk.utils import Address as TonSdkAddress
+
+from pytex.dex.quote import Pool, asset_key
+from pytex.dex.routing import Hop, PoolGraph, Route, pool_key
+from pytex.dex.split import Leg, constant_product
+from pytex.units import Asset
+
+# ternary search steps for cycles without a closed form size
+SIZE_ITERATIONS = 200
+
+# (pool key, offer index) per hop, starting and ending at the base asset
+Cycle = tuple[tuple[str, int], ...]
+
+
+class Opportunity(NamedTuple):
+    route: Route
+    operator: Any
+
+    @property
+    def profit(self) -> int:
+        return self.route.amount_out - self.route.amount_in
+
+
+class ArbitrageDetector:
+    # cycles through base_asset of at most max_length pools of one venue,
+    # indexed by pool so a reserve update only rescores the cycles through
+    # the changed pools; a venue is the operator the graph tracks the pool
+    # with, as a multi swap message stays within one dex, and venues
+    # without multi swaps (stonfi v1) are left out
+    def __init__(
+        self,
+        graph: PoolGraph,
+        base_asset: Asset | TonSdkAddress | str,
+        max_length: int = 3,
+        min_profit: int = 0,
+    ):
+        self.graph = graph
+        self.base = asset_key(base_asset)
+        self.max_length = max_length
+        self.min_profit = min_profit
+        self.cycles: set[Cycle] = set()
+        # pool key -> cycles through the pool
+        self.by_pool: dict[str, set[Cycle]] = {}
+        # pools whose cycles were enumerated
+        self.indexed: set[str] = set()
+        # log of the marginal price at zero input per (pool key, offer index)
+        self.weights: dict[tuple[str, int], float] = {}
+
+    def venue(self, key: str) -> Any:
+        return self.graph.venue(key)
+
+    def update(self, pool_addresses: list[str]) -> list[Opportunity]:
+        # pool_addresses changed in the graph, as returned by its refresh
+        # or track; pools added to or removed from the graph behind the
+        # detector's back are picked up too. returns the profitable cycles
+        # through them, best first
+        keys = {pool_key(pool_address) for pool_address in pool_addresses}
+        keys |= self.graph.pools.keys() ^ self.indexed
+        touched: set[Cycle] = set()
+        for key in keys:
+            self.weights.pop((key, 0), None)
+            self.weights.pop((key, 1), None)
+            if key not in self.graph.pools:
+                self._unindex(key)
+                continue
+            if key not in self.indexed:
+                self._index(key)
+            touched |= self.by_pool.get(key, set())
+
+        opportunities = []
+        for cycle in touched:
+            if self.score(cycle) <= 0:
+                continue
+            route = self.size(cycle)
+            if route is not None and route.amount_out - route.amount_in > max(
+                self.min_profit, 0
+            ):
+                opportunities.append(Opportunity(route, self.venue(cycle[0][0])))
+        opportunities.sort(key=lambda opportunity: -opportunity.profit)
+        return opportunities
+
+    def rebuild(self) -> list[Opportunity]:
+        self.cycles.clear()
+        self.by_pool.clear()
+        self.indexed.clear()
+        self.weights.clear()
+        return self.update(list(self.graph.pools))
+
+    async def refresh(self, max_staleness: float | None = None) -> list[Opportunity]:
+        return self.update(await self.graph.refresh(max_staleness=max_staleness))
+
+    async def track(
+        self,
+        operator: Any,
+        pool_addresses: list[str],
+        max_staleness: float | None = None,
+    ) -> list[Opportunity]:
+        return self.update(
+            await self.graph.track(
+                operator, pool_addresses, max_staleness=max_staleness
+            )
+        )
+
+    def score(self, cycle: Cycle) -> float:
+        # log of the product of the marginal prices, positive when a small
+        # amount around the cycle comes back larger
+        total = 0.0
+        for edge in cycle:
+            weight = self.weights.get(edge)
+            if weight is None:
+                key, offer_index = edge
+                pool = self.graph.pools[key]
+                marginal = Leg(pool, offer_index, pool.reserves[offer_index]).marginal(
+                    0.0
+                )
+                weight = math.log(marginal) if marginal > 0 else -math.inf
+                self.weights[edge] = weight
+            total += weight
+        return total
+
+    def size(self, cycle: Cycle) -> Route | None:
+        pools = [(self.graph.pools[key], offer_index) for key, offer_index in cycle]
+        amount = self._closed_form(pools)
+        if amount is None:
+            amount = self._search(pools)
+        if amount <= 0:
+            return None
+        return self.simulate(pools, amount)
+
+    @staticmethod
+    def simulate(pools: list[tuple[Pool, int]], amount: int) -> Route:
+        hops = []
+        for pool, offer_index in pools:
+            out = pool.quote(offer_index, amount).out
+            hops.append(Hop(pool, offer_index, amount, out))
+            amount = out
+        return Route(hops)
+
+    @staticmethod
+    def _closed_form(pools: list[tuple[Pool, int]]) -> int | None:
+        # a constant product hop is a * x / (b + c * x), and so is a chain
+        # of them; the profit peaks where its derivative a * b / (b + c * x)^2
+        # reaches one
+        a, b, c = 1.0, 1.0, 0.0
+        for pool, offer_index in pools:
+            curve = constant_product(pool, offer_index)
+            if curve is None:
+                return None
+            reserve_in, reserve_out, gamma = curve
+            a, b, c = (
+                a * gamma * reserve_out,
+                b * reserve_in,
+                c * reserve_in + a * gamma,
+            )
+        if a <= b or c <= 0:
+            return 0
+        return int((math.sqrt(a * b) - b) / c)
+
+    def _search(self, pools: list[tuple[Pool, int]]) -> int:
+        # profit is concave in the amount, ternary search on exact quotes
+        def profit(amount: int) -> int:
+            return self.simulate(pools, amount).amount_out - amount
+
+        # flat around the peak, a millionth of the amount is close enough
+        low, high = 0, pools[0][0].reserves[pools[0][1]]
+        for _ in range(SIZE_ITERATIONS):
+            if high - low <= max(2, high >> 20):
+                break
+            third = (high - low) // 3
+            if profit(low + third) < profit(high - third):
+                low += third
+            else:
+                high -= third
+        return max((low, (low + high) // 2, high), key=profit)
+
+    def _index(self, key: str):
+        pool = self.graph.pools[key]
+        venue = self.venue(key)
+        if venue is not None and not venue.MULTI_SWAP:
+            self.indexed.add(key)
+            return
+        found: list[Cycle] = []
+        for offer_index in (0, 1):
+            start = pool.assets[offer_index]
+            end = pool.assets[1 - offer_index]
+            edge = ((key, offer_index),)
+            # base -> start, the pool, end -> base
+            for head_length in range(self.max_length):
+                if (head_length == 0) != (start == self.base):
+                    continue
+                heads = self._paths(self.base, start, head_length, venue, {key})
+                for head in heads:
+                    used = {edge_key for edge_key, _ in head} | {key}
+                    assets = {self.base} | {
+                        self.graph.pools[edge_key].assets[1 - index]
+                        for edge_key, index in head
+                    }
+                    if end != self.base and end in assets:
+                        continue
+                    for tail_length in range(self.max_length - head_length):
+                        if (tail_length == 0) != (end == self.base):
+                            continue
+                        for tail in self._paths(
+                            end, self.base, tail_length, venue, used, assets
+                        ):
+                            found.append(head + edge + tail)
+        for cycle in found:
+            if cycle in self.cycles:
+                continue
+            self.cycles.add(cycle)
+            for edge_key, _ in cycle:
+                self.by_pool.setdefault(edge_key, set()).add(cycle)
+        self.indexed.add(key)
+
+    def _paths(
+        self,
+        start: str,
+        end: str,
+        length: int,
+        venue: Any,
+        used: set[str],
+        assets: set[str] | None = None,
+    ) -> list[Cycle]:
+        # simple paths of exactly length pools of venue, avoiding used pools
+        # and revisiting none of assets; walked from the end with fewer
+        # pools, hubs like the base asset are only looked up, not expanded
+        if length == 0:
+            return [()] if start == end else []
+        seen = (set() if assets is None else assets) | {start, end}
+        adjacency = self.graph.adjacency
+        if len(adjacency.get(start, ())) <= len(adjacency.get(end, ())):
+            return self._walk(start, end, length, venue, used, seen)
+        return [
+            tuple((key, 1 - offer_index) for key, offer_index in reversed(path))
+            for path in self._walk(end, start, length, venue, used, seen)
+        ]
+
+    def _walk(
+        self,
+        start: str,
+        end: str,
+        length: int,
+        venue: Any,
+        used: set[str],
+        seen: set[str],
+    ) -> list[Cycle]:
+        adjacency = self.graph.adjacency
+        sources = self.graph.sources
+        if length == 1:
+            # pools of the pair, from the side with fewer pools
+            edges = adjacency.get(start, {})
+            if len(edges) > len(adjacency.get(end, ())):
+                edges = adjacency[end]
+            paths = []
+            for key, pool in edges.items():
+                if pool.assets[0] == start and pool.assets[1] == end:
+                    offer_index = 0
+                elif pool.assets[1] == start and pool.assets[0] == end:
+                    offer_index = 1
+                else:
+                    continue
+                if key not in used and sources.get(key, (None,))[0] is venue:
+                    paths.append(((key, offer_index),))
+            return paths
+        paths = []
+        for key, pool in adjacency.get(start, {}).items():
+            if key in used or sources.get(key, (None,))[0] is not venue:
+                continue
+            offer_index = 0 if pool.assets[0] == start else 1
+            other = pool.assets[1 - offer_index]
+            if other in seen:
+                continue
+            for rest in self._walk(
+                other, end, length - 1, venue, used | {key}, seen | {other}
+            ):
+                paths.append(((key, offer_index),) + rest)
+        return paths
+
+    def _unindex(self, key: str):
+        self.indexed.discard(key)
+        for cycle in self.by_pool.pop(key, set()):
+            self.cycles.discard(cycle)
+            for edge_key, _ in cycle:
+                if edge_key != key:
+                    cycles = self.by_pool.get(edge_key)
+                    if cycles is not None:
+                        cycles.discard(cycle)
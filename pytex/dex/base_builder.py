@@ -1,13 +1,34 @@
+import functools
+from typing import Callable, Sequence
+
 from tonsdk.utils import Address as TonSdkAddress
 from tonsdk.boc import Cell as TonSdkCell
 
+from pytex.state_init import parse_address
+
+
+def asynchronous(build: Callable) -> Callable:
+    # async variant of a synchronous builder, kept for existing callers
+    @functools.wraps(build)
+    async def wrapper(*args, **kwargs):
+        return build(*args, **kwargs)
+
+    return wrapper
+
+
+def address(value: str | TonSdkAddress | None) -> TonSdkAddress | None:
+    # builders only read addresses, so parsed ones are shared
+    if value is None or isinstance(value, TonSdkAddress):
+        return value
+    return parse_address(value)
+
 
 class Builder:
     def __init__(self):
         pass
 
     @staticmethod
-    async def build_jetton_transfer_body(
+    def build_jetton_transfer_body_sync(
         destination_address: str,
         amount: int,
         query_id: int = 0,
@@ -20,9 +41,9 @@ class Builder:
         jetton_transfer_body.bits.write_uint(0xF8A7EA5, 32)  # request_transfer op
         jetton_transfer_body.bits.write_uint(query_id, 64)  # query_id
         jetton_transfer_body.bits.write_coins(amount)  # Swap amount
-        jetton_transfer_body.bits.write_address(TonSdkAddress(destination_address))
+        jetton_transfer_body.bits.write_address(address(destination_address))
         jetton_transfer_body.bits.write_address(
-            TonSdkAddress(response_address or destination_address)
+            address(response_address or destination_address)
         )
 
         if custom_payload is None:
@@ -39,3 +60,32 @@ class Builder:
             jetton_transfer_body.bits.write_bit(1)
             jetton_transfer_body.refs.append(forward_payload)
         return jetton_transfer_body
+
+    build_jetton_transfer_body = staticmethod(
+        asynchronous(build_jetton_transfer_body_sync)
+    )
+
+    @classmethod
+    def build_jetton_transfer_bodies_sync(
+        cls,
+        destination_address: str,
+        amounts: Sequence[int],
+        query_ids: Sequence[int],
+        response_addresses: Sequence[str],
+        forward_payloads: Sequence[TonSdkCell | None],
+        forward_amount: int = 0,
+    ) -> list[TonSdkCell]:
+        destination = address(destination_address)
+        return [
+            cls.build_jetton_transfer_body_sync(
+                destination_address=destination,
+                amount=amount,
+                query_id=query_id,
+                response_address=response_address,
+                forward_amount=forward_amount,
+                forward_payload=forward_payload,
+            )
+            for amount, query_id, response_address, forward_payload in zip(
+                amounts, query_ids, response_addresses, forward_payloads, strict=True
+            )
+        ]
@@ -1,104 +1,308 @@
 import asyncio
 import base64
+import json
+import time
 from decimal import Decimal
+from typing import Any, Awaitable, Callable
 
 import aiohttp
-from tonsdk.provider import ToncenterClient, prepare_address
+from tonsdk.provider import prepare_address
 from tonsdk.boc import Cell as TonSdkCell
 from tonsdk.utils import Address as TonSdkAddress, bytes_to_b64str
 
+from pytex.cache import Cache, MEMORY_CACHE, ReserveCache
 from pytex.exceptions import OperatorError
-from pytex.units import Asset, AssetType
+from pytex.jetton import JettonWalletRegistry
+from pytex.stack import (
+    GET_JETTON_DATA,
+    GET_WALLET_ADDRESS,
+    GET_WALLET_DATA,
+    SEQNO,
+    StackSchema,
+)
+from pytex.state_init import parse_address
+from pytex.transport.batch import BatchTransport
+from pytex.transport.endpoints import Endpoint, EndpointPool, TONCENTER_URL
+from pytex.transport.limiter import Priority
+from pytex.transport.retry import RetryPolicy, DEFAULT_RETRY_POLICY
+from pytex.transport.single_flight import SingleFlight
 
 
 class Operator:
-    def __init__(self, toncenter_api_key: str):
-        self.client = ToncenterClient(
-            base_url="https://toncenter.com/api/v2/",
-            api_key=toncenter_api_key,
+    DEFAULT_POOL_SIZE = 100
+    DEFAULT_KEEPALIVE_TIMEOUT = 30.0
+    DEFAULT_DNS_CACHE_TTL = 300
+    # hard cap for a single HTTP request, per-call budgets come from RetryPolicy
+    DEFAULT_TIMEOUT = 60.0
+    DEFAULT_BATCH_WINDOW = 0.005
+    DEFAULT_BATCH_SIZE = 50
+    # side effects are never delayed, batched or coalesced
+    WRITE_METHODS = frozenset({"sendBoc"})
+    # the dex provider chains swaps through several pools in one message
+    MULTI_SWAP = False
+
+    def __init__(
+        self,
+        toncenter_api_key: str,
+        session: aiohttp.ClientSession | None = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: int = DEFAULT_DNS_CACHE_TTL,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        coalesce: bool = True,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        rps: float | None = None,
+        priority: Priority = Priority.NORMAL,
+        endpoints: list[str | Endpoint] | None = None,
+        hedge: bool = False,
+        failure_threshold: int = 5,
+        cooldown: float = 10.0,
+        cache: Cache = MEMORY_CACHE,
+    ):
+        # rps limits the endpoints given as urls, toncenter defaults to the
+        # quota of the key and other urls to none
+        self.endpoints = EndpointPool(
+            [
+                (
+                    endpoint
+                    if isinstance(endpoint, Endpoint)
+                    else (
+                        Endpoint.toncenter(toncenter_api_key, rps)
+                        if endpoint == TONCENTER_URL
+                        else Endpoint(endpoint, toncenter_api_key, rps)
+                    )
+                )
+                for endpoint in endpoints or [TONCENTER_URL]
+            ],
+            failure_threshold=failure_threshold,
+            cooldown=cooldown,
+            hedge=hedge,
+        )
+        self.client = self.endpoints.endpoints[0].client
+        # external session is shared between operators and closed by its owner
+        self.session = session
+        self._own_session = session is None
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.priority = priority
+        # batch_size < 2 sends every call as its own request
+        self.batch = (
+            BatchTransport(
+                self.endpoints,
+                self.get_session,
+                window=batch_window,
+                max_size=batch_size,
+            )
+            if batch_size > 1
+            else None
         )
+        # identical reads in flight at the same time share one request
+        self.single_flight = SingleFlight() if coalesce else None
+        self.retry_policy = retry_policy
+        # derivations from chain data never change, operators on the same
+        # cache share them and a persistent cache keeps them across restarts
+        self.cache = cache
+        self.jetton_wallets = JettonWalletRegistry(cache)
+        self.reserve_cache = ReserveCache()
 
-    async def run(self, to_run: dict, *, single_query=True):
+    @classmethod
+    def create_session(
+        cls,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: int = DEFAULT_DNS_CACHE_TTL,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=pool_size,
+            keepalive_timeout=keepalive_timeout,
+            ttl_dns_cache=dns_cache_ttl,
+            use_dns_cache=True,
+        )
+        return aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or (self._own_session and self.session.closed):
+            self.session = self.create_session(
+                pool_size=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                dns_cache_ttl=self.dns_cache_ttl,
+            )
+            self._own_session = True
+        return self.session
+
+    async def close(self):
+        self.cache.flush()
+        if self._own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        await self.get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def run(
+        self,
+        to_run: dict | list[dict],
+        *,
+        single_query=True,
+        retry_policy: RetryPolicy | None = None,
+        priority: Priority | None = None,
+    ):
+        policy = retry_policy or self.retry_policy
+        priority = self.priority if priority is None else priority
         try:
-            return await self._execute(to_run, single_query)
-        except BaseException as exception:
+            async with asyncio.timeout(policy.attempt_timeout):
+                return await self._execute(to_run, single_query, priority)
+        except Exception as exception:
             raise OperatorError(
                 "failed run task | %s: %s" % (exception.__class__.__name__, exception),
-            )
+            ) from exception
 
-    async def run_ex(self, to_run: dict, *, single_query=True):
+    async def run_ex(
+        self,
+        to_run: dict | list[dict],
+        *,
+        single_query=True,
+        retry_policy: RetryPolicy | None = None,
+        priority: Priority | None = None,
+    ):
+        policy = retry_policy or self.retry_policy
+        priority = self.priority if priority is None else priority
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.deadline
         attempt = 1
         while True:
             try:
-                return await self._execute(to_run, single_query)
-            except BaseException as e:
+                timeout = min(policy.attempt_timeout, deadline - loop.time())
+                async with asyncio.timeout(max(timeout, 0)):
+                    return await self._execute(to_run, single_query, priority)
+            except Exception as e:
                 exception = e
-                pass
-            if attempt >= 10:
+
+            delay = policy.next_delay(attempt, exception, deadline - loop.time())
+            if delay is None:
                 raise OperatorError(
-                    "failed run task | %s: %s"
-                    % (exception.__class__.__name__, exception),
-                )
+                    "failed run task | attempts: %s | %s: %s"
+                    % (attempt, exception.__class__.__name__, exception),
+                ) from exception
             attempt += 1
-            await asyncio.sleep(3)
+            await asyncio.sleep(delay)
 
-    @staticmethod
-    async def _execute(to_run: dict, single_query):
-        timeout = aiohttp.ClientTimeout(total=5)
+    async def _execute(
+        self,
+        to_run: dict | list[dict],
+        single_query,
+        priority: Priority = Priority.NORMAL,
+    ):
+        if single_query:
+            to_run = [to_run]
 
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            if single_query:
-                to_run = [to_run]
+        calls = [task.get("rpc") for task in to_run]
+        if len(calls) == 1 and self._is_read(calls[0]):
+            if self.single_flight is None:
+                return [await self._call(*calls[0], priority)]
+            key = json.dumps(calls[0], sort_keys=True)
+            return [await self.single_flight.do(key, self._call, *calls[0], priority)]
 
-            tasks = []
-            for task in to_run:
-                tasks.append(task["func"](session, *task["args"], **task["kwargs"]))
+        if self.batch is not None and all(self._is_read(call) for call in calls):
+            results = await self.batch.call_many(calls, priority)
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            return results
 
-            return await asyncio.gather(*tasks)
+        tasks = []
+        for task in to_run:
+            tasks.append(self._run_task(task, priority))
 
-    @staticmethod
-    def _read_address(cell: TonSdkCell) -> TonSdkAddress | None:
-        data = "".join([str(cell.bits.get(x)) for x in range(cell.bits.length)])
-        if len(data) < 267:
-            return None
-        wc = int(data[3:11], 2)
-        hashpart = int(data[11 : 11 + 256], 2).to_bytes(32, "big").hex()
-        return TonSdkAddress(f"{wc if wc != 255 else -1}:{hashpart}")
+        return await asyncio.gather(*tasks)
 
-    @staticmethod
-    def _read_asset(cell: TonSdkCell) -> Asset:
-        data = "".join([str(cell.bits.get(x)) for x in range(cell.bits.length)])
-        _type = int(int(data[:4], 2).to_bytes(1, "big").hex())
-        if _type == 0:
-            return Asset(_type=AssetType.NATIVE)
-        elif _type == 1:
-            preaddr = int(int(data[4:12], 2).to_bytes(1, "big").hex())
-            address = int(data[12 : 12 + 256], 2).to_bytes(32, "big").hex()
-            return Asset(_type=AssetType.JETTON, address=f"{str(preaddr)}:{address}")
-        else:
-            raise Exception("Failed to read asset")
+    async def _run_task(self, task: dict, priority: Priority):
+        session = await self.get_session()
+        if "rpc" in task:
+            method, params = task["rpc"]
+            return await self.endpoints.request(
+                lambda client: client.rpc_request(session, method, params), priority
+            )
+        # foreign task bound to its own client: no failover possible
+        limiter = self.endpoints.endpoints[0].limiter
+        if limiter is not None:
+            await limiter.acquire(priority)
+        return await task["func"](session, *task["args"], **task["kwargs"])
+
+    def _is_read(self, call: tuple[str, dict] | None) -> bool:
+        return call is not None and call[0] not in self.WRITE_METHODS
+
+    async def _call(self, method: str, params: dict, priority: Priority):
+        if self.batch is not None:
+            return await self.batch.call(method, params, priority)
+        session = await self.get_session()
+        return await self.endpoints.request(
+            lambda client: client.rpc_request(session, method, params),
+            priority,
+            hedge=True,
+        )
+
+    async def run_get_method(
+        self,
+        schema: StackSchema,
+        address: str,
+        stack_data: list | None = None,
+        **kwargs: Any,
+    ) -> tuple:
+        raw_data = await self.run_ex(
+            to_run=schema.task(self.client, address, stack_data), **kwargs
+        )
+        return schema.decode(raw_data[0] if raw_data else None)
 
     async def get_jetton_wallet_address(
         self, jetton_master_address: str, wallet_address: str
+    ) -> str:
+        jetton_wallet_address = self.jetton_wallets.derive(
+            jetton_master_address, wallet_address
+        )
+        if jetton_wallet_address is not None:
+            return jetton_wallet_address
+
+        jetton_wallet_address = await self.fetch_jetton_wallet_address(
+            jetton_master_address=jetton_master_address, wallet_address=wallet_address
+        )
+        if self.jetton_wallets.should_learn(jetton_master_address):
+            try:
+                code = await self.get_jetton_wallet_code(jetton_master_address)
+            except OperatorError:
+                code = None
+            if self.jetton_wallets.learn(
+                jetton_master_address, wallet_address, code, jetton_wallet_address
+            ):
+                return jetton_wallet_address
+        self.jetton_wallets.addresses[
+            self.jetton_wallets.address_key(jetton_master_address, wallet_address)
+        ] = jetton_wallet_address
+        return jetton_wallet_address
+
+    async def get_jetton_wallet_code(self, jetton_master_address: str) -> TonSdkCell:
+        jetton_data = await self.run_get_method(GET_JETTON_DATA, jetton_master_address)
+        return jetton_data.wallet_code
+
+    async def fetch_jetton_wallet_address(
+        self, jetton_master_address: str, wallet_address: str
     ) -> str:
         cell = TonSdkCell()
         cell.bits.write_address(TonSdkAddress(wallet_address))
         request_stack = [["tvm.Slice", bytes_to_b64str(cell.to_boc(False))]]
-        raw_get_wallet_address = self.client.raw_run_method(
-            method="get_wallet_address",
-            address=jetton_master_address,
-            stack_data=request_stack,
+        wallet_address_data = await self.run_get_method(
+            GET_WALLET_ADDRESS, jetton_master_address, stack_data=request_stack
         )
-        raw_data = await self.run_ex(to_run=raw_get_wallet_address)
-        try:
-            b64_bytes_str = raw_data[0].get("stack")[0][1].get("bytes")
-            jetton_wallet_address: TonSdkAddress = self._read_address(
-                TonSdkCell.one_from_boc(base64.b64decode(b64_bytes_str))
-            )
-        except BaseException:
-            raise OperatorError(f"parse address | raw_data: {raw_data}")
-
-        return jetton_wallet_address.to_string(True, True, True)
+        return wallet_address_data.wallet_address
 
     async def get_status(self, wallet_address: str) -> str | None:
         account_state_task = self.client.raw_get_account_state(
@@ -109,17 +313,67 @@ class Operator:
             return str(result[0].get("state"))
         return None
 
-    async def get_seqno(self, wallet_address: str) -> int | None:
-        cur_adr_seq_no_task = self.client.raw_run_method(
-            method="seqno", address=wallet_address, stack_data=[]
+    async def get_code_and_data(
+        self, address: str
+    ) -> tuple[TonSdkCell, TonSdkCell] | None:
+        account_state_task = self.client.raw_get_account_state(
+            prepared_address=prepare_address(address)
         )
-        cur_adr_seq_result = await self.run_ex(to_run=cur_adr_seq_no_task)
+        result = await self.run_ex(to_run=account_state_task)
+        if not result[0].get("code") or not result[0].get("data"):
+            return None
         try:
-            cur_seq_no = int(cur_adr_seq_result[0].get("stack")[0][1], 16)
-        except BaseException:
-            raise OperatorError(f"parse seqno | raw_data: {cur_adr_seq_result}")
+            code = TonSdkCell.one_from_boc(base64.b64decode(result[0]["code"]))
+            data = TonSdkCell.one_from_boc(base64.b64decode(result[0]["data"]))
+        except Exception as e:
+            raise OperatorError(f"parse code and data | raw_data: {result} -> {e}")
+        return code, data
 
-        return cur_seq_no
+    async def get_last_transaction_lt(self, address: str) -> int | None:
+        account_state_task = self.client.raw_get_account_state(
+            prepared_address=prepare_address(address)
+        )
+        result = await self.run_ex(to_run=account_state_task)
+        return self._last_transaction_lt(result)
+
+    @staticmethod
+    def _last_transaction_lt(raw_data: list[dict]) -> int | None:
+        try:
+            return int(raw_data[0]["last_transaction_id"]["lt"])
+        except (KeyError, TypeError, ValueError, IndexError):
+            return None
+
+    async def read_pool_state(
+        self,
+        pool_address: str,
+        fetch: Callable[[], Awaitable[tuple[Any, int | None]]],
+        max_staleness: float | None = None,
+    ) -> Any:
+        # max_staleness None reads through, otherwise a value younger than
+        # max_staleness is returned as is and an older one costs an account
+        # state probe, a full read only when the pool had new transactions
+        key = parse_address(pool_address).to_string(False)
+        entry = self.reserve_cache.get(key) if max_staleness is not None else None
+        if entry is not None:
+            if entry.age() <= max_staleness:
+                self.reserve_cache.hits += 1
+                return entry.value
+            checked_at = time.monotonic()
+            self.reserve_cache.probes += 1
+            if await self.get_last_transaction_lt(pool_address) == entry.lt:
+                entry.checked_at = checked_at
+                self.reserve_cache.hits += 1
+                return entry.value
+
+        self.reserve_cache.misses += 1
+        checked_at = time.monotonic()
+        value, lt = await fetch()
+        self.reserve_cache.set(key, value, lt, checked_at)
+        return value
+
+    async def get_seqno(self, wallet_address: str) -> int | None:
+        seqno_data = await self.run_get_method(SEQNO, wallet_address)
+        return seqno_data.seqno
 
     async def get_native_balance(self, wallet_address: str) -> Decimal | None:
         raw_get_account_state_task = self.client.raw_get_account_state(
@@ -142,15 +396,5 @@ class Operator:
             jetton_master_address=jetton_master_address,
             wallet_address=wallet_address,
         )
-        raw_get_wallet_data = self.client.raw_run_method(
-            method="get_wallet_data", address=jetton_wallet_address, stack_data=[]
-        )
-
-        raw_data = await self.run_ex(to_run=raw_get_wallet_data)
-        try:
-            hex_balance = raw_data[0].get("stack")[0][1]
-        except BaseException:
-            raise OperatorError(f"parse balance | raw_data: {raw_data}")
-
-        balance = Decimal(str(int(hex_balance, 0)))
-        return balance
+        wallet_data = await self.run_get_method(GET_WALLET_DATA, jetton_wallet_address)
+        return Decimal(wallet_data.balance)
@@ -1,6 +1,8 @@
+import asyncio
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 from tonsdk.crypto import mnemonic_to_wallet_key
 from tonsdk.boc import Cell as TonSdkCell
@@ -8,7 +10,13 @@ from tonsdk.boc import Cell as TonSdkCell
 
 from .base_builder import Builder
 from .base_operator import Operator
-from pytex.wallet import WalletContractMulti
+from .quote import asset_key
+from .route import CompiledRoute
+from pytex.cell_template import DEADLINE, MIN_OUT, OFFER_AMOUNT, QUERY_ID
+from pytex.seqno import SeqnoManager
+from pytex.transport.limiter import Priority
+from pytex.units import Asset, TON_ZERO_ADDRESS
+from pytex.wallet import HighloadWalletV3, WalletContractMulti
 
 
 class BaseProvider(ABC):
@@ -29,40 +37,143 @@ class BaseProvider(ABC):
 
 
 class Provider(BaseProvider):
-    TRANSFER_NATIVE_GAS = Decimal("5000000")  # Ton
-    TRANSFER_JETTON_GAS = Decimal("60000000")  # Ton
+    TRANSFER_NATIVE_GAS = 5_000_000  # Ton
+    TRANSFER_JETTON_GAS = 60_000_000  # Ton
+    BPS_DIVIDER = 10000
+    # jetton wrappers the dex pools hold in place of ton
+    WRAPPED_TON: tuple[str, ...] = ()
 
-    def __init__(self, mnemonic: list[str], toncenter_api_key: str):
+    def __init__(self, mnemonic: list[str], toncenter_api_key: str, **kwargs: Any):
         super().__init__()
         self.mnemonic = mnemonic
         pub_k, priv_k = mnemonic_to_wallet_key(self.mnemonic)
-        self.wallet_multi = WalletContractMulti(
+        self.wallet_multi: WalletContractMulti | HighloadWalletV3 = WalletContractMulti(
             public_key=pub_k, private_key=priv_k, wc=0
         )
         self.wallet_address = self.wallet_multi.address.to_string(True, True, True)
-        self.operator = Operator(toncenter_api_key)
+        self.operator = Operator(toncenter_api_key, **kwargs)
+        # bound late, providers replace the operator after this
+        self.seqno = SeqnoManager(
+            lambda: self.operator.get_seqno(wallet_address=self.wallet_address)
+        )
+
+    async def close(self):
+        await self.operator.close()
+
+    async def __aenter__(self):
+        await self.operator.get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def use_highload_wallet(
+        self,
+        subwallet_id: int = HighloadWalletV3.DEFAULT_SUBWALLET_ID,
+        timeout: int = HighloadWalletV3.DEFAULT_TIMEOUT,
+    ):
+        # sends from the highload v3 wallet of the same keys: up to
+        # MAX_MESSAGES messages per transfer and no seqno, concurrent
+        # transfers go out at once; activate deploys it
+        pub_k, priv_k = mnemonic_to_wallet_key(self.mnemonic)
+        self.wallet_multi = HighloadWalletV3(
+            public_key=pub_k,
+            private_key=priv_k,
+            wc=0,
+            subwallet_id=subwallet_id,
+            timeout=timeout,
+        )
+        self.wallet_address = self.wallet_multi.address.to_string(True, True, True)
+        self.seqno.reset()
 
     async def transfer(
         self, msgs: list[dict], send_mode: int = WalletContractMulti.DEFAULT_SEND_MODE
     ) -> str:
-        cur_seqno = await self.operator.get_seqno(wallet_address=self.wallet_address)
-
-        query = self.wallet_multi.create_transfer_messages(
-            messages=msgs, seqno=cur_seqno, send_mode=send_mode
-        )
+        async def submit(seqno: int) -> str:
+            return await self.send_external(
+                self.wallet_multi.create_transfer_messages(
+                    messages=msgs, seqno=seqno, send_mode=send_mode
+                )
+            )
+
+        if isinstance(self.wallet_multi, HighloadWalletV3):
+            # replay protection is by query id, nothing to serialize on
+            return await self.send_external(
+                self.wallet_multi.create_transfer_messages(
+                    messages=msgs, send_mode=send_mode
+                )
+            )
+        return await self.seqno.send(submit)
+
+    async def send_external(self, query: dict) -> str:
         task = self.operator.client.raw_send_message(query["message"].to_boc(False))
-        await self.operator.run(to_run=task)
+        await self.operator.run(to_run=task, priority=Priority.HIGH)
         return query["message"].bytes_hash().hex()
 
     async def activate(self):
         query = self.wallet_multi.create_init_external_message()
         task = self.operator.client.raw_send_message(query["message"].to_boc(False))
         await self.operator.run_ex(to_run=task)
+        self.seqno.reset()
+
+    async def compile_route(
+        self, create: Callable[..., Awaitable[dict]], **kwargs: Any
+    ) -> CompiledRoute:
+        # create is one of the create_*_transfer_message methods, addresses
+        # are resolved here once and emit only patches the swap values
+        message = await create(
+            offer_amount=OFFER_AMOUNT.sentinel,
+            min_ask_amount=MIN_OUT.sentinel,
+            query_id=QUERY_ID.sentinel,
+            deadline=datetime.fromtimestamp(DEADLINE.sentinel, timezone.utc),
+            **kwargs,
+        )
+        return CompiledRoute.learn(message)
+
+    async def slippage_limits(
+        self,
+        pool_addresses: list[str],
+        offer_asset: Asset,
+        offer_amount: int,
+        max_slippage_bps: int,
+        max_staleness: float | None = None,
+        **kwargs: Any,
+    ) -> list[int]:
+        # per hop min ask amounts from local quotes on cached pool state, no
+        # quote round trip; every hop may fall max_slippage_bps short of its
+        # quote for offer_amount, so a sandwich is capped at any hop
+        if not 0 <= max_slippage_bps <= self.BPS_DIVIDER:
+            raise ValueError(f"max_slippage_bps must be 0-{self.BPS_DIVIDER}")
+        pools = await asyncio.gather(
+            *(
+                self.operator.get_quote_pool(
+                    pool_address, max_staleness=max_staleness, **kwargs
+                )
+                for pool_address in pool_addresses
+            )
+        )
+        asset = asset_key(offer_asset)
+        if asset in {asset_key(wrapped) for wrapped in self.WRAPPED_TON}:
+            asset = asset_key(TON_ZERO_ADDRESS)
+        amount = int(offer_amount)
+        limits = []
+        for pool in pools:
+            offer_index = pool.index(asset)
+            amount = pool.quote(offer_index, amount).out
+            asset = pool.assets[1 - offer_index]
+            # a zero limit would read as no limit
+            limits.append(
+                max(
+                    amount * (self.BPS_DIVIDER - max_slippage_bps) // self.BPS_DIVIDER,
+                    1,
+                )
+            )
+        return limits
 
     async def create_jetton_transfer_message(
         self,
         jetton_master_address: str,
-        amount: Decimal,
+        amount: int | Decimal,
         destination_address: str,
         query_id: int = 0,
     ) -> dict[str, str | Any]:
@@ -70,7 +181,7 @@ class Provider(BaseProvider):
             jetton_master_address=jetton_master_address,
             wallet_address=self.wallet_address,
         )
-        jetton_transfer_body = await Builder().build_jetton_transfer_body(
+        jetton_transfer_body = Builder.build_jetton_transfer_body_sync(
             destination_address=destination_address,
             amount=int(amount),
             query_id=query_id,
@@ -84,7 +195,7 @@ class Provider(BaseProvider):
     @staticmethod
     async def create_ton_transfer_message(
         destination_address: str,
-        amount: Decimal = Decimal("0"),
+        amount: int | Decimal = 0,
         return_all: bool = False,
         query_id: int = 0,
     ) -> dict[str, str | Any]:
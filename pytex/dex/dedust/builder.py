@@ -1,7 +1,8 @@
-from tonsdk.utils import Address as TonSdkAddress
+from typing import Sequence
+
 from tonsdk.boc import Cell as TonSdkCell
 
-from pytex.dex.base_builder import Builder
+from pytex.dex.base_builder import Builder, address, asynchronous
 
 
 class SwapStep:
@@ -12,7 +13,7 @@ class SwapStep:
 
 class DedustBuilder(Builder):
     @staticmethod
-    async def build_swap_params(
+    def build_swap_params_sync(
         response_address: str,
         fulfill_payload: TonSdkCell | None = None,
         reject_payload: TonSdkCell | None = None,
@@ -22,13 +23,13 @@ class DedustBuilder(Builder):
         dedust_swap_params = TonSdkCell()
         dedust_swap_params.bits.write_uint(deadline, 32)  # Deadline
         dedust_swap_params.bits.write_address(
-            TonSdkAddress(response_address)
+            address(response_address)
         )  # Recipient address
 
         if referral_address is None:
             dedust_swap_params.bits.write_address(None)  # null referral address
         else:
-            dedust_swap_params.bits.write_address(TonSdkAddress(referral_address))
+            dedust_swap_params.bits.write_address(address(referral_address))
 
         if fulfill_payload is None:
             dedust_swap_params.bits.write_bit(0)
@@ -44,10 +45,12 @@ class DedustBuilder(Builder):
 
         return dedust_swap_params
 
+    build_swap_params = staticmethod(asynchronous(build_swap_params_sync))
+
     @staticmethod
     def _insert_swap_step(swap_step: SwapStep, inner_swap_cell: TonSdkCell):
         swap_step_cell: TonSdkCell = TonSdkCell()
-        swap_step_cell.bits.write_address(TonSdkAddress(swap_step.pool_address))
+        swap_step_cell.bits.write_address(address(swap_step.pool_address))
         swap_step_cell.bits.write_uint(0, 1)  # Swap kind
         swap_step_cell.bits.write_grams(swap_step.limit)  # Swap limit
         swap_step_cell.bits.write_bit(1)  # Maybe refs (yes there are)
@@ -58,7 +61,7 @@ class DedustBuilder(Builder):
         last_swap_step = swap_steps[-1]
         # last swap step cell
         swap_step_cell: TonSdkCell = TonSdkCell()
-        swap_step_cell.bits.write_address(TonSdkAddress(last_swap_step.pool_address))
+        swap_step_cell.bits.write_address(address(last_swap_step.pool_address))
         swap_step_cell.bits.write_uint(0, 1)  # Swap kind
         swap_step_cell.bits.write_grams(last_swap_step.limit)  # Swap limit
         swap_step_cell.bits.write_bit(0)  # no more refs
@@ -77,7 +80,7 @@ class DedustBuilder(Builder):
 
 class NativeDedustBuilder(DedustBuilder):
 
-    async def build_swap_body(
+    def build_swap_body_sync(
         self,
         offer_amount: int,
         swap_steps: list[SwapStep],
@@ -92,9 +95,40 @@ class NativeDedustBuilder(DedustBuilder):
         dedust_swap_native_body.refs.append(forward_payload)  # store_ref
         return dedust_swap_native_body
 
+    build_swap_body = asynchronous(build_swap_body_sync)
+
+    def build_swap_payloads_sync(
+        self,
+        pool_address: str,
+        amounts: Sequence[int],
+        min_outs: Sequence[int],
+        query_ids: Sequence[int],
+        receivers: Sequence[str],
+        deadline: int = 0,
+        referral_address: str | None = None,
+    ) -> list[TonSdkCell]:
+        # native vault swap bodies, one per order
+        pool = address(pool_address)
+        referral = address(referral_address)
+        return [
+            self.build_swap_body_sync(
+                offer_amount=amount,
+                swap_steps=[SwapStep(pool_address=pool, limit=min_out)],
+                forward_payload=self.build_swap_params_sync(
+                    response_address=receiver,
+                    referral_address=referral,
+                    deadline=deadline,
+                ),
+                query_id=query_id,
+            )
+            for amount, min_out, query_id, receiver in zip(
+                amounts, min_outs, query_ids, receivers, strict=True
+            )
+        ]
+
 
 class JettonDedustBuilder(DedustBuilder):
-    async def build_swap_body(
+    def build_swap_body_sync(
         self, swap_steps: list[SwapStep], forward_payload: TonSdkCell
     ) -> TonSdkCell:
         dedust_swap_jetton_body: TonSdkCell = TonSdkCell()
@@ -102,3 +136,40 @@ class JettonDedustBuilder(DedustBuilder):
         dedust_swap_jetton_body.write_cell(self.pack_swap_steps(swap_steps=swap_steps))
         dedust_swap_jetton_body.refs.append(forward_payload)
         return dedust_swap_jetton_body
+
+    build_swap_body = asynchronous(build_swap_body_sync)
+
+    def build_swap_payloads_sync(
+        self,
+        vault_address: str,
+        pool_address: str,
+        amounts: Sequence[int],
+        min_outs: Sequence[int],
+        query_ids: Sequence[int],
+        receivers: Sequence[str],
+        forward_amount: int,
+        deadline: int = 0,
+        referral_address: str | None = None,
+    ) -> list[TonSdkCell]:
+        # jetton transfer bodies to the offer vault, one per order
+        pool = address(pool_address)
+        referral = address(referral_address)
+        swap_bodies = [
+            self.build_swap_body_sync(
+                swap_steps=[SwapStep(pool_address=pool, limit=min_out)],
+                forward_payload=self.build_swap_params_sync(
+                    response_address=receiver,
+                    referral_address=referral,
+                    deadline=deadline,
+                ),
+            )
+            for min_out, receiver in zip(min_outs, receivers, strict=True)
+        ]
+        return self.build_jetton_transfer_bodies_sync(
+            destination_address=vault_address,
+            amounts=amounts,
+            query_ids=query_ids,
+            response_addresses=receivers,
+            forward_payloads=swap_bodies,
+            forward_amount=forward_amount,
+        )
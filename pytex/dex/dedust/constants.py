@@ -1,8 +1,6 @@
-from decimal import Decimal
-
 DEDUST_NATIVE_VAULT = "EQDa4VOnTYlLvDJ0gZjNYm5PXfSmmtL6Vs6A_CZEtXCNICq_"
 
 
 class GAS:
-    GAS_AMOUNT = Decimal("300000000")
-    FORWARD_GAS_AMOUNT = Decimal("250000000")
+    GAS_AMOUNT = 300_000_000
+    FORWARD_GAS_AMOUNT = 250_000_000
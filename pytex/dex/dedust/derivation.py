@@ -0,0 +1,147 @@
+from tonsdk.boc import Cell as TonSdkCell
+
+from pytex.cache import Cache, MEMORY_CACHE
+from pytex.state_init import StateInitTemplate, cell_bits
+from pytex.units import Asset
+
+
+def asset_key(asset: Asset) -> str:
+    value, length = cell_bits(asset.cell)
+    return f"{length}:{value:x}"
+
+
+class DedustAddressRegistry:
+    # a learned template is cross-checked against the factory this many times
+    # (with different arguments) before it is used without a network call
+    TRUST_AFTER = 3
+    # learning fails on ambiguous slots (e.g. the 4 zero bits of the native
+    # asset) or on data changed since deploy, a few other accounts are tried
+    LEARN_ATTEMPTS = 3
+
+    def __init__(self, cache: Cache = MEMORY_CACHE):
+        self.vaults = cache.namespace("dedust_vault")
+        self.pools = cache.namespace("dedust_pool")
+        # pool address -> [asset0 address, asset1 address]
+        self.pool_assets = cache.namespace("dedust_pool_assets")
+        # pool address -> PoolType value
+        self.pool_types = cache.namespace("dedust_pool_type")
+        # kind -> {"template": ..., "checks": n}, None once it cannot be learned
+        self._stored = cache.namespace("dedust_template")
+        self._templates: dict[str, StateInitTemplate] = {}
+        self._attempts: dict[str, int] = {}
+
+    @staticmethod
+    def vault_kind(asset: Asset) -> str:
+        # native and jetton vaults are different contracts, each type learns
+        # and earns trust on its own
+        return f"vault:{int(asset.type)}"
+
+    @staticmethod
+    def pool_kind(pool_type: int) -> str:
+        return f"pool:{int(pool_type)}"
+
+    @staticmethod
+    def pool_key(pool_type: int, asset0: Asset, asset1: Asset) -> str:
+        return f"{int(pool_type)} {asset_key(asset0)} {asset_key(asset1)}"
+
+    def _template(self, kind: str) -> StateInitTemplate | None:
+        template = self._templates.get(kind)
+        if template is None:
+            stored = self._stored.get(kind)
+            if stored is None:
+                return None
+            template = self._templates[kind] = StateInitTemplate.load(
+                stored["template"]
+            )
+        return template
+
+    def _derive(self, kind: str, *slots: tuple[int, int]) -> tuple[str | None, bool]:
+        template = self._template(kind)
+        if template is None:
+            return None, False
+        return (
+            template.address(*slots),
+            self._stored[kind]["checks"] >= self.TRUST_AFTER,
+        )
+
+    def _check(self, kind: str, derived: str | None, address: str):
+        if derived is None:
+            return
+        if derived == address:
+            stored = self._stored[kind]
+            self._stored[kind] = {**stored, "checks": stored["checks"] + 1}
+        else:
+            self._templates.pop(kind, None)
+            self._stored[kind] = None
+
+    def _learn(
+        self,
+        kind: str,
+        code: TonSdkCell,
+        data: TonSdkCell,
+        address: str,
+        slots: list[tuple[int, int]],
+    ) -> bool:
+        template = StateInitTemplate.learn(code, data, address, slots)
+        if template is None:
+            self._attempts[kind] = self._attempts.get(kind, 0) + 1
+            if self._attempts[kind] >= self.LEARN_ATTEMPTS:
+                self._stored[kind] = None
+            return False
+        self._templates[kind] = template
+        self._stored[kind] = {"template": template.dump(), "checks": 1}
+        return True
+
+    def should_learn(self, kind: str) -> bool:
+        return kind not in self._stored
+
+    def derive_vault(self, asset: Asset) -> tuple[str | None, bool]:
+        return self._derive(self.vault_kind(asset), cell_bits(asset.cell))
+
+    def check_vault(self, asset: Asset, derived: str | None, address: str):
+        self.vaults[asset_key(asset)] = address
+        self._check(self.vault_kind(asset), derived, address)
+
+    def learn_vault(
+        self, asset: Asset, code: TonSdkCell, data: TonSdkCell, address: str
+    ) -> bool:
+        return self._learn(
+            self.vault_kind(asset), code, data, address, [cell_bits(asset.cell)]
+        )
+
+    def derive_pool(
+        self, pool_type: int, asset0: Asset, asset1: Asset
+    ) -> tuple[str | None, bool]:
+        return self._derive(
+            self.pool_kind(pool_type), cell_bits(asset0.cell), cell_bits(asset1.cell)
+        )
+
+    def check_pool(
+        self,
+        pool_type: int,
+        asset0: Asset,
+        asset1: Asset,
+        derived: str | None,
+        address: str,
+    ):
+        self.pools[self.pool_key(pool_type, asset0, asset1)] = address
+        self._check(self.pool_kind(pool_type), derived, address)
+
+    def learn_pool(
+        self,
+        pool_type: int,
+        asset0: Asset,
+        asset1: Asset,
+        code: TonSdkCell,
+        data: TonSdkCell,
+        address: str,
+    ) -> bool:
+        # pools keep trading state in their data, so this only succeeds while
+        # the stored data is still the initial one
+        return self._learn(
+            self.pool_kind(pool_type),
+            code,
+            data,
+            address,
+            [cell_bits(asset0.cell), cell_bits(asset1.cell)],
+        )
@@ -1,108 +1,177 @@
-import base64
-from decimal import Decimal
+import asyncio
+from typing import Any
 
 from tonsdk.utils import bytes_to_b64str
-from tonsdk.utils import Address as TonSdkAddress
-from tonsdk.boc import Cell as TonSdkCell
 
 from pytex.dex.base_operator import Operator
-from pytex.exceptions import OperatorError
+from pytex.dex.dedust.derivation import DedustAddressRegistry, asset_key
+from pytex.dex.dedust.schemas import (
+    GET_ASSETS,
+    GET_POOL_ADDRESS,
+    GET_RESERVES,
+    GET_TRADE_FEE,
+    GET_VAULT_ADDRESS,
+    IS_STABLE,
+)
+from pytex.dex.quote import DedustStablePool, DedustVolatilePool
+from pytex.state_init import parse_address
 from pytex.units import Asset, PoolType, Reserve
 
 
 class DedustOperator(Operator):
+    MULTI_SWAP = True
     DEDUST_MAINNET_FACTORY_ADDR = "EQBfBWT7X2BHg9tXAxzhz2aKiNTU1tpt5NsiK0uSDW_YAJ67"
 
-    def __init__(self, toncenter_api_key: str):
-        super().__init__(toncenter_api_key)
+    def __init__(self, toncenter_api_key: str, **kwargs: Any):
+        super().__init__(toncenter_api_key, **kwargs)
+        self.dedust_addresses = DedustAddressRegistry(self.cache)
+        # pool raw address -> (numerator, denominator), changed only by the
+        # pool admin so read once per operator
+        self.trade_fees: dict[str, tuple[int, int]] = {}
 
     async def get_vault_address(self, asset: Asset) -> str:
+        addresses = self.dedust_addresses
+        vault_address = addresses.vaults.get(asset_key(asset))
+        if vault_address is not None:
+            return vault_address
+
+        derived, trusted = addresses.derive_vault(asset)
+        if trusted:
+            return derived
+
+        vault_address = await self.fetch_vault_address(asset)
+        addresses.check_vault(asset, derived, vault_address)
+        if addresses.should_learn(addresses.vault_kind(asset)):
+            code_and_data = await self.get_code_and_data(vault_address)
+            if code_and_data is not None:
+                addresses.learn_vault(asset, *code_and_data, vault_address)
+        return vault_address
+
+    async def fetch_vault_address(self, asset: Asset) -> str:
         request_stack = [["tvm.Slice", bytes_to_b64str(asset.cell.to_boc())]]
-        raw_get_vault_address = self.client.raw_run_method(
-            method="get_vault_address",
-            address=self.DEDUST_MAINNET_FACTORY_ADDR,
-            stack_data=request_stack,
+        vault_address_data = await self.run_get_method(
+            GET_VAULT_ADDRESS, self.DEDUST_MAINNET_FACTORY_ADDR, request_stack
         )
-        raw_data = await self.run_ex(to_run=raw_get_vault_address)
-        if raw_data is None:
-            raise OperatorError(f"run get_vault_address")
-
-        try:
-            b64_bytes_str = raw_data[0].get("stack")[0][1].get("bytes")
-            vault_address: TonSdkAddress = self._read_address(
-                TonSdkCell.one_from_boc(base64.b64decode(b64_bytes_str))
-            )
-        except Exception as e:
-            raise OperatorError(f"parse address | raw_data: {raw_data} -> {e}")
-
-        return vault_address.to_string(True, True, True)
+        return vault_address_data.vault_address
 
     async def get_pool_address(
         self, asset0: Asset, asset1: Asset, pool_type: int = PoolType.VOLATILE
+    ) -> str:
+        addresses = self.dedust_addresses
+        pool_address = addresses.pools.get(
+            addresses.pool_key(pool_type, asset0, asset1)
+        )
+        if pool_address is not None:
+            return pool_address
+
+        derived, trusted = addresses.derive_pool(pool_type, asset0, asset1)
+        if trusted:
+            return derived
+
+        pool_address = await self.fetch_pool_address(asset0, asset1, pool_type)
+        addresses.check_pool(pool_type, asset0, asset1, derived, pool_address)
+        if addresses.should_learn(addresses.pool_kind(pool_type)):
+            code_and_data = await self.get_code_and_data(pool_address)
+            if code_and_data is not None:
+                addresses.learn_pool(
+                    pool_type, asset0, asset1, *code_and_data, pool_address
+                )
+        return pool_address
+
+    async def fetch_pool_address(
+        self, asset0: Asset, asset1: Asset, pool_type: int = PoolType.VOLATILE
     ) -> str:
         request_stack = [
             ["num", int(pool_type)],
             ["tvm.Slice", bytes_to_b64str(asset0.cell.to_boc())],
             ["tvm.Slice", bytes_to_b64str(asset1.cell.to_boc())],
         ]
-        raw_get_pool_address = self.client.raw_run_method(
-            method="get_pool_address",
-            address=self.DEDUST_MAINNET_FACTORY_ADDR,
-            stack_data=request_stack,
+        pool_address_data = await self.run_get_method(
+            GET_POOL_ADDRESS, self.DEDUST_MAINNET_FACTORY_ADDR, request_stack
         )
-        raw_data = await self.run_ex(to_run=raw_get_pool_address)
-        if raw_data is None:
-            raise OperatorError(f"run get_pool_address")
-
-        try:
-            b64_bytes_str = raw_data[0].get("stack")[0][1].get("bytes")
-            pool_address: TonSdkAddress = self._read_address(
-                TonSdkCell.one_from_boc(base64.b64decode(b64_bytes_str))
-            )
-        except Exception as e:
-            raise OperatorError(f"_read_address | raw_data: {raw_data} -> {e}")
-
-        return pool_address.to_string(True, True, True)
+        return pool_address_data.pool_address
 
     async def get_pool_assets(self, pool_address: str) -> (Asset, Asset):
-        raw_get_assets = self.client.raw_run_method(
-            method="get_assets", address=pool_address, stack_data=[]
+        key = parse_address(pool_address).to_string(False)
+        pool_assets = self.dedust_addresses.pool_assets.get(key)
+        if pool_assets is None:
+            asset0, asset1 = await self.fetch_pool_assets(pool_address)
+            pool_assets = [
+                asset0.address.to_string(True, True, True),
+                asset1.address.to_string(True, True, True),
+            ]
+            self.dedust_addresses.pool_assets[key] = pool_assets
+        return Asset(address=pool_assets[0]), Asset(address=pool_assets[1])
+
+    async def warmup_pools(self, pool_addresses: list[str]):
+        # pool assets for a whole universe, batched into few requests
+        await asyncio.gather(
+            *(self.get_pool_assets(pool_address) for pool_address in pool_addresses)
         )
-        raw_data = await self.run_ex(to_run=raw_get_assets)
-        if raw_data is None:
-            raise OperatorError(f"run get_assets")
-
-        asset0_b64 = raw_data[0].get("stack")[0][1].get("bytes")
-        cell = TonSdkCell.one_from_boc(base64.b64decode(asset0_b64))
-        try:
-            asset0 = self._read_asset(cell)
-        except Exception as e:
-            raise OperatorError(f"_read_asset | raw_data: {raw_data} -> {e}")
-
-        asset1_b64 = raw_data[0].get("stack")[1][1].get("bytes")
-        cell = TonSdkCell.one_from_boc(base64.b64decode(asset1_b64))
-        try:
-            asset1 = self._read_asset(cell)
-        except Exception as e:
-            raise OperatorError(f"_read_asset | raw_data: {raw_data} -> {e}")
-
-        return asset0, asset1
-
-    async def get_pool_reserves(self, pool_address: str) -> (Reserve, Reserve):
+
+    async def fetch_pool_assets(self, pool_address: str) -> (Asset, Asset):
+        assets_data = await self.run_get_method(GET_ASSETS, pool_address)
+        return assets_data.asset0, assets_data.asset1
+
+    async def get_pool_reserves(
+        self, pool_address: str, max_staleness: float | None = None
+    ) -> (Reserve, Reserve):
+        return await self.read_pool_state(
+            pool_address,
+            lambda: self.fetch_pool_reserves(pool_address),
+            max_staleness=max_staleness,
+        )
+
+    async def fetch_pool_reserves(
+        self, pool_address: str
+    ) -> tuple[tuple[Reserve, Reserve], int | None]:
         asset0, asset1 = await self.get_pool_assets(pool_address=pool_address)
 
-        raw_get_reserves = self.client.raw_run_method(
-            method="get_reserves", address=pool_address, stack_data=[]
+        raw_data = await self.run_ex(
+            to_run=GET_RESERVES.task(self.client, pool_address)
+        )
+        reserves_data = GET_RESERVES.decode(raw_data[0] if raw_data else None)
+        reserves = (
+            Reserve(asset=asset0, reserve=reserves_data.reserve0),
+            Reserve(asset=asset1, reserve=reserves_data.reserve1),
+        )
+        return reserves, self._last_transaction_lt(raw_data)
+
+    async def get_trade_fee(self, pool_address: str) -> tuple[int, int]:
+        key = parse_address(pool_address).to_string(False)
+        trade_fee = self.trade_fees.get(key)
+        if trade_fee is None:
+            trade_fee_data = await self.run_get_method(GET_TRADE_FEE, pool_address)
+            trade_fee = (
+                trade_fee_data.trade_fee_numerator,
+                trade_fee_data.trade_fee_denominator,
+            )
+            self.trade_fees[key] = trade_fee
+        return trade_fee
+
+    async def get_pool_type(self, pool_address: str) -> PoolType:
+        key = parse_address(pool_address).to_string(False)
+        pool_type = self.dedust_addresses.pool_types.get(key)
+        if pool_type is None:
+            pool_type_data = await self.run_get_method(IS_STABLE, pool_address)
+            pool_type = PoolType.STABLE if pool_type_data.stable else PoolType.VOLATILE
+            self.dedust_addresses.pool_types[key] = int(pool_type)
+        return PoolType(pool_type)
+
+    async def get_quote_pool(
+        self, pool_address: str, max_staleness: float | None = None
+    ) -> DedustVolatilePool:
+        reserves, (numerator, denominator), pool_type = await asyncio.gather(
+            self.get_pool_reserves(pool_address, max_staleness=max_staleness),
+            self.get_trade_fee(pool_address),
+            self.get_pool_type(pool_address),
+        )
+        pool_class = (
+            DedustStablePool if pool_type == PoolType.STABLE else DedustVolatilePool
         )
-        raw_data = await self.run_ex(to_run=raw_get_reserves)
-        if raw_data is None:
-            raise OperatorError(f"run get_reserves")
-        try:
-            reserve0 = int(raw_data[0].get("stack")[0][1], 16)
-            reserve1 = int(raw_data[0].get("stack")[1][1], 16)
-        except Exception as e:
-            raise OperatorError(f"parse reserve | raw_data: {raw_data} -> {e}")
-
-        return Reserve(asset=asset0, reserve=Decimal(reserve0)), Reserve(
-            asset=asset1, reserve=Decimal(reserve1)
+        return pool_class.from_reserves(
+            pool_address,
+            reserves,
+            trade_fee_numerator=numerator,
+            trade_fee_denominator=denominator,
         )
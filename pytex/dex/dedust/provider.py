@@ -1,5 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
+from typing import Any
 
 from tonsdk.boc import Cell as TonSdkCell
 
@@ -11,31 +12,35 @@ from pytex.units import Asset, AssetType
 
 
 class DedustProvider(Provider):
-    def __init__(self, mnemonic: list[str], toncenter_api_key: str):
-        super().__init__(mnemonic=mnemonic, toncenter_api_key=toncenter_api_key)
-        self.operator = DedustOperator(toncenter_api_key=toncenter_api_key)
+    def __init__(self, mnemonic: list[str], toncenter_api_key: str, **kwargs: Any):
+        super().__init__(
+            mnemonic=mnemonic, toncenter_api_key=toncenter_api_key, **kwargs
+        )
+        self.operator = DedustOperator(toncenter_api_key=toncenter_api_key, **kwargs)
 
     async def create_swap_ton_to_jetton_transfer_message(
         self,
         ask_asset: Asset,
-        offer_amount: Decimal,
+        offer_amount: int | Decimal,
         query_id: int,
         pool_address: str | None = None,
         response_address: str | None = None,
         offer_asset: Asset = Asset(_type=AssetType.NATIVE),
         min_ask_amount: int = 0,
-        gas_amount: Decimal = GAS.GAS_AMOUNT,
+        gas_amount: int | Decimal = GAS.GAS_AMOUNT,
         referral_address: str | None = None,
         fulfill_payload: TonSdkCell | None = None,
         reject_payload: TonSdkCell | None = None,
         deadline: datetime | None = None,
+        max_slippage_bps: int | None = None,
+        max_staleness: float | None = None,
         **_
     ) -> dict[str, TonSdkCell | str | int]:
         if not response_address:
             response_address = self.wallet_address
 
         dd_native_builder = NativeDedustBuilder()
-        swap_params = await dd_native_builder.build_swap_params(
+        swap_params = dd_native_builder.build_swap_params_sync(
             response_address=response_address,
             referral_address=referral_address,
             fulfill_payload=fulfill_payload,
@@ -48,9 +53,19 @@ class DedustProvider(Provider):
                 asset0=ask_asset, asset1=offer_asset
             )
 
+        if max_slippage_bps is not None:
+            limits = await self.slippage_limits(
+                [pool_address],
+                offer_asset,
+                offer_amount,
+                max_slippage_bps,
+                max_staleness=max_staleness,
+            )
+            min_ask_amount = max(min_ask_amount, limits[-1])
+
         swap_steps = [SwapStep(pool_address=pool_address, limit=min_ask_amount)]
 
-        swap_body = await dd_native_builder.build_swap_body(
+        swap_body = dd_native_builder.build_swap_body_sync(
             offer_amount=int(offer_amount),
             swap_steps=swap_steps,
             forward_payload=swap_params,
@@ -66,23 +81,25 @@ class DedustProvider(Provider):
         self,
         ask_asset: Asset,
         offer_asset: Asset,
-        offer_amount: Decimal,
+        offer_amount: int | Decimal,
         query_id: int,
         pool_address: str | None = None,
         response_address: str | None = None,
         min_ask_amount: int = 0,
-        gas_amount: Decimal = GAS.GAS_AMOUNT,
+        gas_amount: int | Decimal = GAS.GAS_AMOUNT,
         referral_address: str | None = None,
         fulfill_payload: TonSdkCell | None = None,
         reject_payload: TonSdkCell | None = None,
         deadline: datetime | None = None,
+        max_slippage_bps: int | None = None,
+        max_staleness: float | None = None,
         **_
     ) -> dict[str, TonSdkCell | str | int]:
         if not response_address:
             response_address = self.wallet_address
 
         dd_jetton_builder = JettonDedustBuilder()
-        swap_params = await dd_jetton_builder.build_swap_params(
+        swap_params = dd_jetton_builder.build_swap_params_sync(
             response_address=response_address,
             referral_address=referral_address,
             fulfill_payload=fulfill_payload,
@@ -94,15 +111,25 @@ class DedustProvider(Provider):
                 asset0=ask_asset, asset1=offer_asset
             )
 
+        if max_slippage_bps is not None:
+            limits = await self.slippage_limits(
+                [pool_address],
+                offer_asset,
+                offer_amount,
+                max_slippage_bps,
+                max_staleness=max_staleness,
+            )
+            min_ask_amount = max(min_ask_amount, limits[-1])
+
         swap_steps = [SwapStep(pool_address=pool_address, limit=min_ask_amount)]
 
-        swap_body = await dd_jetton_builder.build_swap_body(
+        swap_body = dd_jetton_builder.build_swap_body_sync(
             swap_steps=swap_steps, forward_payload=swap_params
         )
 
         jetton_vault_address = await self.operator.get_vault_address(asset=offer_asset)
         # jetton_vault_address = await self.operator.get_vault_address(asset=ask_asset)
-        transfer_body = await dd_jetton_builder.build_jetton_transfer_body(
+        transfer_body = dd_jetton_builder.build_jetton_transfer_body_sync(
             destination_address=jetton_vault_address,
             amount=int(offer_amount),
             query_id=query_id,
@@ -123,17 +150,19 @@ class DedustProvider(Provider):
     async def create_swap_jetton_to_ton_transfer_message(
         self,
         offer_asset: Asset,
-        offer_amount: Decimal,
+        offer_amount: int | Decimal,
         query_id: int,
         pool_address: str | None = None,
         response_address: str | None = None,
         ask_asset: Asset = Asset(_type=AssetType.NATIVE),
         min_ask_amount: int = 0,
-        gas_amount: Decimal = GAS.GAS_AMOUNT,
+        gas_amount: int | Decimal = GAS.GAS_AMOUNT,
         referral_address: str | None = None,
         fulfill_payload: TonSdkCell | None = None,
         reject_payload: TonSdkCell | None = None,
         deadline: datetime | None = None,
+        max_slippage_bps: int | None = None,
+        max_staleness: float | None = None,
         **_
     ) -> dict[str, TonSdkCell | str | int]:
         return await self.create_swap_jetton_to_jetton_transfer_message(
@@ -149,45 +178,76 @@ class DedustProvider(Provider):
             fulfill_payload=fulfill_payload,
             reject_payload=reject_payload,
             deadline=deadline,
+            max_slippage_bps=max_slippage_bps,
+            max_staleness=max_staleness,
         )
 
     async def _create_ton_multi_swap_transfer_message_ex(
         self,
         swap_steps: list[SwapStep],
-        offer_amount: Decimal,
+        offer_amount: int | Decimal,
         query_id: int,
         response_address: str | None = None,
         offer_asset: Asset = Asset(_type=AssetType.NATIVE),
         min_ask_amount: int = 0,
-        gas_amount: Decimal = GAS.GAS_AMOUNT,
+        gas_amount: int | Decimal = GAS.GAS_AMOUNT,
         referral_address: str | None = None,
         fulfill_payload: TonSdkCell | None = None,
         reject_payload: TonSdkCell | None = None,
         deadline: datetime | None = None,
         **_
     ) -> dict[str, TonSdkCell | str | int]:
-        pass
-        # TODO methods with swap_chain param
+        # swap steps carry their own limits, min_ask_amount only overrides
+        # the limit of the last step
+        if not response_address:
+            response_address = self.wallet_address
+        if min_ask_amount:
+            swap_steps = swap_steps[:-1] + [
+                SwapStep(pool_address=swap_steps[-1].pool_address, limit=min_ask_amount)
+            ]
+
+        dd_native_builder = NativeDedustBuilder()
+        swap_params = dd_native_builder.build_swap_params_sync(
+            response_address=response_address,
+            referral_address=referral_address,
+            fulfill_payload=fulfill_payload,
+            reject_payload=reject_payload,
+            deadline=0 if deadline is None else int(datetime.timestamp(deadline)),
+        )
+
+        swap_body = dd_native_builder.build_swap_body_sync(
+            offer_amount=int(offer_amount),
+            swap_steps=swap_steps,
+            forward_payload=swap_params,
+            query_id=query_id,
+        )
+        return {
+            "to_address": DEDUST_NATIVE_VAULT,
+            "amount": int(offer_amount + gas_amount),
+            "payload": swap_body,
+        }
 
     async def create_ton_multi_swap_transfer_message(
         self,
         pools: list[str],
-        offer_amount: Decimal,
+        offer_amount: int | Decimal,
         query_id: int,
         response_address: str | None = None,
         min_ask_amount: int = 0,
-        gas_amount: Decimal = GAS.GAS_AMOUNT,
+        gas_amount: int | Decimal = GAS.GAS_AMOUNT,
         referral_address: str | None = None,
         fulfill_payload: TonSdkCell | None = None,
         reject_payload: TonSdkCell | None = None,
         deadline: datetime | None = None,
+        max_slippage_bps: int | None = None,
+        max_staleness: float | None = None,
         **_
     ) -> dict[str, TonSdkCell | str | int]:
         if not response_address:
             response_address = self.wallet_address
 
         dd_native_builder = NativeDedustBuilder()
-        swap_params = await dd_native_builder.build_swap_params(
+        swap_params = dd_native_builder.build_swap_params_sync(
             response_address=response_address,
             referral_address=referral_address,
             fulfill_payload=fulfill_payload,
@@ -195,12 +255,27 @@ class DedustProvider(Provider):
             deadline=0 if deadline is None else int(datetime.timestamp(deadline)),
         )
 
-        swap_steps = [
-            SwapStep(pool_address=pool_address, limit=min_ask_amount)
-            for pool_address in pools
-        ]
+        if max_slippage_bps is not None:
+            # a limit per hop, in the units of its ask asset
+            limits = await self.slippage_limits(
+                pools,
+                Asset(_type=AssetType.NATIVE),
+                offer_amount,
+                max_slippage_bps,
+                max_staleness=max_staleness,
+            )
+            limits[-1] = max(min_ask_amount, limits[-1])
+            swap_steps = [
+                SwapStep(pool_address=pool_address, limit=limit)
+                for pool_address, limit in zip(pools, limits)
+            ]
+        else:
+            swap_steps = [
+                SwapStep(pool_address=pool_address, limit=min_ask_amount)
+                for pool_address in pools
+            ]
 
-        swap_body = await dd_native_builder.build_swap_body(
+        swap_body = dd_native_builder.build_swap_body_sync(
             offer_amount=int(offer_amount),
             swap_steps=swap_steps,
             forward_payload=swap_params,
@@ -216,22 +291,24 @@ class DedustProvider(Provider):
         self,
         pools: list[str],
         offer_asset: Asset,
-        offer_amount: Decimal,
+        offer_amount: int | Decimal,
         query_id: int,
         response_address: str | None = None,
         min_ask_amount: int = 0,
-        gas_amount: Decimal = GAS.GAS_AMOUNT,
+        gas_amount: int | Decimal = GAS.GAS_AMOUNT,
         referral_address: str | None = None,
         fulfill_payload: TonSdkCell | None = None,
         reject_payload: TonSdkCell | None = None,
         deadline: datetime | None = None,
+        max_slippage_bps: int | None = None,
+        max_staleness: float | None = None,
         **_
     ) -> dict[str, TonSdkCell | str | int]:
         if not response_address:
             response_address = self.wallet_address
 
         dd_jetton_builder = JettonDedustBuilder()
-        swap_params = await dd_jetton_builder.build_swap_params(
+        swap_params = dd_jetton_builder.build_swap_params_sync(
             response_address=response_address,
             referral_address=referral_address,
             fulfill_payload=fulfill_payload,
@@ -239,17 +316,31 @@ class DedustProvider(Provider):
             deadline=0 if deadline is None else int(datetime.timestamp(deadline)),
         )
 
-        swap_steps = [
-            SwapStep(pool_address=pool_address, limit=min_ask_amount)
-            for pool_address in pools
-        ]
+        if max_slippage_bps is not None:
+            limits = await self.slippage_limits(
+                pools,
+                offer_asset,
+                offer_amount,
+                max_slippage_bps,
+                max_staleness=max_staleness,
+            )
+            limits[-1] = max(min_ask_amount, limits[-1])
+            swap_steps = [
+                SwapStep(pool_address=pool_address, limit=limit)
+                for pool_address, limit in zip(pools, limits)
+            ]
+        else:
+            swap_steps = [
+                SwapStep(pool_address=pool_address, limit=min_ask_amount)
+                for pool_address in pools
+            ]
 
-        swap_body = await dd_jetton_builder.build_swap_body(
+        swap_body = dd_jetton_builder.build_swap_body_sync(
             swap_steps=swap_steps, forward_payload=swap_params
         )
 
         jetton_vault_address = await self.operator.get_vault_address(asset=offer_asset)
-        transfer_body = await dd_jetton_builder.build_jetton_transfer_body(
+        transfer_body = dd_jetton_builder.build_jetton_transfer_body_sync(
             destination_address=jetton_vault_address,
             amount=int(offer_amount),
             query_id=query_id,
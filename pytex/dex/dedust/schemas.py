@@ -0,0 +1,20 @@
+from pytex.stack import StackSchema, address, asset, boolean, num
+
+GET_VAULT_ADDRESS = StackSchema("get_vault_address", vault_address=address)
+
+GET_POOL_ADDRESS = StackSchema("get_pool_address", pool_address=address)
+
+GET_ASSETS = StackSchema("get_assets", asset0=asset, asset1=asset)
+
+GET_RESERVES = StackSchema("get_reserves", reserve0=num, reserve1=num)
+
+GET_TRADE_FEE = StackSchema(
+    "get_trade_fee", trade_fee_numerator=num, trade_fee_denominator=num
+)
+
+IS_STABLE = StackSchema("is_stable", stable=boolean)
+
+# the pool contract's own quote, used to record reference swaps
+ESTIMATE_SWAP_OUT = StackSchema(
+    "estimate_swap_out", asset_out=asset, amount_out=num, trade_fee=num
+)
@@ -0,0 +1,327 @@
+from typing import NamedTuple
+
+from tonsdk.utils import Address as TonSdkAddress
+
+from pytex.state_init import parse_address
+from pytex.units import Asset, Reserve
+
+# stonfi fees are in basis points
+STONFI_FEE_DIVIDER = 10000
+
+
+class Quote(NamedTuple):
+    out: int
+    # fees in ask asset units, the fee free output minus out
+    fee: int
+    # share of the fee free output lost to the curve against the spot price
+    price_impact: float
+
+
+def asset_key(asset: Asset | TonSdkAddress | str) -> str:
+    if isinstance(asset, Asset):
+        asset = asset.address
+    elif isinstance(asset, str):
+        asset = parse_address(asset)
+    return asset.to_string(False)
+
+
+def divc(a: int, b: int) -> int:
+    return -(-a // b)
+
+
+# newton iterations are quadratic, 255 is the usual bound of curve contracts
+MAX_ITERATIONS = 255
+
+
+def stable_d(x: int, y: int, amp: int) -> int:
+    # stableswap invariant of two balances, amp = A * n ** (n - 1)
+    s = x + y
+    if s == 0:
+        return 0
+    ann = amp * 2
+    d = s
+    for _ in range(MAX_ITERATIONS):
+        d_p = d * d // (x * 2) * d // (y * 2)
+        d_prev = d
+        d = (ann * s + d_p * 2) * d // ((ann - 1) * d + 3 * d_p)
+        if abs(d - d_prev) <= 1:
+            return d
+    raise ValueError("stableswap invariant did not converge")
+
+
+def stable_y(x: int, d: int, amp: int) -> int:
+    # balance of the other asset keeping d with this asset at x, iterated
+    # from d as the contract does so rounding of the last step matches
+    ann = amp * 2
+    c = d * d // (x * 2) * d // (ann * 2)
+    b = x + d // ann
+    y = d
+    for _ in range(MAX_ITERATIONS):
+        y_prev = y
+        y = (y * y + c) // (2 * y + b - d)
+        if abs(y - y_prev) <= 1:
+            return y
+    raise ValueError("stableswap balance did not converge")
+
+
+def solidly_k(x: int, y: int) -> int:
+    # x3y + y3x invariant of dedust stable pools
+    return x * y * (x * x + y * y)
+
+
+def solidly_y(x: int, k: int, y: int) -> int:
+    # smallest balance of the other asset keeping k with this asset at x,
+    # y is the starting guess; the invariant is convex and increasing in y
+    for _ in range(MAX_ITERATIONS):
+        step = (solidly_k(x, y) - k) // (x * (x * x + 3 * y * y))
+        if step == 0:
+            break
+        y = max(y - step, 1)
+    else:
+        raise ValueError("stable invariant did not converge")
+    while solidly_k(x, y) < k:
+        y += 1
+    while y > 1 and solidly_k(x, y - 1) >= k:
+        y -= 1
+    return y
+
+
+class Pool:
+    # local snapshot of a two asset pool, amounts in the smallest asset units
+    def __init__(
+        self, address: str, assets: tuple[str, str], reserves: tuple[int, int]
+    ):
+        self.address = address
+        self.assets = assets
+        self.reserves = reserves
+
+    @classmethod
+    def from_reserves(
+        cls, address: str, reserves: tuple[Reserve, Reserve], **kwargs
+    ) -> "Pool":
+        reserve0, reserve1 = reserves
+        return cls(
+            address,
+            (asset_key(reserve0.asset), asset_key(reserve1.asset)),
+            (int(reserve0.reserve), int(reserve1.reserve)),
+            **kwargs,
+        )
+
+    def index(self, asset: Asset | TonSdkAddress | str) -> int:
+        key = asset_key(asset)
+        if key == self.assets[0]:
+            return 0
+        if key == self.assets[1]:
+            return 1
+        raise ValueError(f"{key} is not traded in pool {self.address}")
+
+    def quote(self, offer_index: int, amount: int) -> Quote:
+        reserve_in = self.reserves[offer_index]
+        reserve_out = self.reserves[1 - offer_index]
+        if amount <= 0 or reserve_in <= 0 or reserve_out <= 0:
+            return Quote(0, 0, 0.0)
+        return self.swap(amount, reserve_in, reserve_out)
+
+    def amount_in(self, offer_index: int, out: int) -> int:
+        # smallest offer amount quoted to at least out
+        reserve_in = self.reserves[offer_index]
+        reserve_out = self.reserves[1 - offer_index]
+        if out <= 0:
+            return 0
+        if out >= reserve_out:
+            raise ValueError(f"pool {self.address} holds {reserve_out} < {out}")
+        amount = max(self.estimate_in(out, reserve_in, reserve_out), 1)
+        # the estimate inverts the curve, only rounding is left to correct
+        while self.swap(amount, reserve_in, reserve_out).out < out:
+            amount += 1
+        while amount > 1 and self.swap(amount - 1, reserve_in, reserve_out).out >= out:
+            amount -= 1
+        return amount
+
+    def swap(self, amount_in: int, reserve_in: int, reserve_out: int) -> Quote:
+        raise NotImplementedError
+
+    def estimate_in(self, out: int, reserve_in: int, reserve_out: int) -> int:
+        raise NotImplementedError
+
+
+class StonfiPool(Pool):
+    # stonfi v1 and v2 constant product pools
+    def __init__(
+        self,
+        address: str,
+        assets: tuple[str, str],
+        reserves: tuple[int, int],
+        lp_fee: int,
+        protocol_fee: int,
+        ref_fee: int = 0,
+    ):
+        super().__init__(address, assets, reserves)
+        self.lp_fee = lp_fee
+        self.protocol_fee = protocol_fee
+        # charged only on swaps with a referral address
+        self.ref_fee = ref_fee
+
+    def output_fees(self, base_out: int) -> int:
+        # protocol and referral fees are cut from the output rounding up
+        return divc(base_out * self.protocol_fee, STONFI_FEE_DIVIDER) + divc(
+            base_out * self.ref_fee, STONFI_FEE_DIVIDER
+        )
+
+    def base_out_for(self, out: int, reserve_out: int) -> int:
+        base_out = divc(
+            out * STONFI_FEE_DIVIDER,
+            STONFI_FEE_DIVIDER - self.protocol_fee - self.ref_fee,
+        )
+        if base_out >= reserve_out:
+            raise ValueError(f"pool {self.address} holds {reserve_out} < {base_out}")
+        return base_out
+
+    def swap(self, amount_in: int, reserve_in: int, reserve_out: int) -> Quote:
+        # lp fee stays in the pool, as in get_amount_out of the pool contract
+        amount_in_with_fee = amount_in * (STONFI_FEE_DIVIDER - self.lp_fee)
+        denominator = reserve_in * STONFI_FEE_DIVIDER + amount_in_with_fee
+        base_out = amount_in_with_fee * reserve_out // denominator
+        out = base_out - self.output_fees(base_out)
+        fee_free_out = amount_in * reserve_out // (reserve_in + amount_in)
+        return Quote(out, fee_free_out - out, amount_in_with_fee / denominator)
+
+    def estimate_in(self, out: int, reserve_in: int, reserve_out: int) -> int:
+        base_out = self.base_out_for(out, reserve_out)
+        amount_in_with_fee = divc(
+            base_out * reserve_in * STONFI_FEE_DIVIDER, reserve_out - base_out
+        )
+        return divc(amount_in_with_fee, STONFI_FEE_DIVIDER - self.lp_fee)
+
+
+class StonfiStablePool(StonfiPool):
+    # stonfi v2 stableswap pools, fees as in constant product pools
+    def __init__(
+        self,
+        address: str,
+        assets: tuple[str, str],
+        reserves: tuple[int, int],
+        lp_fee: int,
+        protocol_fee: int,
+        amp: int,
+        ref_fee: int = 0,
+    ):
+        super().__init__(address, assets, reserves, lp_fee, protocol_fee, ref_fee)
+        self.amp = amp
+        # invariant of the last reserves quoted, one newton solve per snapshot
+        self._d: tuple[int, int, int] = (0, 0, 0)
+
+    def invariant(self, reserve_in: int, reserve_out: int) -> int:
+        x, y, d = self._d
+        if x != reserve_in or y != reserve_out:
+            d = stable_d(reserve_in, reserve_out, self.amp)
+            self._d = (reserve_in, reserve_out, d)
+        return d
+
+    def curve_out(
+        self, amount_in: int, reserve_in: int, reserve_out: int, d: int
+    ) -> int:
+        y = stable_y(reserve_in + amount_in, d, self.amp)
+        return max(reserve_out - y - 1, 0)
+
+    def spot(self, reserve_in: int, reserve_out: int, d: int) -> float:
+        # marginal output per input unit, -dF/dx / dF/dy of the invariant
+        d3 = d**3 / 4
+        ann = self.amp * 2
+        return (ann + d3 / (reserve_in * reserve_in * reserve_out)) / (
+            ann + d3 / (reserve_in * reserve_out * reserve_out)
+        )
+
+    def swap(self, amount_in: int, reserve_in: int, reserve_out: int) -> Quote:
+        d = self.invariant(reserve_in, reserve_out)
+        amount_in_net = (
+            amount_in * (STONFI_FEE_DIVIDER - self.lp_fee) // (STONFI_FEE_DIVIDER)
+        )
+        base_out = self.curve_out(amount_in_net, reserve_in, reserve_out, d)
+        out = base_out - self.output_fees(base_out)
+        fee_free_out = self.curve_out(amount_in, reserve_in, reserve_out, d)
+        price_impact = (
+            1 - base_out / (amount_in_net * self.spot(reserve_in, reserve_out, d))
+            if amount_in_net
+            else 0.0
+        )
+        return Quote(out, fee_free_out - out, price_impact)
+
+    def estimate_in(self, out: int, reserve_in: int, reserve_out: int) -> int:
+        base_out = self.base_out_for(out, reserve_out)
+        d = self.invariant(reserve_in, reserve_out)
+        amount_in_net = stable_y(reserve_out - base_out - 1, d, self.amp) - reserve_in
+        return divc(
+            amount_in_net * STONFI_FEE_DIVIDER, STONFI_FEE_DIVIDER - self.lp_fee
+        )
+
+
+class DedustVolatilePool(Pool):
+    def __init__(
+        self,
+        address: str,
+        assets: tuple[str, str],
+        reserves: tuple[int, int],
+        trade_fee_numerator: int,
+        trade_fee_denominator: int,
+    ):
+        super().__init__(address, assets, reserves)
+        self.trade_fee_numerator = trade_fee_numerator
+        self.trade_fee_denominator = trade_fee_denominator
+
+    def net_in(self, amount_in: int) -> int:
+        # trade fee is taken from the input rounding up
+        return amount_in - divc(
+            amount_in * self.trade_fee_numerator, self.trade_fee_denominator
+        )
+
+    def gross_in(self, amount_in_net: int) -> int:
+        return divc(
+            amount_in_net * self.trade_fee_denominator,
+            self.trade_fee_denominator - self.trade_fee_numerator,
+        )
+
+    def swap(self, amount_in: int, reserve_in: int, reserve_out: int) -> Quote:
+        amount_in_net = self.net_in(amount_in)
+        out = amount_in_net * reserve_out // (reserve_in + amount_in_net)
+        fee_free_out = amount_in * reserve_out // (reserve_in + amount_in)
+        return Quote(
+            out, fee_free_out - out, amount_in_net / (reserve_in + amount_in_net)
+        )
+
+    def estimate_in(self, out: int, reserve_in: int, reserve_out: int) -> int:
+        return self.gross_in(divc(out * reserve_in, reserve_out - out))
+
+
+class DedustStablePool(DedustVolatilePool):
+    # x3y + y3x curve, no amplification parameter, fees as in volatile pools
+    def curve_out(self, amount_in: int, reserve_in: int, reserve_out: int) -> int:
+        k = solidly_k(reserve_in, reserve_out)
+        return reserve_out - solidly_y(reserve_in + amount_in, k, reserve_out)
+
+    @staticmethod
+    def spot(reserve_in: int, reserve_out: int) -> float:
+        # marginal output per input unit, -dk/dx / dk/dy
+        return (
+            reserve_out * (3 * reserve_in * reserve_in + reserve_out * reserve_out)
+        ) / (reserve_in * (reserve_in * reserve_in + 3 * reserve_out * reserve_out))
+
+    def swap(self, amount_in: int, reserve_in: int, reserve_out: int) -> Quote:
+        amount_in_net = self.net_in(amount_in)
+        out = self.curve_out(amount_in_net, reserve_in, reserve_out)
+        fee_free_out = self.curve_out(amount_in, reserve_in, reserve_out)
+        price_impact = (
+            1 - out / (amount_in_net * self.spot(reserve_in, reserve_out))
+            if amount_in_net
+            else 0.0
+        )
+        return Quote(out, fee_free_out - out, price_impact)
+
+    def estimate_in(self, out: int, reserve_in: int, reserve_out: int) -> int:
+        k = solidly_k(reserve_in, reserve_out)
+        x = solidly_y(reserve_out - out, k, reserve_in)
+        return self.gross_in(x - reserve_in)
+
+
+def quote(pool: Pool, offer_asset: Asset | TonSdkAddress | str, amount: int) -> Quote:
+    return pool.quote(pool.index(offer_asset), int(amount))
@@ -0,0 +1,180 @@
+from typing import Any, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional, the "batch" extra
+    np = None
+
+from pytex.dex.quote import (
+    STONFI_FEE_DIVIDER,
+    DedustStablePool,
+    DedustVolatilePool,
+    Pool,
+    StonfiPool,
+    StonfiStablePool,
+)
+
+
+class QuoteBatch:
+    # many pool snapshots as arrays, one row per (pool, offer side); float64
+    # rows are estimates, exact rows use python ints in object arrays with
+    # the same expressions, so both round like the pool contracts
+    def __init__(self, pools: Sequence[Pool], offer_indices: Sequence[int]):
+        if np is None:
+            raise ImportError("batch quoting requires numpy, install pytex[batch]")
+        self.pools = list(pools)
+        self.offer_indices = list(offer_indices)
+        if len(self.pools) != len(self.offer_indices):
+            raise ValueError("one offer index per pool is required")
+
+        stonfi, dedust, other = [], [], []
+        for row, pool in enumerate(self.pools):
+            if isinstance(pool, (StonfiStablePool, DedustStablePool)):
+                other.append(row)
+            elif isinstance(pool, StonfiPool):
+                stonfi.append(row)
+            elif isinstance(pool, DedustVolatilePool):
+                dedust.append(row)
+            else:
+                other.append(row)
+        self.stonfi = np.array(stonfi, dtype=np.intp)
+        self.dedust = np.array(dedust, dtype=np.intp)
+        # curves without a vectorized form, quoted one row at a time
+        self.other = other
+
+        self.reserve_in = [
+            pool.reserves[offer_index]
+            for pool, offer_index in zip(self.pools, self.offer_indices)
+        ]
+        self.reserve_out = [
+            pool.reserves[1 - offer_index]
+            for pool, offer_index in zip(self.pools, self.offer_indices)
+        ]
+        self._columns: dict[bool, dict[str, Any]] = {}
+
+    def columns(self, exact: bool) -> dict[str, Any]:
+        columns = self._columns.get(exact)
+        if columns is not None:
+            return columns
+
+        dtype = object if exact else np.float64
+
+        def column(rows, values) -> Any:
+            return np.array([values[row] for row in rows], dtype=dtype)
+
+        def attribute(rows, name: str) -> Any:
+            return column(rows, [getattr(pool, name, 0) for pool in self.pools])
+
+        columns = {
+            "stonfi_in": column(self.stonfi, self.reserve_in),
+            "stonfi_out": column(self.stonfi, self.reserve_out),
+            "lp_fee": attribute(self.stonfi, "lp_fee"),
+            "protocol_fee": attribute(self.stonfi, "protocol_fee"),
+            "ref_fee": attribute(self.stonfi, "ref_fee"),
+            "dedust_in": column(self.dedust, self.reserve_in),
+            "dedust_out": column(self.dedust, self.reserve_out),
+            "numerator": attribute(self.dedust, "trade_fee_numerator"),
+            "denominator": attribute(self.dedust, "trade_fee_denominator"),
+        }
+        self._columns[exact] = columns
+        return columns
+
+    def quote(self, amounts: Any, exact: bool = False) -> Any:
+        # amounts of shape (rows,) or (rows, sizes) for depth curves,
+        # returns outputs of the same shape
+        dtype = object if exact else np.float64
+        amounts = np.asarray(amounts)
+        if exact:
+            amounts = np.vectorize(int, otypes=[object])(amounts)
+        else:
+            amounts = amounts.astype(np.float64)
+        if amounts.shape[0] != len(self.pools):
+            raise ValueError(f"expected {len(self.pools)} rows of amounts")
+
+        columns = self.columns(exact)
+        out = np.zeros(amounts.shape, dtype=dtype)
+        if len(self.stonfi):
+            out[self.stonfi] = stonfi_out(
+                amounts[self.stonfi],
+                *self.broadcast(
+                    amounts,
+                    columns["stonfi_in"],
+                    columns["stonfi_out"],
+                    columns["lp_fee"],
+                    columns["protocol_fee"],
+                    columns["ref_fee"],
+                ),
+            )
+        if len(self.dedust):
+            out[self.dedust] = dedust_volatile_out(
+                amounts[self.dedust],
+                *self.broadcast(
+                    amounts,
+                    columns["dedust_in"],
+                    columns["dedust_out"],
+                    columns["numerator"],
+                    columns["denominator"],
+                ),
+            )
+        for row in self.other:
+            pool = self.pools[row]
+            for index in np.ndindex(amounts.shape[1:]):
+                out[(row, *index)] = pool.quote(
+                    self.offer_indices[row], int(amounts[(row, *index)])
+                ).out
+        return out
+
+    @staticmethod
+    def broadcast(amounts: Any, *columns: Any) -> list[Any]:
+        # per row columns against a (rows, sizes) amount matrix
+        if amounts.ndim == 1:
+            return list(columns)
+        shape = (-1,) + (1,) * (amounts.ndim - 1)
+        return [column.reshape(shape) for column in columns]
+
+
+def _valid(amount_in: Any, reserve_in: Any, reserve_out: Any) -> Any:
+    return (amount_in > 0) & (reserve_in > 0) & (reserve_out > 0)
+
+
+def stonfi_out(
+    amount_in: Any,
+    reserve_in: Any,
+    reserve_out: Any,
+    lp_fee: Any,
+    protocol_fee: Any,
+    ref_fee: Any,
+) -> Any:
+    # StonfiPool.swap over arrays
+    valid = _valid(amount_in, reserve_in, reserve_out)
+    amount_in = np.where(valid, amount_in, 1)
+    reserve_in = np.where(valid, reserve_in, 1)
+    amount_in_with_fee = amount_in * (STONFI_FEE_DIVIDER - lp_fee)
+    base_out = (
+        amount_in_with_fee
+        * reserve_out
+        // (reserve_in * STONFI_FEE_DIVIDER + amount_in_with_fee)
+    )
+    out = (
+        base_out
+        + (-base_out * protocol_fee // STONFI_FEE_DIVIDER)
+        + (-base_out * ref_fee // STONFI_FEE_DIVIDER)
+    )
+    return np.where(valid, out, 0)
+
+
+def dedust_volatile_out(
+    amount_in: Any,
+    reserve_in: Any,
+    reserve_out: Any,
+    numerator: Any,
+    denominator: Any,
+) -> Any:
+    # DedustVolatilePool.swap over arrays
+    valid = _valid(amount_in, reserve_in, reserve_out)
+    amount_in = np.where(valid, amount_in, 1)
+    reserve_in = np.where(valid, reserve_in, 1)
+    denominator = np.where(valid, denominator, 1)
+    amount_in_net = amount_in + (-amount_in * numerator // denominator)
+    out = amount_in_net * reserve_out // (reserve_in + amount_in_net)
+    return np.where(valid, out, 0)
@@ -0,0 +1,64 @@
+from typing import Any
+
+from tonsdk.boc import Cell as TonSdkCell
+
+from pytex.cell_template import (
+    CellTemplate,
+    DEADLINE,
+    MIN_OUT,
+    OFFER_AMOUNT,
+    QUERY_ID,
+)
+
+ROUTE_SLOTS = [OFFER_AMOUNT, MIN_OUT, QUERY_ID, DEADLINE]
+
+
+class CompiledRoute:
+    def __init__(
+        self,
+        message: dict[str, Any],
+        payload: CellTemplate | TonSdkCell,
+        gas_amount: int,
+        attach_offer: bool,
+    ):
+        # message keys other than amount and payload are the same every swap
+        self.message = message
+        self.payload = payload
+        self.gas_amount = gas_amount
+        # ton offers are sent with the message value
+        self.attach_offer = attach_offer
+
+    def emit(
+        self, amount: int, min_out: int, query_id: int, deadline: int
+    ) -> dict[str, TonSdkCell | str | int]:
+        message = dict(self.message)
+        message["amount"] = (
+            self.gas_amount + amount if self.attach_offer else self.gas_amount
+        )
+        if isinstance(self.payload, CellTemplate):
+            message["payload"] = self.payload.fill(
+                {
+                    OFFER_AMOUNT: amount,
+                    MIN_OUT: min_out,
+                    QUERY_ID: query_id,
+                    DEADLINE: deadline,
+                }
+            )
+        else:
+            message["payload"] = self.payload
+        return message
+
+    @classmethod
+    def learn(cls, message: dict[str, Any]) -> "CompiledRoute":
+        # message created with the slot sentinels as swap values
+        gas_amount = int(message["amount"])
+        attach_offer = gas_amount >= OFFER_AMOUNT.sentinel
+        if attach_offer:
+            gas_amount -= OFFER_AMOUNT.sentinel
+        static = {
+            key: value
+            for key, value in message.items()
+            if key not in ("amount", "payload")
+        }
+        payload = CellTemplate.learn(message["payload"], ROUTE_SLOTS)
+        return cls(static, payload, gas_amount, attach_offer)
@@ -0,0 +1,204 @@
+import asyncio
+from typing import Any, NamedTuple
+
+from tonsdk.utils import Address as TonSdkAddress
+
+from pytex.dex.dedust.builder import SwapStep as DedustSwapStep
+from pytex.dex.quote import Pool, asset_key
+from pytex.state_init import parse_address
+from pytex.units import Asset
+
+
+class Hop(NamedTuple):
+    pool: Pool
+    offer_index: int
+    amount_in: int
+    amount_out: int
+
+    @property
+    def offer_asset(self) -> str:
+        return self.pool.assets[self.offer_index]
+
+    @property
+    def ask_asset(self) -> str:
+        return self.pool.assets[1 - self.offer_index]
+
+
+class Route:
+    def __init__(self, hops: list[Hop]):
+        self.hops = hops
+
+    @property
+    def amount_in(self) -> int:
+        return self.hops[0].amount_in
+
+    @property
+    def amount_out(self) -> int:
+        return self.hops[-1].amount_out
+
+    @property
+    def assets(self) -> list[str]:
+        return [self.hops[0].offer_asset] + [hop.ask_asset for hop in self.hops]
+
+    @property
+    def pool_addresses(self) -> list[str]:
+        # the pools argument of the providers multi swap messages
+        return [hop.pool.address for hop in self.hops]
+
+    def dedust_swap_steps(self, min_ask_amount: int = 0) -> list[DedustSwapStep]:
+        # the limit checks the route output, inner hops are not limited
+        return [
+            DedustSwapStep(
+                pool_address=hop.pool.address,
+                limit=min_ask_amount if hop is self.hops[-1] else 0,
+            )
+            for hop in self.hops
+        ]
+
+    def __repr__(self) -> str:
+        return (
+            f"Route({' -> '.join(self.assets)}, {self.amount_in} -> {self.amount_out})"
+        )
+
+
+def pool_key(pool_address: str) -> str:
+    return parse_address(pool_address).to_string(False)
+
+
+class PoolGraph:
+    # assets as nodes, pool snapshots as edges, updated one pool at a time
+    def __init__(self):
+        self.pools: dict[str, Pool] = {}
+        # asset key -> pool key -> pool
+        self.adjacency: dict[str, dict[str, Pool]] = {}
+        # pool key -> (operator with get_quote_pool, pool address)
+        self.sources: dict[str, tuple[Any, str]] = {}
+        # bumped on every change, for callers caching search results
+        self.version = 0
+
+    def update(self, pool: Pool) -> bool:
+        key = pool_key(pool.address)
+        old = self.pools.get(key)
+        if old is not None:
+            if old.reserves == pool.reserves and type(old) is type(pool):
+                return False
+            self._unlink(key, old)
+        self.pools[key] = pool
+        for asset in pool.assets:
+            self.adjacency.setdefault(asset, {})[key] = pool
+        self.version += 1
+        return True
+
+    def remove(self, pool_address: str):
+        key = pool_key(pool_address)
+        self.sources.pop(key, None)
+        pool = self.pools.pop(key, None)
+        if pool is not None:
+            self._unlink(key, pool)
+            self.version += 1
+
+    def _unlink(self, key: str, pool: Pool):
+        for asset in pool.assets:
+            edges = self.adjacency.get(asset)
+            if edges is not None:
+                edges.pop(key, None)
+                if not edges:
+                    del self.adjacency[asset]
+
+    async def track(
+        self,
+        operator: Any,
+        pool_addresses: list[str],
+        max_staleness: float | None = None,
+    ) -> list[str]:
+        # operator is any operator with get_quote_pool; returns the
+        # addresses of the pools added or changed, like refresh
+        for pool_address in pool_addresses:
+            self.sources[pool_key(pool_address)] = (operator, pool_address)
+        pools = await asyncio.gather(
+            *(
+                operator.get_quote_pool(pool_address, max_staleness=max_staleness)
+                for pool_address in pool_addresses
+            )
+        )
+        return [pool.address for pool in pools if self.update(pool)]
+
+    async def refresh(self, max_staleness: float | None = None) -> list[str]:
+        # reserve cache probes make unchanged pools cheap, only pools with
+        # new reserves touch the graph; returns their addresses
+        pools = await asyncio.gather(
+            *(
+                operator.get_quote_pool(pool_address, max_staleness=max_staleness)
+                for operator, pool_address in self.sources.values()
+            )
+        )
+        return [pool.address for pool in pools if self.update(pool)]
+
+    def venue(self, key: str) -> Any:
+        # the operator the pool is tracked with, None for pools only updated
+        source = self.sources.get(key)
+        return None if source is None else source[0]
+
+    def best_route(
+        self,
+        offer_asset: Asset | TonSdkAddress | str,
+        ask_asset: Asset | TonSdkAddress | str,
+        amount: int,
+        max_hops: int = 3,
+        venue: Any = None,
+    ) -> Route | None:
+        # best output over paths of at most max_hops pools of one venue, as a
+        # multi swap message goes through a single dex version; venue, an
+        # operator pools are tracked with, limits the search to its pools,
+        # otherwise every venue is searched on its own
+        offer, ask = asset_key(offer_asset), asset_key(ask_asset)
+        amount = int(amount)
+        if venue is not None:
+            return self._search(offer, ask, amount, max_hops, venue)
+        venues = {}
+        for key in self.adjacency.get(offer, {}):
+            venue = self.venue(key)
+            venues[id(venue)] = venue
+        best: Route | None = None
+        for venue in venues.values():
+            route = self._search(offer, ask, amount, max_hops, venue)
+            if route is not None and (
+                best is None or route.amount_out > best.amount_out
+            ):
+                best = route
+        return best
+
+    def _search(
+        self, offer: str, ask: str, amount: int, max_hops: int, venue: Any
+    ) -> Route | None:
+        # per hop only the largest amount reached of every asset is
+        # extended, as output grows with input; each pool is used once
+        best: Route | None = None
+        best_amounts: dict[str, int] = {offer: amount}
+        frontier: dict[str, tuple[int, list[Hop]]] = {offer: (amount, [])}
+
+        for _ in range(max_hops):
+            reached: dict[str, tuple[int, list[Hop]]] = {}
+            for asset, (amount_in, hops) in frontier.items():
+                used = {hop.pool.address for hop in hops}
+                for key, pool in self.adjacency.get(asset, {}).items():
+                    if pool.address in used or self.venue(key) is not venue:
+                        continue
+                    offer_index = 0 if pool.assets[0] == asset else 1
+                    amount_out = pool.quote(offer_index, amount_in).out
+                    if amount_out <= 0:
+                        continue
+                    hop = Hop(pool, offer_index, amount_in, amount_out)
+                    other = pool.assets[1 - offer_index]
+                    if other == offer:
+                        continue
+                    if other == ask:
+                        if best is None or amount_out > best.amount_out:
+                            best = Route(hops + [hop])
+                    elif amount_out > best_amounts.get(other, 0):
+                        best_amounts[other] = amount_out
+                        reached[other] = (amount_out, hops + [hop])
+            frontier = reached
+            if not frontier:
+                break
+        return best
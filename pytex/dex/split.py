@@ -0,0 +1,195 @@
+import math
+from typing import Any, NamedTuple, Sequence
+
+from tonsdk.utils import Address as TonSdkAddress
+
+from pytex.dex.quote import (
+    STONFI_FEE_DIVIDER,
+    DedustStablePool,
+    DedustVolatilePool,
+    Pool,
+    StonfiPool,
+    StonfiStablePool,
+)
+from pytex.dex.routing import pool_key
+from pytex.units import Asset
+from pytex.wallet import ContractMulti
+
+# bisection steps on the marginal price, far below integer resolution
+SPLIT_ITERATIONS = 100
+
+
+class Allocation(NamedTuple):
+    pool: Pool
+    offer_index: int
+    amount_in: int
+    amount_out: int
+
+
+def constant_product(pool: Pool, offer_index: int) -> tuple[float, float, float] | None:
+    # (reserve_in, reserve_out, share of the input kept after fees) of the
+    # constant product curves, None for curves without a closed form
+    reserve_in = pool.reserves[offer_index]
+    reserve_out = pool.reserves[1 - offer_index]
+    if isinstance(pool, (StonfiStablePool, DedustStablePool)):
+        return None
+    if isinstance(pool, StonfiPool):
+        gamma = (
+            (STONFI_FEE_DIVIDER - pool.lp_fee)
+            * (STONFI_FEE_DIVIDER - pool.protocol_fee - pool.ref_fee)
+            / STONFI_FEE_DIVIDER**2
+        )
+    elif isinstance(pool, DedustVolatilePool):
+        gamma = 1 - pool.trade_fee_numerator / pool.trade_fee_denominator
+    else:
+        return None
+    return float(reserve_in), float(reserve_out), gamma
+
+
+class Leg:
+    def __init__(self, pool: Pool, offer_index: int, limit: int):
+        self.pool = pool
+        self.offer_index = offer_index
+        self.limit = limit
+        self.curve = constant_product(pool, offer_index)
+
+    def marginal(self, amount: float) -> float:
+        # output per extra input unit at amount
+        if self.curve is not None:
+            reserve_in, reserve_out, gamma = self.curve
+            return gamma * reserve_in * reserve_out / (reserve_in + gamma * amount) ** 2
+        # steps far above integer rounding, far below the reserve
+        step = max(
+            int(amount) // 1000000, self.pool.reserves[self.offer_index] // 10**9, 1
+        )
+        base = self.pool.quote(self.offer_index, int(amount)).out
+        return (self.pool.quote(self.offer_index, int(amount) + step).out - base) / step
+
+    def amount_at(self, price: float) -> float:
+        # input at which the marginal output falls to price
+        if self.curve is not None:
+            reserve_in, reserve_out, gamma = self.curve
+            amount = math.sqrt(gamma * reserve_in * reserve_out / price) - reserve_in
+            return min(max(amount / gamma, 0.0), self.limit)
+        low, high = 0.0, float(self.limit)
+        if self.marginal(low) <= price:
+            return 0.0
+        for _ in range(64):
+            middle = (low + high) / 2
+            if self.marginal(middle) > price:
+                low = middle
+            else:
+                high = middle
+        return low
+
+
+def _allocate(legs: list[Leg], amount: int) -> list[int]:
+    # equal marginal output on every leg with an allocation
+    high = max(leg.marginal(0.0) for leg in legs)
+    low = high
+    while sum(leg.amount_at(low) for leg in legs) < amount and low > 1e-300:
+        low /= 2
+    for _ in range(SPLIT_ITERATIONS):
+        price = math.sqrt(low * high)
+        if sum(leg.amount_at(price) for leg in legs) > amount:
+            low = price
+        else:
+            high = price
+    amounts = [int(leg.amount_at(high)) for leg in legs]
+    # rounding leftovers go where the next unit is worth most
+    rest = amount - sum(amounts)
+    if rest > 0:
+        best = max(range(len(legs)), key=lambda i: legs[i].marginal(amounts[i]))
+        amounts[best] += rest
+    return amounts
+
+
+def split_order(
+    pools: Sequence[Pool],
+    offer_asset: Asset | TonSdkAddress | str,
+    amount: int,
+    min_amount: int = 0,
+) -> list[Allocation]:
+    # output maximizing allocation of amount over pools of one pair; legs
+    # below min_amount, not worth a message of their own, are dropped
+    amount = int(amount)
+    legs = []
+    for pool in pools:
+        offer_index = pool.index(offer_asset)
+        legs.append(Leg(pool, offer_index, pool.reserves[offer_index] * 1000))
+    if not legs or amount <= 0:
+        return []
+
+    while True:
+        amounts = _allocate(legs, amount)
+        kept = [
+            leg
+            for leg, leg_amount in zip(legs, amounts)
+            if leg_amount > 0 and leg_amount >= min_amount
+        ]
+        if len(kept) == len(legs) or not kept:
+            break
+        legs = kept
+
+    allocations = [
+        Allocation(
+            leg.pool,
+            leg.offer_index,
+            leg_amount,
+            leg.pool.quote(leg.offer_index, leg_amount).out,
+        )
+        for leg, leg_amount in zip(legs, amounts)
+        if leg_amount > 0
+    ]
+    # never worse than the best single pool once rounded
+    singles = []
+    for pool in pools:
+        offer_index = pool.index(offer_asset)
+        out = pool.quote(offer_index, amount).out
+        singles.append(Allocation(pool, offer_index, amount, out))
+    single = max(singles, key=lambda allocation: allocation.amount_out)
+    if single.amount_out >= sum(allocation.amount_out for allocation in allocations):
+        return [single]
+    return sorted(allocations, key=lambda allocation: -allocation.amount_in)
+
+
+async def create_split_messages(
+    allocations: list[Allocation],
+    venues: dict[str, Any],
+    method: str,
+    query_id: int,
+    min_ask_amounts: list[int] | None = None,
+    wallet: type[ContractMulti] | ContractMulti | None = None,
+    **kwargs: Any,
+) -> list[list[dict]]:
+    # venues maps pool keys to the provider of their dex, method is the
+    # create_swap_* method to call on it; returns create_transfer_messages
+    # batches, the query id grows by one per message. Messages name the
+    # wallet sending them, so the providers must share one wallet and
+    # batches fit it, unless given
+    if not allocations:
+        return []
+    providers = [
+        venues[pool_key(allocation.pool.address)] for allocation in allocations
+    ]
+    if wallet is None:
+        wallet_addresses = {provider.wallet_address for provider in providers}
+        if len(wallet_addresses) > 1:
+            raise ValueError(
+                "providers send from different wallets: %s"
+                % ", ".join(sorted(wallet_addresses))
+            )
+        wallet = providers[0].wallet_multi
+    messages = []
+    for i, (allocation, provider) in enumerate(zip(allocations, providers)):
+        create = getattr(provider, method)
+        messages.append(
+            await create(
+                pool_address=allocation.pool.address,
+                offer_amount=allocation.amount_in,
+                min_ask_amount=0 if min_ask_amounts is None else min_ask_amounts[i],
+                query_id=query_id + i,
+                **kwargs,
+            )
+        )
+    return wallet.pack_messages(messages)
@@ -1,12 +1,13 @@
-from tonsdk.utils import Address as TonSdkAddress
+from typing import Sequence
+
 from tonsdk.boc import Cell as TonSdkCell
 
-from pytex.dex.base_builder import Builder
+from pytex.dex.base_builder import Builder, address, asynchronous
 
 
 class StonfiBuilder(Builder):
     @staticmethod
-    async def build_pton_transfer_body(
+    def build_pton_transfer_body_sync(
         ton_amount: int,
         query_id: int = 0,
         refund_address: str | None = None,
@@ -17,7 +18,7 @@ class StonfiBuilder(Builder):
         pton_transfer_body.bits.write_uint(query_id, 64)  # query_id
         pton_transfer_body.bits.write_coins(ton_amount)  # Swap amount
 
-        pton_transfer_body.bits.write_address(TonSdkAddress(refund_address))
+        pton_transfer_body.bits.write_address(address(refund_address))
         # if refund_address is None:
         #     pton_transfer_body.bits.write_bit(0)  # null referral address
         # else:
@@ -30,3 +31,25 @@ class StonfiBuilder(Builder):
             pton_transfer_body.bits.write_bit(1)
             pton_transfer_body.refs.append(forward_payload)
         return pton_transfer_body
+
+    build_pton_transfer_body = staticmethod(asynchronous(build_pton_transfer_body_sync))
+
+    @classmethod
+    def build_pton_transfer_bodies_sync(
+        cls,
+        ton_amounts: Sequence[int],
+        query_ids: Sequence[int],
+        refund_addresses: Sequence[str],
+        forward_payloads: Sequence[TonSdkCell | None],
+    ) -> list[TonSdkCell]:
+        return [
+            cls.build_pton_transfer_body_sync(
+                ton_amount=ton_amount,
+                query_id=query_id,
+                refund_address=refund_address,
+                forward_payload=forward_payload,
+            )
+            for ton_amount, query_id, refund_address, forward_payload in zip(
+                ton_amounts, query_ids, refund_addresses, forward_payloads, strict=True
+            )
+        ]
@@ -1,38 +1,54 @@
-import base64
+import asyncio
 from decimal import Decimal
+from typing import Any
 
 from tonsdk.utils import Address as TonSdkAddress
-from tonsdk.boc import Cell as TonSdkCell
 
 from pytex.dex.base_operator import Operator
 from pytex.dex.stonfi.v1.constants import pTON_ADDRESS_V1
 from pytex.dex.stonfi.v2.constants import pTON_ADDRESS_V2
-from pytex.exceptions import OperatorError
-from pytex.units import TON_ZERO_ADDRESS
+from pytex.stack import GET_WALLET_DATA
+from pytex.state_init import parse_address
+from pytex.units import Asset, Reserve, TON_ZERO_ADDRESS
 
 
 class StonfiOperator(Operator):
-    def __init__(self, toncenter_api_key: str):
-        super().__init__(toncenter_api_key)
+    def __init__(self, toncenter_api_key: str, **kwargs: Any):
+        super().__init__(toncenter_api_key, **kwargs)
+        # a jetton wallet never changes its master
+        self.wallet_masters = self.cache.namespace("stonfi_wallet_master")
 
     async def get_wallet_jetton_master_address(self, address: str) -> TonSdkAddress:
-        raw_get_pool_data = self.client.raw_run_method(
-            method="get_wallet_data", address=address, stack_data=[]
+        key = parse_address(address).to_string(False)
+        master_address = self.wallet_masters.get(key)
+        if master_address is None:
+            master_address = await self.fetch_wallet_jetton_master_address(address)
+            self.wallet_masters[key] = master_address
+        return TonSdkAddress(master_address)
+
+    async def get_pool_reserves(
+        self, pool_address: str, max_staleness: float | None = None
+    ) -> (Reserve, Reserve):
+        raise NotImplementedError
+
+    async def warmup_pools(self, pool_addresses: list[str]):
+        # resolves the pool token masters of a whole universe, batched
+        await asyncio.gather(
+            *(self.get_pool_reserves(pool_address) for pool_address in pool_addresses)
         )
 
-        raw_data = await self.run_ex(to_run=raw_get_pool_data)
-        if raw_data is None:
-            raise OperatorError(f"run get_wallet_data")
-
-        jeton_address_b64 = raw_data[0].get("stack")[2][1].get("bytes")
-        cell = TonSdkCell.one_from_boc(base64.b64decode(jeton_address_b64))
-        try:
-            jetton_address = self._read_address(cell)
-        except Exception as e:
-            raise OperatorError(f"_read_address | raw_data: {raw_data} -> {e}")
-
-        if jetton_address.to_string(True, True, True) == pTON_ADDRESS_V1:
-            return TonSdkAddress(TON_ZERO_ADDRESS)
-        if jetton_address.to_string(True, True, True) == pTON_ADDRESS_V2:
-            return TonSdkAddress(TON_ZERO_ADDRESS)
+    async def get_wallet_assets(self, *addresses: str) -> list[Asset]:
+        master_addresses = await asyncio.gather(
+            *(self.get_wallet_jetton_master_address(address) for address in addresses)
+        )
+        return [
+            Asset(address=master_address.to_string(True, True, True))
+            for master_address in master_addresses
+        ]
+
+    async def fetch_wallet_jetton_master_address(self, address: str) -> str:
+        wallet_data = await self.run_get_method(GET_WALLET_DATA, address)
+        jetton_address = wallet_data.jetton_master_address
+        if jetton_address in (pTON_ADDRESS_V1, pTON_ADDRESS_V2):
+            return TON_ZERO_ADDRESS
         return jetton_address
@@ -1,12 +1,14 @@
-from tonsdk.utils import Address as TonSdkAddress
+from typing import Sequence
+
 from tonsdk.boc import Cell as TonSdkCell
 
+from pytex.dex.base_builder import address, asynchronous
 from pytex.dex.stonfi.builder import StonfiBuilder
 
 
 class StonfiV1Builder(StonfiBuilder):
     @staticmethod
-    async def build_swap_body(
+    def build_swap_body_sync(
         wallet_address: str,
         ask_jetton_wallet_address: str,  # stonfi router jetton wallet address
         min_ask_amount: int,
@@ -14,14 +16,49 @@ class StonfiV1Builder(StonfiBuilder):
     ) -> TonSdkCell:
         swap_body: TonSdkCell = TonSdkCell()
         swap_body.bits.write_uint(0x25938561, 32)  # swap op code
-        swap_body.bits.write_address(TonSdkAddress(ask_jetton_wallet_address))
+        swap_body.bits.write_address(address(ask_jetton_wallet_address))
         swap_body.bits.write_coins(min_ask_amount)  # limit
-        swap_body.bits.write_address(TonSdkAddress(wallet_address))  # Recipient address
+        swap_body.bits.write_address(address(wallet_address))  # Recipient address
 
         if referral_address is None:
             swap_body.bits.write_bit(0)  # null referral address
         else:
             swap_body.bits.write_bit(1)
-            swap_body.bits.write_address(TonSdkAddress(referral_address))
+            swap_body.bits.write_address(address(referral_address))
 
         return swap_body
+
+    build_swap_body = staticmethod(asynchronous(build_swap_body_sync))
+
+    @classmethod
+    def build_swap_payloads_sync(
+        cls,
+        router_address: str,
+        ask_jetton_wallet_address: str,
+        amounts: Sequence[int],
+        min_outs: Sequence[int],
+        query_ids: Sequence[int],
+        receivers: Sequence[str],
+        forward_amount: int,
+        referral_address: str | None = None,
+    ) -> list[TonSdkCell]:
+        # jetton (or pTON) transfer bodies to the router, one per order
+        ask_jetton_wallet = address(ask_jetton_wallet_address)
+        referral = address(referral_address)
+        swap_bodies = [
+            cls.build_swap_body_sync(
+                wallet_address=receiver,
+                ask_jetton_wallet_address=ask_jetton_wallet,
+                min_ask_amount=min_out,
+                referral_address=referral,
+            )
+            for min_out, receiver in zip(min_outs, receivers, strict=True)
+        ]
+        return cls.build_jetton_transfer_bodies_sync(
+            destination_address=router_address,
+            amounts=amounts,
+            query_ids=query_ids,
+            response_addresses=receivers,
+            forward_payloads=swap_bodies,
+            forward_amount=forward_amount,
+        )
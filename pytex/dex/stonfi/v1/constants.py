@@ -1,18 +1,16 @@
-from decimal import Decimal
-
 STONFI_ROUTER_V1 = "EQB3ncyBUTjZUA5EnFKR5_EnOMI9V1tTEAAPaiU71gc4TiUt"
 pTON_ADDRESS_V1 = "EQCM3B12QK1e4yZSf8GtBRT0aLMNyEsBc_DhVfRRtOEffLez"
 
 
 class GAS_JETTON_TO_JETTON:
-    GAS_AMOUNT = Decimal("265000000")
-    FORWARD_GAS_AMOUNT = Decimal("205000000")
+    GAS_AMOUNT = 265_000_000
+    FORWARD_GAS_AMOUNT = 205_000_000
 
 
 class GAS_JETTON_TO_TON:
-    GAS_AMOUNT = Decimal("185000000")
-    FORWARD_GAS_AMOUNT = Decimal("125000000")
+    GAS_AMOUNT = 185_000_000
+    FORWARD_GAS_AMOUNT = 125_000_000
 
 
 class GAS_TON_TO_JETTON:
-    FORWARD_GAS_AMOUNT = Decimal("215000000")
+    FORWARD_GAS_AMOUNT = 215_000_000
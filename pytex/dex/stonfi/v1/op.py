@@ -1,69 +1,142 @@
-import base64
-from decimal import Decimal
+import asyncio
+from typing import Any
 
-from tonsdk.utils import Address as TonSdkAddress
 from tonsdk.boc import Cell as TonSdkCell
+from tonsdk.utils import Address as TonSdkAddress, bytes_to_b64str
 
+from pytex.dex.quote import StonfiPool
 from pytex.dex.stonfi.op import StonfiOperator
-from pytex.exceptions import OperatorError
-from pytex.units import Asset, AssetType, Reserve
+from pytex.dex.stonfi.v1.constants import STONFI_ROUTER_V1
+from pytex.dex.stonfi.v1.schemas import GET_POOL_ADDRESS, GET_POOL_DATA
+from pytex.state_init import parse_address
+from pytex.units import Asset, Reserve
 
 
-class StonfiV1Operator(StonfiOperator):
-    def __init__(self, toncenter_api_key: str):
-        super().__init__(toncenter_api_key)
+class PoolState:
+    def __init__(
+        self,
+        pool_address: str,
+        reserve0: Reserve,
+        reserve1: Reserve,
+        token0_wallet_address: str,
+        token1_wallet_address: str,
+        lp_fee: int,
+        protocol_fee: int,
+        ref_fee: int,
+        protocol_fee_address: str | None,
+        collected_token0_protocol_fee: int,
+        collected_token1_protocol_fee: int,
+    ):
+        self.pool_address = pool_address
+        self.reserve0 = reserve0
+        self.reserve1 = reserve1
+        # router jetton wallets of the pool tokens
+        self.token0_wallet_address = token0_wallet_address
+        self.token1_wallet_address = token1_wallet_address
+        self.lp_fee = lp_fee
+        self.protocol_fee = protocol_fee
+        self.ref_fee = ref_fee
+        self.protocol_fee_address = protocol_fee_address
+        self.collected_token0_protocol_fee = collected_token0_protocol_fee
+        self.collected_token1_protocol_fee = collected_token1_protocol_fee
 
-    async def get_pool_reserves(self, pool_address: str) -> (Decimal, Decimal):
-        asset0 = Asset(_type=AssetType.NATIVE)
-        asset1 = Asset(_type=AssetType.NATIVE)
+    @property
+    def reserves(self) -> tuple[Reserve, Reserve]:
+        return self.reserve0, self.reserve1
 
-        raw_get_pool_data = self.client.raw_run_method(
-            method="get_pool_data", address=pool_address, stack_data=[]
-        )
-        raw_data = await self.run_ex(to_run=raw_get_pool_data)
-        if raw_data is None:
-            raise OperatorError(f"run get_wallet_data")
-        try:
-            reserve0 = int(raw_data[0].get("stack")[0][1], 16)
-            reserve1 = int(raw_data[0].get("stack")[1][1], 16)
-        except Exception as e:
-            raise OperatorError(f"parse reserve | raw_data: {raw_data} -> {e}")
 
-        try:
-            b64_bytes_str = raw_data[0].get("stack")[2][1].get("bytes")
-            token0_governed_address: TonSdkAddress = self._read_address(
-                TonSdkCell.one_from_boc(base64.b64decode(b64_bytes_str))
-            )
+class StonfiV1Operator(StonfiOperator):
+    def __init__(self, toncenter_api_key: str, **kwargs: Any):
+        super().__init__(toncenter_api_key, **kwargs)
+        # the one v1 pool of a pair never moves
+        self.pools = self.cache.namespace("stonfi_v1_pool")
 
-            b64_bytes_str = raw_data[0].get("stack")[3][1].get("bytes")
-            token1_governed_address: TonSdkAddress = self._read_address(
-                TonSdkCell.one_from_boc(base64.b64decode(b64_bytes_str))
+    async def get_pool_address(self, asset0: Asset, asset1: Asset) -> str:
+        # the router keys its pools by its own jetton wallets of the pair
+        wallet0, wallet1 = await asyncio.gather(
+            *(
+                self.get_jetton_wallet_address(
+                    jetton_master_address=asset.address.to_string(True, True, True),
+                    wallet_address=STONFI_ROUTER_V1,
+                )
+                for asset in (asset0, asset1)
             )
-        except Exception as e:
-            raise OperatorError(f"_read_address | raw_data: {raw_data} -> {e}")
+        )
+        key = ":".join(
+            sorted(
+                parse_address(wallet).to_string(False) for wallet in (wallet0, wallet1)
+            )
+        )
+        pool_address = self.pools.get(key)
+        if pool_address is None:
+            pool_address = await self.fetch_pool_address(wallet0, wallet1)
+            self.pools[key] = pool_address
+        return pool_address
+
+    async def fetch_pool_address(self, wallet0: str, wallet1: str) -> str:
+        request_stack = []
+        for wallet in (wallet0, wallet1):
+            cell = TonSdkCell()
+            cell.bits.write_address(TonSdkAddress(wallet))
+            request_stack.append(["tvm.Slice", bytes_to_b64str(cell.to_boc(False))])
+        pool_address_data = await self.run_get_method(
+            GET_POOL_ADDRESS, STONFI_ROUTER_V1, stack_data=request_stack
+        )
+        return pool_address_data.pool_address
+
+    async def get_pool_state(
+        self, pool_address: str, max_staleness: float | None = None
+    ) -> PoolState:
+        return await self.read_pool_state(
+            pool_address,
+            lambda: self.fetch_pool_state(pool_address),
+            max_staleness=max_staleness,
+        )
 
-        token0_address = await self.get_wallet_jetton_master_address(
-            address=token0_governed_address.to_string(True, True, True)
+    async def fetch_pool_state(self, pool_address: str) -> tuple[PoolState, int | None]:
+        raw_data = await self.run_ex(
+            to_run=GET_POOL_DATA.task(self.client, pool_address)
         )
-        token1_address = await self.get_wallet_jetton_master_address(
-            address=token1_governed_address.to_string(True, True, True)
+        pool_data = GET_POOL_DATA.decode(raw_data[0] if raw_data else None)
+        asset0, asset1 = await self.get_wallet_assets(
+            pool_data.token0_address, pool_data.token1_address
         )
-        if asset0.address.to_string(True, True, True) != token0_address.to_string(
-            True, True, True
-        ):
-            asset0 = Asset(
-                _type=AssetType.JETTON,
-                address=token0_address.to_string(True, True, True),
-            )
+        pool_state = PoolState(
+            pool_address=pool_address,
+            reserve0=Reserve(asset=asset0, reserve=pool_data.reserve0),
+            reserve1=Reserve(asset=asset1, reserve=pool_data.reserve1),
+            token0_wallet_address=pool_data.token0_address,
+            token1_wallet_address=pool_data.token1_address,
+            lp_fee=pool_data.lp_fee,
+            protocol_fee=pool_data.protocol_fee,
+            ref_fee=pool_data.ref_fee,
+            protocol_fee_address=pool_data.protocol_fee_address,
+            collected_token0_protocol_fee=pool_data.collected_token0_protocol_fee,
+            collected_token1_protocol_fee=pool_data.collected_token1_protocol_fee,
+        )
+        return pool_state, self._last_transaction_lt(raw_data)
 
-        if asset1.address.to_string(True, True, True) != token1_address.to_string(
-            True, True, True
-        ):
-            asset1 = Asset(
-                _type=AssetType.JETTON,
-                address=token1_address.to_string(True, True, True),
-            )
+    async def get_pool_reserves(
+        self, pool_address: str, max_staleness: float | None = None
+    ) -> (Reserve, Reserve):
+        pool_state = await self.get_pool_state(
+            pool_address=pool_address, max_staleness=max_staleness
+        )
+        return pool_state.reserves
 
-        return Reserve(asset=asset0, reserve=Decimal(reserve0)), Reserve(
-            asset=asset1, reserve=Decimal(reserve1)
+    async def get_quote_pool(
+        self,
+        pool_address: str,
+        max_staleness: float | None = None,
+        referral: bool = False,
+    ) -> StonfiPool:
+        pool_state = await self.get_pool_state(
+            pool_address=pool_address, max_staleness=max_staleness
+        )
+        return StonfiPool.from_reserves(
+            pool_address,
+            pool_state.reserves,
+            lp_fee=pool_state.lp_fee,
+            protocol_fee=pool_state.protocol_fee,
+            ref_fee=pool_state.ref_fee if referral else 0,
         )
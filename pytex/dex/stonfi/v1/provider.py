@@ -1,4 +1,5 @@
 from decimal import Decimal
+from typing import Any
 
 from tonsdk.boc import Cell as TonSdkCell
 
@@ -16,9 +17,13 @@ from pytex.units import Asset, AssetType
 
 
 class StonfiV1Provider(Provider):
-    def __init__(self, mnemonic: list[str], toncenter_api_key: str):
-        super().__init__(mnemonic=mnemonic, toncenter_api_key=toncenter_api_key)
-        self.operator = StonfiV1Operator(toncenter_api_key=toncenter_api_key)
+    WRAPPED_TON = (pTON_ADDRESS_V1,)
+
+    def __init__(self, mnemonic: list[str], toncenter_api_key: str, **kwargs: Any):
+        super().__init__(
+            mnemonic=mnemonic, toncenter_api_key=toncenter_api_key, **kwargs
+        )
+        self.operator = StonfiV1Operator(toncenter_api_key=toncenter_api_key, **kwargs)
 
     async def _create_swap_transfer_message(
         self,
@@ -48,14 +53,14 @@ class StonfiV1Provider(Provider):
             wallet_address=offer_owner_address,
         )
 
-        swap_body = await sfv1_native_builder.build_swap_body(
+        swap_body = sfv1_native_builder.build_swap_body_sync(
             wallet_address=response_address,
             ask_jetton_wallet_address=ask_jetton_wallet_address,
             min_ask_amount=min_ask_amount,
             referral_address=referral_address,
         )
 
-        transfer_body = await sfv1_native_builder.build_jetton_transfer_body(
+        transfer_body = sfv1_native_builder.build_jetton_transfer_body_sync(
             destination_address=STONFI_ROUTER_V1,
             amount=offer_amount,
             query_id=query_id,
@@ -71,23 +76,61 @@ class StonfiV1Provider(Provider):
             "payload": transfer_body,
         }
 
+    async def _slippage_min_ask_amount(
+        self,
+        offer_asset: Asset,
+        ask_asset: Asset,
+        offer_amount: int | Decimal,
+        min_ask_amount: int,
+        max_slippage_bps: int,
+        max_staleness: float | None,
+        pool_address: str | None,
+        referral: bool,
+    ) -> int:
+        # a v1 pair has one pool, found through the router when not given
+        if pool_address is None:
+            pool_address = await self.operator.get_pool_address(offer_asset, ask_asset)
+        limits = await self.slippage_limits(
+            [pool_address],
+            offer_asset,
+            offer_amount,
+            max_slippage_bps,
+            max_staleness=max_staleness,
+            referral=referral,
+        )
+        return max(min_ask_amount, limits[-1])
+
     async def create_swap_ton_to_jetton_transfer_message(
         self,
         ask_asset: Asset,
-        offer_amount: Decimal,
+        offer_amount: int | Decimal,
         query_id: int,
         response_address: str = None,
         offer_asset: Asset = Asset(
             _type=AssetType.JETTON, address=pTON_ADDRESS_V1, decimals=9
         ),
         min_ask_amount: int = 0,
-        gas_amount: Decimal = GAS_TON_TO_JETTON.FORWARD_GAS_AMOUNT,
+        gas_amount: int | Decimal = GAS_TON_TO_JETTON.FORWARD_GAS_AMOUNT,
         referral_address: str = None,
         custom_payload: TonSdkCell | None = None,
+        pool_address: str | None = None,
+        max_slippage_bps: int | None = None,
+        max_staleness: float | None = None,
         **_
     ) -> dict[str, TonSdkCell | str | int]:
         if response_address is None:
             response_address = self.wallet_address
+        if max_slippage_bps is not None:
+            min_ask_amount = await self._slippage_min_ask_amount(
+                offer_asset=offer_asset,
+                ask_asset=ask_asset,
+                offer_amount=offer_amount,
+                min_ask_amount=min_ask_amount,
+                max_slippage_bps=max_slippage_bps,
+                max_staleness=max_staleness,
+                pool_address=pool_address,
+                referral=referral_address is not None,
+            )
         return await self._create_swap_transfer_message(
             ask_asset=ask_asset,
             offer_asset=offer_asset,
@@ -105,17 +148,31 @@ class StonfiV1Provider(Provider):
         self,
         ask_asset: Asset,
         offer_asset: Asset,
-        offer_amount: Decimal,
+        offer_amount: int | Decimal,
         query_id: int,
         response_address: str = None,
         min_ask_amount: int = 0,
-        gas_amount: Decimal = GAS_JETTON_TO_JETTON.GAS_AMOUNT,
+        gas_amount: int | Decimal = GAS_JETTON_TO_JETTON.GAS_AMOUNT,
         referral_address: str = None,
         custom_payload: TonSdkCell | None = None,
+        pool_address: str | None = None,
+        max_slippage_bps: int | None = None,
+        max_staleness: float | None = None,
         **_
     ) -> dict[str, TonSdkCell | str | int]:
         if response_address is None:
             response_address = self.wallet_address
+        if max_slippage_bps is not None:
+            min_ask_amount = await self._slippage_min_ask_amount(
+                offer_asset=offer_asset,
+                ask_asset=ask_asset,
+                offer_amount=offer_amount,
+                min_ask_amount=min_ask_amount,
+                max_slippage_bps=max_slippage_bps,
+                max_staleness=max_staleness,
+                pool_address=pool_address,
+                referral=referral_address is not None,
+            )
         return await self._create_swap_transfer_message(
             ask_asset=ask_asset,
             offer_asset=offer_asset,
@@ -133,20 +190,34 @@ class StonfiV1Provider(Provider):
     async def create_swap_jetton_to_ton_transfer_message(
         self,
         offer_asset: Asset,
-        offer_amount: Decimal,
+        offer_amount: int | Decimal,
         query_id: int,
         response_address: str = None,
         ask_asset: Asset = Asset(
             _type=AssetType.JETTON, address=pTON_ADDRESS_V1, decimals=9
         ),
         min_ask_amount: int = 0,
-        gas_amount: Decimal = GAS_JETTON_TO_TON.GAS_AMOUNT,
+        gas_amount: int | Decimal = GAS_JETTON_TO_TON.GAS_AMOUNT,
         referral_address: str = None,
         custom_payload: TonSdkCell | None = None,
+        pool_address: str | None = None,
+        max_slippage_bps: int | None = None,
+        max_staleness: float | None = None,
         **_
     ) -> dict[str, TonSdkCell | str | int]:
         if response_address is None:
             response_address = self.wallet_address
+        if max_slippage_bps is not None:
+            min_ask_amount = await self._slippage_min_ask_amount(
+                offer_asset=offer_asset,
+                ask_asset=ask_asset,
+                offer_amount=offer_amount,
+                min_ask_amount=min_ask_amount,
+                max_slippage_bps=max_slippage_bps,
+                max_staleness=max_staleness,
+                pool_address=pool_address,
+                referral=referral_address is not None,
+            )
         return await self._create_swap_transfer_message(
             ask_asset=ask_asset,
             offer_asset=offer_asset,
@@ -0,0 +1,22 @@
+from pytex.stack import StackSchema, address, num
+
+GET_POOL_DATA = StackSchema(
+    "get_pool_data",
+    reserve0=num,
+    reserve1=num,
+    token0_address=address,
+    token1_address=address,
+    lp_fee=num,
+    protocol_fee=num,
+    ref_fee=num,
+    protocol_fee_address=address,
+    collected_token0_protocol_fee=num,
+    collected_token1_protocol_fee=num,
+)
+
+GET_POOL_ADDRESS = StackSchema("get_pool_address", pool_address=address)
+
+# the pool contract's own quote, used to record reference swaps
+GET_EXPECTED_OUTPUTS = StackSchema(
+    "get_expected_outputs", out=num, protocol_fee_out=num, ref_fee_out=num
+)
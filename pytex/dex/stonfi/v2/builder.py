@@ -1,6 +1,8 @@
-from tonsdk.utils import Address as TonSdkAddress
+from typing import Sequence
+
 from tonsdk.boc import Cell as TonSdkCell, Cell
 
+from pytex.dex.base_builder import address, asynchronous
 from pytex.dex.stonfi.builder import StonfiBuilder
 from pytex.dex.stonfi.v2.constants import (
     pTON_ADDRESS_V2,
@@ -80,7 +82,7 @@ class SwapChain:
 
 class StonfiV2Builder(StonfiBuilder):
     @staticmethod
-    async def build_cross_swap_custom_payload(
+    def build_cross_swap_custom_payload_sync(
         other_token_wallet: str,
         deadline: int,
         refund_address: str | None = None,
@@ -89,15 +91,19 @@ class StonfiV2Builder(StonfiBuilder):
     ):
         custom_payload: TonSdkCell = TonSdkCell()
         custom_payload.bits.write_uint(0x69CF1A5B, 32)  # cross swap op code
-        custom_payload.bits.write_address(TonSdkAddress(other_token_wallet))
-        custom_payload.bits.write_address(TonSdkAddress(refund_address))
-        custom_payload.bits.write_address(TonSdkAddress(excess_address))
+        custom_payload.bits.write_address(address(other_token_wallet))
+        custom_payload.bits.write_address(address(refund_address))
+        custom_payload.bits.write_address(address(excess_address))
         custom_payload.bits.write_uint(deadline, 64)
         custom_payload.refs.append(additional_data)
         return custom_payload
 
+    build_cross_swap_custom_payload = staticmethod(
+        asynchronous(build_cross_swap_custom_payload_sync)
+    )
+
     @staticmethod
-    async def build_additional_data(
+    def build_additional_data_sync(
         min_out: int,
         receiver_address: str,
         fwd_gas: int = 0,
@@ -110,7 +116,7 @@ class StonfiV2Builder(StonfiBuilder):
         cross_swap_body = TonSdkCell()
         # cross_swap_body.bits.write_uint(min_out, 32)
         cross_swap_body.bits.write_coins(min_out)
-        cross_swap_body.bits.write_address(TonSdkAddress(receiver_address))
+        cross_swap_body.bits.write_address(address(receiver_address))
         cross_swap_body.bits.write_coins(fwd_gas)
 
         if custom_payload is None:
@@ -132,12 +138,14 @@ class StonfiV2Builder(StonfiBuilder):
         if referral_address is None:
             cross_swap_body.bits.write_address(None)  # null referral address
         else:
-            cross_swap_body.bits.write_address(TonSdkAddress(referral_address))
+            cross_swap_body.bits.write_address(address(referral_address))
 
         return cross_swap_body
 
+    build_additional_data = staticmethod(asynchronous(build_additional_data_sync))
+
     @staticmethod
-    async def build_swap_body(
+    def build_swap_body_sync(
         ask_jetton_wallet_address: str,  # stonfi router jetton wallet address
         refund_address: str,
         excesses_address: str,
@@ -146,15 +154,17 @@ class StonfiV2Builder(StonfiBuilder):
     ) -> TonSdkCell:
         swap_body: TonSdkCell = TonSdkCell()
         swap_body.bits.write_uint(0x6664DE2A, 32)  # swap op code
-        swap_body.bits.write_address(TonSdkAddress(ask_jetton_wallet_address))
-        swap_body.bits.write_address(TonSdkAddress(refund_address))
-        swap_body.bits.write_address(TonSdkAddress(excesses_address))
+        swap_body.bits.write_address(address(ask_jetton_wallet_address))
+        swap_body.bits.write_address(address(refund_address))
+        swap_body.bits.write_address(address(excesses_address))
         swap_body.bits.write_uint(deadline, 64)
         swap_body.refs.append(additional_data)
 
         return swap_body
 
-    async def insert_cross_swap_step(
+    build_swap_body = staticmethod(asynchronous(build_swap_body_sync))
+
+    def insert_cross_swap_step_sync(
         self,
         swap_step,
         receiver_address: str,
@@ -169,7 +179,7 @@ class StonfiV2Builder(StonfiBuilder):
         excesses_address: str,
         deadline: int,
     ):
-        swap_additional_data = await self.build_additional_data(
+        swap_additional_data = self.build_additional_data_sync(
             min_out=swap_step.min_ask_amount or min_ask_amount,
             receiver_address=receiver_address,
             fwd_gas=swap_step.fulfill_gas or fulfill_gas,
@@ -180,7 +190,7 @@ class StonfiV2Builder(StonfiBuilder):
             referral_address=swap_step.referral_address or referral_address,
         )
 
-        cross_swap_payload = await self.build_cross_swap_custom_payload(
+        cross_swap_payload = self.build_cross_swap_custom_payload_sync(
             other_token_wallet=swap_step.router_ask_jetton_wallet_address,
             deadline=swap_step.deadline or deadline,
             refund_address=swap_step.refund_address or refund_address,
@@ -190,7 +200,9 @@ class StonfiV2Builder(StonfiBuilder):
 
         return cross_swap_payload
 
-    async def insert_swap_step(
+    insert_cross_swap_step = asynchronous(insert_cross_swap_step_sync)
+
+    def insert_swap_step_sync(
         self,
         swap_step,
         receiver_address: str,
@@ -205,7 +217,7 @@ class StonfiV2Builder(StonfiBuilder):
         excesses_address: str,
         deadline: int,
     ):
-        swap_additional_data = await self.build_additional_data(
+        swap_additional_data = self.build_additional_data_sync(
             min_out=swap_step.min_ask_amount or min_ask_amount,
             receiver_address=receiver_address,
             fwd_gas=swap_step.fulfill_gas or fulfill_gas,
@@ -216,7 +228,7 @@ class StonfiV2Builder(StonfiBuilder):
             referral_address=swap_step.referral_address or referral_address,
         )
 
-        swap_body = await self.build_swap_body(
+        swap_body = self.build_swap_body_sync(
             ask_jetton_wallet_address=swap_step.router_ask_jetton_wallet_address,
             refund_address=swap_step.refund_address or refund_address,
             excesses_address=swap_step.excesses_address or excesses_address,
@@ -226,7 +238,9 @@ class StonfiV2Builder(StonfiBuilder):
 
         return swap_body
 
-    async def pack_swap_steps(
+    insert_swap_step = asynchronous(insert_swap_step_sync)
+
+    def pack_swap_steps_sync(
         self,
         swap_chain: SwapChain,
         response_address: str,
@@ -250,7 +264,7 @@ class StonfiV2Builder(StonfiBuilder):
                 swap_step.prev is not None
                 and swap_step.router_address == swap_step.prev.router_address
             ):
-                swap_body = await self.insert_cross_swap_step(
+                swap_body = self.insert_cross_swap_step_sync(
                     swap_step=swap_step,
                     receiver_address=response_address,
                     min_ask_amount=min_ask_amount,
@@ -288,7 +302,7 @@ class StonfiV2Builder(StonfiBuilder):
                         fg = GAS_TON_TO_JETTON.FORWARD_GAS_AMOUNT
                     else:
                         fg = GAS_JETTON_TO_JETTON.FORWARD_GAS_AMOUNT
-                swap_body = await self.insert_swap_step(
+                swap_body = self.insert_swap_step_sync(
                     swap_step=swap_step,
                     receiver_address=receiver_address,
                     min_ask_amount=min_ask_amount,
@@ -307,3 +321,61 @@ class StonfiV2Builder(StonfiBuilder):
                 break
             swap_step = swap_step.prev
         return swap_body, full_forward_gas
+
+    pack_swap_steps = asynchronous(pack_swap_steps_sync)
+
+    @classmethod
+    def build_swap_payloads_sync(
+        cls,
+        router_address: str,
+        ask_jetton_wallet_address: str,
+        amounts: Sequence[int],
+        min_outs: Sequence[int],
+        query_ids: Sequence[int],
+        receivers: Sequence[str],
+        deadline: int,
+        forward_amount: int = 0,
+        offer_ton: bool = False,
+        fulfill_gas: int = 0,
+        referral_gas: int = 0,
+        referral_address: str | None = None,
+    ) -> list[TonSdkCell]:
+        # pTON transfer bodies if offer_ton, else jetton transfer bodies to
+        # the router, one per order refunded to its receiver
+        ask_jetton_wallet = address(ask_jetton_wallet_address)
+        referral = address(referral_address)
+        swap_bodies = []
+        for min_out, receiver in zip(min_outs, receivers, strict=True):
+            receiver = address(receiver)
+            additional_data = cls.build_additional_data_sync(
+                min_out=min_out,
+                receiver_address=receiver,
+                fwd_gas=fulfill_gas,
+                ref_fee=referral_gas,
+                referral_address=referral,
+            )
+            swap_bodies.append(
+                cls.build_swap_body_sync(
+                    ask_jetton_wallet_address=ask_jetton_wallet,
+                    refund_address=receiver,
+                    excesses_address=receiver,
+                    additional_data=additional_data,
+                    deadline=deadline,
+                )
+            )
+
+        if offer_ton:
+            return cls.build_pton_transfer_bodies_sync(
+                ton_amounts=amounts,
+                query_ids=query_ids,
+                refund_addresses=receivers,
+                forward_payloads=swap_bodies,
+            )
+        return cls.build_jetton_transfer_bodies_sync(
+            destination_address=router_address,
+            amounts=amounts,
+            query_ids=query_ids,
+            response_addresses=receivers,
+            forward_payloads=swap_bodies,
+            forward_amount=forward_amount,
+        )
@@ -1,19 +1,17 @@
-from decimal import Decimal
-
 pTON_ADDRESS_V2 = "EQBnGWMCf3-FZZq1W4IWcWiGAc3PHuZ0_H-7sad2oY00o83S"
 
 
 class GAS_JETTON_TO_JETTON:
-    GAS_AMOUNT = Decimal("300000000")
-    TRANSFER_FAS = Decimal("60000000")
-    FORWARD_GAS_AMOUNT = Decimal("240000000")
+    GAS_AMOUNT = 300_000_000
+    TRANSFER_FAS = 60_000_000
+    FORWARD_GAS_AMOUNT = 240_000_000
 
 
 class GAS_JETTON_TO_TON:
-    GAS_AMOUNT = Decimal("300000000")
-    TRANSFER_FAS = Decimal("60000000")
-    FORWARD_GAS_AMOUNT = Decimal("240000000")
+    GAS_AMOUNT = 300_000_000
+    TRANSFER_FAS = 60_000_000
+    FORWARD_GAS_AMOUNT = 240_000_000
 
 
 class GAS_TON_TO_JETTON:
-    FORWARD_GAS_AMOUNT = Decimal("300000000")
+    FORWARD_GAS_AMOUNT = 300_000_000
@@ -1,86 +1,141 @@
-import base64
-from decimal import Decimal
+from typing import Any
 
 from tonsdk.utils import Address as TonSdkAddress
-from tonsdk.boc import Cell as TonSdkCell
 
+from pytex.dex.quote import StonfiPool, StonfiStablePool
 from pytex.dex.stonfi.op import StonfiOperator
-from pytex.exceptions import OperatorError
-from pytex.units import Asset, AssetType, Reserve
+from pytex.dex.stonfi.v2.schemas import GET_POOL_DATA
+from pytex.state_init import parse_address
+from pytex.units import Reserve
+
+
+class PoolState:
+    def __init__(
+        self,
+        pool_address: str,
+        router_address: str,
+        reserve0: Reserve,
+        reserve1: Reserve,
+        token0_wallet_address: str,
+        token1_wallet_address: str,
+        lp_fee: int,
+        protocol_fee: int,
+        protocol_fee_address: str | None,
+        collected_token0_protocol_fee: int,
+        collected_token1_protocol_fee: int,
+        lp_total_supply: int,
+        is_locked: bool,
+        amp: int | None = None,
+    ):
+        self.pool_address = pool_address
+        self.router_address = router_address
+        self.reserve0 = reserve0
+        self.reserve1 = reserve1
+        # router jetton wallets of the pool tokens
+        self.token0_wallet_address = token0_wallet_address
+        self.token1_wallet_address = token1_wallet_address
+        self.lp_fee = lp_fee
+        self.protocol_fee = protocol_fee
+        self.protocol_fee_address = protocol_fee_address
+        self.collected_token0_protocol_fee = collected_token0_protocol_fee
+        self.collected_token1_protocol_fee = collected_token1_protocol_fee
+        self.lp_total_supply = lp_total_supply
+        self.is_locked = is_locked
+        # amplification of stableswap pools, None for constant product
+        self.amp = amp
+
+    @property
+    def reserves(self) -> tuple[Reserve, Reserve]:
+        return self.reserve0, self.reserve1
 
 
 class StonfiV2Operator(StonfiOperator):
-    def __init__(self, toncenter_api_key: str):
-        super().__init__(toncenter_api_key)
+    MULTI_SWAP = True
 
-    async def get_pool_reserves(self, pool_address: str) -> (Decimal, Decimal):
-        asset0 = Asset(_type=AssetType.NATIVE)
-        asset1 = Asset(_type=AssetType.NATIVE)
+    def __init__(self, toncenter_api_key: str, **kwargs: Any):
+        super().__init__(toncenter_api_key, **kwargs)
+        # pool address -> router address, fixed at pool deploy
+        self.pool_routers = self.cache.namespace("stonfi_v2_pool_router")
 
-        raw_get_pool_data = self.client.raw_run_method(
-            method="get_pool_data", address=pool_address, stack_data=[]
+    async def get_pool_state(
+        self, pool_address: str, max_staleness: float | None = None
+    ) -> PoolState:
+        return await self.read_pool_state(
+            pool_address,
+            lambda: self.fetch_pool_state(pool_address),
+            max_staleness=max_staleness,
         )
-        raw_data = await self.run_ex(to_run=raw_get_pool_data)
-        if raw_data is None:
-            raise OperatorError(f"run get_wallet_data")
-        try:
-            reserve0 = int(raw_data[0].get("stack")[3][1], 16)
-            reserve1 = int(raw_data[0].get("stack")[4][1], 16)
-        except Exception as e:
-            raise OperatorError(f"parse reserve | raw_data: {raw_data} -> {e}")
-
-        try:
-            b64_bytes_str = raw_data[0].get("stack")[5][1].get("bytes")
-            token0_governed_address: TonSdkAddress = self._read_address(
-                TonSdkCell.one_from_boc(base64.b64decode(b64_bytes_str))
-            )
 
-            b64_bytes_str = raw_data[0].get("stack")[6][1].get("bytes")
-            token1_governed_address: TonSdkAddress = self._read_address(
-                TonSdkCell.one_from_boc(base64.b64decode(b64_bytes_str))
-            )
-        except Exception as e:
-            raise OperatorError(f"_read_address | raw_data: {raw_data} -> {e}")
+    async def fetch_pool_state(self, pool_address: str) -> tuple[PoolState, int | None]:
+        raw_data = await self.run_ex(
+            to_run=GET_POOL_DATA.task(self.client, pool_address)
+        )
+        pool_data = GET_POOL_DATA.decode(raw_data[0] if raw_data else None)
 
-        token0_address = await self.get_wallet_jetton_master_address(
-            address=token0_governed_address.to_string(True, True, True)
+        asset0, asset1 = await self.get_wallet_assets(
+            pool_data.token0_wallet_address, pool_data.token1_wallet_address
         )
-        token1_address = await self.get_wallet_jetton_master_address(
-            address=token1_governed_address.to_string(True, True, True)
+        self.pool_routers[parse_address(pool_address).to_string(False)] = (
+            pool_data.router_address
         )
-        if asset0.address.to_string(True, True, True) != token0_address.to_string(
-            True, True, True
-        ):
-            asset0 = Asset(
-                _type=AssetType.JETTON,
-                address=token0_address.to_string(True, True, True),
-            )
+        pool_state = PoolState(
+            pool_address=pool_address,
+            router_address=pool_data.router_address,
+            reserve0=Reserve(asset=asset0, reserve=pool_data.reserve0),
+            reserve1=Reserve(asset=asset1, reserve=pool_data.reserve1),
+            token0_wallet_address=pool_data.token0_wallet_address,
+            token1_wallet_address=pool_data.token1_wallet_address,
+            lp_fee=pool_data.lp_fee,
+            protocol_fee=pool_data.protocol_fee,
+            protocol_fee_address=pool_data.protocol_fee_address,
+            collected_token0_protocol_fee=pool_data.collected_token0_protocol_fee,
+            collected_token1_protocol_fee=pool_data.collected_token1_protocol_fee,
+            lp_total_supply=pool_data.total_supply,
+            is_locked=pool_data.is_locked,
+            amp=pool_data.amp,
+        )
+        return pool_state, self._last_transaction_lt(raw_data)
 
-        if asset1.address.to_string(True, True, True) != token1_address.to_string(
-            True, True, True
-        ):
-            asset1 = Asset(
-                _type=AssetType.JETTON,
-                address=token1_address.to_string(True, True, True),
-            )
+    async def get_pool_reserves(
+        self, pool_address: str, max_staleness: float | None = None
+    ) -> (Reserve, Reserve):
+        pool_state = await self.get_pool_state(
+            pool_address=pool_address, max_staleness=max_staleness
+        )
+        return pool_state.reserves
 
-        return Reserve(asset=asset0, reserve=Decimal(reserve0)), Reserve(
-            asset=asset1, reserve=Decimal(reserve1)
+    async def get_quote_pool(
+        self,
+        pool_address: str,
+        max_staleness: float | None = None,
+        ref_fee: int = 0,
+    ) -> StonfiPool:
+        # ref_fee is set per swap in v2, in basis points
+        pool_state = await self.get_pool_state(
+            pool_address=pool_address, max_staleness=max_staleness
+        )
+        if pool_state.amp is not None:
+            return StonfiStablePool.from_reserves(
+                pool_address,
+                pool_state.reserves,
+                lp_fee=pool_state.lp_fee,
+                protocol_fee=pool_state.protocol_fee,
+                ref_fee=ref_fee,
+                amp=pool_state.amp,
+            )
+        return StonfiPool.from_reserves(
+            pool_address,
+            pool_state.reserves,
+            lp_fee=pool_state.lp_fee,
+            protocol_fee=pool_state.protocol_fee,
+            ref_fee=ref_fee,
         )
 
     async def get_router_address(self, pool_address: str) -> TonSdkAddress:
-        raw_get_pool_data = self.client.raw_run_method(
-            method="get_pool_data", address=pool_address, stack_data=[]
+        router_address = self.pool_routers.get(
+            parse_address(pool_address).to_string(False)
         )
-
-        raw_data = await self.run_ex(to_run=raw_get_pool_data)
-        if raw_data is None:
-            raise OperatorError(f"run get_wallet_data")
-
-        jeton_address_b64 = raw_data[0].get("stack")[1][1].get("bytes")
-        cell = TonSdkCell.one_from_boc(base64.b64decode(jeton_address_b64))
-        try:
-            jetton_address = self._read_address(cell)
-        except Exception as e:
-            raise OperatorError(f"_read_address | raw_data: {raw_data} -> {e}")
-        return jetton_address
+        if router_address is None:
+            pool_state = await self.get_pool_state(pool_address=pool_address)
+            router_address = pool_state.router_address
+        return TonSdkAddress(router_address)
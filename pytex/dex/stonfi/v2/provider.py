@@ -1,5 +1,7 @@
+import asyncio
 from datetime import datetime, timedelta
 from decimal import Decimal
+from typing import Any
 
 from tonsdk.boc import Cell as TonSdkCell
 
@@ -16,9 +18,23 @@ from pytex.units import Asset, AssetType, TON_ZERO_ADDRESS
 
 
 class StonfiV2Provider(Provider):
-    def __init__(self, mnemonic: list[str], toncenter_api_key: str):
-        super().__init__(mnemonic=mnemonic, toncenter_api_key=toncenter_api_key)
-        self.operator = StonfiV2Operator(toncenter_api_key=toncenter_api_key)
+    WRAPPED_TON = (pTON_ADDRESS_V2,)
+
+    def __init__(self, mnemonic: list[str], toncenter_api_key: str, **kwargs: Any):
+        super().__init__(
+            mnemonic=mnemonic, toncenter_api_key=toncenter_api_key, **kwargs
+        )
+        self.operator = StonfiV2Operator(toncenter_api_key=toncenter_api_key, **kwargs)
+
+    @staticmethod
+    def referral_fee(
+        referral_gas: int | Decimal | None, referral_address: str | None
+    ) -> int:
+        # referral_gas is the per swap ref_fee, taken only with a referral
+        # address and capped as build_additional_data_sync writes it
+        if referral_address is None or referral_gas is None:
+            return 0
+        return min(100, max(int(referral_gas), 0))
 
     async def _create_ton_swap_transfer_message(
         self,
@@ -56,7 +72,7 @@ class StonfiV2Provider(Provider):
             wallet_address=router_address.to_string(True, True, True),
         )
 
-        additional_data = await sfv2_native_builder.build_additional_data(
+        additional_data = sfv2_native_builder.build_additional_data_sync(
             min_out=min_ask_amount,
             receiver_address=response_address,
             fwd_gas=fulfill_gas,
@@ -67,7 +83,7 @@ class StonfiV2Provider(Provider):
             referral_address=referral_address,
         )
 
-        swap_body = await sfv2_native_builder.build_swap_body(
+        swap_body = sfv2_native_builder.build_swap_body_sync(
             ask_jetton_wallet_address=ask_jetton_wallet_address,
             refund_address=refund_address or response_address,
             excesses_address=excesses_address or response_address,
@@ -75,7 +91,7 @@ class StonfiV2Provider(Provider):
             additional_data=additional_data,
         )
 
-        transfer_body = await sfv2_native_builder.build_pton_transfer_body(
+        transfer_body = sfv2_native_builder.build_pton_transfer_body_sync(
             ton_amount=offer_amount,
             query_id=query_id,
             refund_address=response_address,
@@ -125,7 +141,7 @@ class StonfiV2Provider(Provider):
             wallet_address=response_address,
         )
 
-        additional_data = await sfv2_native_builder.build_additional_data(
+        additional_data = sfv2_native_builder.build_additional_data_sync(
             min_out=min_ask_amount,
             receiver_address=response_address,
             fwd_gas=fulfill_gas,
@@ -136,7 +152,7 @@ class StonfiV2Provider(Provider):
             referral_address=referral_address,
         )
 
-        swap_body = await sfv2_native_builder.build_swap_body(
+        swap_body = sfv2_native_builder.build_swap_body_sync(
             ask_jetton_wallet_address=ask_jetton_wallet_address,
             refund_address=refund_address or response_address,
             excesses_address=excesses_address or response_address,
@@ -144,7 +160,7 @@ class StonfiV2Provider(Provider):
             additional_data=additional_data,
         )
 
-        transfer_body = await sfv2_native_builder.build_jetton_transfer_body(
+        transfer_body = sfv2_native_builder.build_jetton_transfer_body_sync(
             destination_address=router_address.to_string(True, True, True),
             amount=offer_amount,
             query_id=query_id,
@@ -159,6 +175,75 @@ class StonfiV2Provider(Provider):
             "payload": transfer_body,
         }
 
+    async def build_swap_chain(
+        self,
+        pool_addresses: list[str],
+        offer_asset: Asset,
+        min_ask_amount: int,
+        deadline: int,
+        min_ask_amounts: list[int] | None = None,
+    ) -> SwapChain:
+        # min_ask_amounts limits every hop, min_ask_amount all of them else
+        swap_chain = SwapChain()
+        pool_states = await asyncio.gather(
+            *(
+                self.operator.get_pool_state(pool_address)
+                for pool_address in pool_addresses
+            )
+        )
+        for i, pool_state in enumerate(pool_states):
+            reserve0, reserve1 = pool_state.reserves
+
+            pool_asset0_address = (
+                pTON_ADDRESS_V2
+                if reserve0.asset.address.to_string(True, True, True)
+                == TON_ZERO_ADDRESS
+                else reserve0.asset.address.to_string(True, True, True)
+            )
+            pool_asset1_address = (
+                pTON_ADDRESS_V2
+                if reserve1.asset.address.to_string(True, True, True)
+                == TON_ZERO_ADDRESS
+                else reserve1.asset.address.to_string(True, True, True)
+            )
+
+            if swap_chain.head is None:
+                prev_ask_asset_address = offer_asset.address.to_string(True, True, True)
+            else:
+                prev_ask_asset_address = swap_chain.head.ask_jetton_address
+
+            # the pool token wallets are the router jetton wallets
+            if prev_ask_asset_address == pool_asset0_address:
+                offer_jetton_address = pool_asset0_address
+                ask_jetton_address = pool_asset1_address
+                router_offer_jetton_wallet_address = pool_state.token0_wallet_address
+                router_ask_jetton_wallet_address = pool_state.token1_wallet_address
+            elif prev_ask_asset_address == pool_asset1_address:
+                offer_jetton_address = pool_asset1_address
+                ask_jetton_address = pool_asset0_address
+                router_offer_jetton_wallet_address = pool_state.token1_wallet_address
+                router_ask_jetton_wallet_address = pool_state.token0_wallet_address
+            else:
+                raise ValueError("Wrong assets")
+
+            if offer_jetton_address != pTON_ADDRESS_V2:
+                router_offer_jetton_wallet_address = None
+
+            swap_step = SwapStep(
+                pool_address=pool_state.pool_address,
+                router_address=pool_state.router_address,
+                offer_jetton_address=prev_ask_asset_address,
+                ask_jetton_address=ask_jetton_address,
+                router_offer_jetton_wallet_address=router_offer_jetton_wallet_address,
+                router_ask_jetton_wallet_address=router_ask_jetton_wallet_address,
+                min_ask_amount=(
+                    min_ask_amount if min_ask_amounts is None else min_ask_amounts[i]
+                ),
+                deadline=deadline,
+            )
+            swap_chain.push(swap_step)
+        return swap_chain
+
     async def _create_ton_multi_swap_transfer_message_ex(
         self,
         swap_chain: SwapChain,
@@ -180,7 +265,7 @@ class StonfiV2Provider(Provider):
     ) -> dict[str, TonSdkCell | str | int]:
         sfv2_builder = StonfiV2Builder()
 
-        swap_body, full_forward_gas = await sfv2_builder.pack_swap_steps(
+        swap_body, full_forward_gas = sfv2_builder.pack_swap_steps_sync(
             swap_chain=swap_chain,
             response_address=response_address,
             min_ask_amount=min_ask_amount,
@@ -196,13 +281,14 @@ class StonfiV2Provider(Provider):
         )
 
         offer_router_pton_wallet_address = (
-            await self.operator.get_jetton_wallet_address(
+            swap_chain.tail.router_offer_jetton_wallet_address
+            or await self.operator.get_jetton_wallet_address(
                 jetton_master_address=offer_asset.address.to_string(True, True, True),
                 wallet_address=swap_chain.tail.router_address,
             )
         )
 
-        transfer_body = await sfv2_builder.build_pton_transfer_body(
+        transfer_body = sfv2_builder.build_pton_transfer_body_sync(
             ton_amount=offer_amount,
             query_id=query_id,
             refund_address=response_address,
@@ -233,69 +319,15 @@ class StonfiV2Provider(Provider):
         fulfill_payload: TonSdkCell | None = None,
         reject_gas: int = 0,
         reject_payload: TonSdkCell | None = None,
+        min_ask_amounts: list[int] | None = None,
     ) -> dict[str, TonSdkCell | str | int]:
-        swap_chain = SwapChain()
-        for pool_address in pool_addresses:
-            router_address = await self.operator.get_router_address(
-                pool_address=pool_address
-            )
-            reserve0, reserve1 = await self.operator.get_pool_reserves(
-                pool_address=pool_address
-            )
-
-            pool_asset0_address = (
-                pTON_ADDRESS_V2
-                if reserve0.asset.address.to_string(True, True, True)
-                == TON_ZERO_ADDRESS
-                else reserve0.asset.address.to_string(True, True, True)
-            )
-            pool_asset1_address = (
-                pTON_ADDRESS_V2
-                if reserve1.asset.address.to_string(True, True, True)
-                == TON_ZERO_ADDRESS
-                else reserve1.asset.address.to_string(True, True, True)
-            )
-
-            if swap_chain.head is None:
-                prev_ask_asset_address = offer_asset.address.to_string(True, True, True)
-            else:
-                prev_ask_asset_address = swap_chain.head.ask_jetton_address
-
-            if prev_ask_asset_address == pool_asset0_address:
-                offer_jetton_address = pool_asset0_address
-                ask_jetton_address = pool_asset1_address
-            elif prev_ask_asset_address == pool_asset1_address:
-                offer_jetton_address = pool_asset1_address
-                ask_jetton_address = pool_asset0_address
-            else:
-                raise ValueError("Wrong assets")
-
-            router_offer_jetton_wallet_address = None
-            if offer_jetton_address == pTON_ADDRESS_V2:
-                router_offer_jetton_wallet_address = (
-                    await self.operator.get_jetton_wallet_address(
-                        jetton_master_address=offer_jetton_address,
-                        wallet_address=router_address.to_string(True, True, True),
-                    )
-                )
-
-            router_ask_jetton_wallet_address = (
-                await self.operator.get_jetton_wallet_address(
-                    jetton_master_address=ask_jetton_address,
-                    wallet_address=router_address.to_string(True, True, True),
-                )
-            )
-            swap_step = SwapStep(
-                pool_address=pool_address,
-                router_address=router_address.to_string(True, True, True),
-                offer_jetton_address=prev_ask_asset_address,
-                ask_jetton_address=ask_jetton_address,
-                router_offer_jetton_wallet_address=router_offer_jetton_wallet_address,
-                router_ask_jetton_wallet_address=router_ask_jetton_wallet_address,
-                min_ask_amount=min_ask_amount,
-                deadline=deadline,
-            )
-            swap_chain.push(swap_step)
+        swap_chain = await self.build_swap_chain(
+            pool_addresses=pool_addresses,
+            offer_asset=offer_asset,
+            min_ask_amount=min_ask_amount,
+            deadline=deadline,
+            min_ask_amounts=min_ask_amounts,
+        )
 
         return await self._create_ton_multi_swap_transfer_message_ex(
             swap_chain=swap_chain,
@@ -338,7 +370,7 @@ class StonfiV2Provider(Provider):
     ) -> dict[str, TonSdkCell | str | int]:
         sfv2_builder = StonfiV2Builder()
 
-        swap_body, full_forward_gas = await sfv2_builder.pack_swap_steps(
+        swap_body, full_forward_gas = sfv2_builder.pack_swap_steps_sync(
             swap_chain=swap_chain,
             response_address=response_address,
             min_ask_amount=min_ask_amount,
@@ -353,7 +385,7 @@ class StonfiV2Provider(Provider):
             reject_payload=reject_payload,
         )
 
-        transfer_body = await sfv2_builder.build_jetton_transfer_body(
+        transfer_body = sfv2_builder.build_jetton_transfer_body_sync(
             destination_address=swap_chain.tail.router_address,
             amount=offer_amount,
             query_id=query_id,
@@ -397,69 +429,15 @@ class StonfiV2Provider(Provider):
         fulfill_payload: TonSdkCell | None = None,
         reject_gas: int = 0,
         reject_payload: TonSdkCell | None = None,
+        min_ask_amounts: list[int] | None = None,
     ) -> dict[str, TonSdkCell | str | int]:
-        swap_chain = SwapChain()
-        for pool_address in pool_addresses:
-            router_address = await self.operator.get_router_address(
-                pool_address=pool_address
-            )
-            reserve0, reserve1 = await self.operator.get_pool_reserves(
-                pool_address=pool_address
-            )
-
-            pool_asset0_address = (
-                pTON_ADDRESS_V2
-                if reserve0.asset.address.to_string(True, True, True)
-                == TON_ZERO_ADDRESS
-                else reserve0.asset.address.to_string(True, True, True)
-            )
-            pool_asset1_address = (
-                pTON_ADDRESS_V2
-                if reserve1.asset.address.to_string(True, True, True)
-                == TON_ZERO_ADDRESS
-                else reserve1.asset.address.to_string(True, True, True)
-            )
-
-            if swap_chain.head is None:
-                prev_ask_asset_address = offer_asset.address.to_string(True, True, True)
-            else:
-                prev_ask_asset_address = swap_chain.head.ask_jetton_address
-
-            if prev_ask_asset_address == pool_asset0_address:
-                offer_jetton_address = pool_asset0_address
-                ask_jetton_address = pool_asset1_address
-            elif prev_ask_asset_address == pool_asset1_address:
-                offer_jetton_address = pool_asset1_address
-                ask_jetton_address = pool_asset0_address
-            else:
-                raise ValueError("Wrong assets")
-
-            router_offer_jetton_wallet_address = None
-            if offer_jetton_address == pTON_ADDRESS_V2:
-                router_offer_jetton_wallet_address = (
-                    await self.operator.get_jetton_wallet_address(
-                        jetton_master_address=offer_jetton_address,
-                        wallet_address=router_address.to_string(True, True, True),
-                    )
-                )
-
-            router_ask_jetton_wallet_address = (
-                await self.operator.get_jetton_wallet_address(
-                    jetton_master_address=ask_jetton_address,
-                    wallet_address=router_address.to_string(True, True, True),
-                )
-            )
-            swap_step = SwapStep(
-                pool_address=pool_address,
-                router_address=router_address.to_string(True, True, True),
-                offer_jetton_address=prev_ask_asset_address,
-                ask_jetton_address=ask_jetton_address,
-                router_offer_jetton_wallet_address=router_offer_jetton_wallet_address,
-                router_ask_jetton_wallet_address=router_ask_jetton_wallet_address,
-                min_ask_amount=min_ask_amount,
-                deadline=deadline,
-            )
-            swap_chain.push(swap_step)
+        swap_chain = await self.build_swap_chain(
+            pool_addresses=pool_addresses,
+            offer_asset=offer_asset,
+            min_ask_amount=min_ask_amount,
+            deadline=deadline,
+            min_ask_amounts=min_ask_amounts,
+        )
 
         return await self._create_jetton_multi_swap_transfer_message_ex(
             swap_chain=swap_chain,
@@ -485,7 +463,7 @@ class StonfiV2Provider(Provider):
         self,
         pool_address: str,
         ask_asset: Asset,
-        offer_amount: Decimal,
+        offer_amount: int | Decimal,
         query_id: int,
         deadline: datetime | None = None,
         response_address: str = None,
@@ -493,19 +471,31 @@ class StonfiV2Provider(Provider):
             _type=AssetType.JETTON, address=pTON_ADDRESS_V2, decimals=9
         ),
         min_ask_amount: int = 0,
-        gas_amount: Decimal = GAS_TON_TO_JETTON.FORWARD_GAS_AMOUNT,
+        gas_amount: int | Decimal = GAS_TON_TO_JETTON.FORWARD_GAS_AMOUNT,
         refund_address: str | None = None,
         excesses_address: str | None = None,
-        referral_gas: Decimal | None = None,
+        referral_gas: int | Decimal | None = None,
         referral_address: str = None,
-        fulfill_gas: Decimal | None = None,
+        fulfill_gas: int | Decimal | None = None,
         fulfill_payload: TonSdkCell | None = None,
-        reject_gas: Decimal | None = None,
+        reject_gas: int | Decimal | None = None,
         reject_payload: TonSdkCell | None = None,
+        max_slippage_bps: int | None = None,
+        max_staleness: float | None = None,
         **_,
     ) -> dict[str, TonSdkCell | str | int]:
         if response_address is None:
             response_address = self.wallet_address
+        if max_slippage_bps is not None:
+            limits = await self.slippage_limits(
+                [pool_address],
+                offer_asset,
+                offer_amount,
+                max_slippage_bps,
+                max_staleness=max_staleness,
+                ref_fee=self.referral_fee(referral_gas, referral_address),
+            )
+            min_ask_amount = max(min_ask_amount, limits[-1])
         return await self._create_ton_swap_transfer_message(
             pool_address=pool_address,
             ask_asset=ask_asset,
@@ -535,24 +525,36 @@ class StonfiV2Provider(Provider):
         pool_address: str,
         ask_asset: Asset,
         offer_asset: Asset,
-        offer_amount: Decimal,
+        offer_amount: int | Decimal,
         query_id: int,
         deadline: datetime | None = None,
         response_address: str = None,
         min_ask_amount: int = 0,
-        gas_amount: Decimal = GAS_JETTON_TO_JETTON.GAS_AMOUNT,
+        gas_amount: int | Decimal = GAS_JETTON_TO_JETTON.GAS_AMOUNT,
         refund_address: str | None = None,
         excesses_address: str | None = None,
-        referral_gas: Decimal | None = None,
+        referral_gas: int | Decimal | None = None,
         referral_address: str = None,
-        fulfill_gas: Decimal | None = None,
+        fulfill_gas: int | Decimal | None = None,
         fulfill_payload: TonSdkCell | None = None,
-        reject_gas: Decimal | None = None,
+        reject_gas: int | Decimal | None = None,
         reject_payload: TonSdkCell | None = None,
+        max_slippage_bps: int | None = None,
+        max_staleness: float | None = None,
         **_,
     ) -> dict[str, TonSdkCell | str | int]:
         if response_address is None:
             response_address = self.wallet_address
+        if max_slippage_bps is not None:
+            limits = await self.slippage_limits(
+                [pool_address],
+                offer_asset,
+                offer_amount,
+                max_slippage_bps,
+                max_staleness=max_staleness,
+                ref_fee=self.referral_fee(referral_gas, referral_address),
+            )
+            min_ask_amount = max(min_ask_amount, limits[-1])
 
         return await self._create_jetton_swap_transfer_message(
             pool_address=pool_address,
@@ -583,7 +585,7 @@ class StonfiV2Provider(Provider):
         self,
         pool_address: str,
         offer_asset: Asset,
-        offer_amount: Decimal,
+        offer_amount: int | Decimal,
         query_id: int,
         deadline: datetime | None = None,
         response_address: str | None = None,
@@ -591,19 +593,31 @@ class StonfiV2Provider(Provider):
             _type=AssetType.JETTON, address=pTON_ADDRESS_V2, decimals=9
         ),
         min_ask_amount: int = 0,
-        gas_amount: Decimal = GAS_JETTON_TO_TON.GAS_AMOUNT,
+        gas_amount: int | Decimal = GAS_JETTON_TO_TON.GAS_AMOUNT,
         refund_address: str | None = None,
         excesses_address: str | None = None,
-        referral_gas: Decimal | None = None,
+        referral_gas: int | Decimal | None = None,
         referral_address: str = None,
-        fulfill_gas: Decimal | None = None,
+        fulfill_gas: int | Decimal | None = None,
         fulfill_payload: TonSdkCell | None = None,
-        reject_gas: Decimal | None = None,
+        reject_gas: int | Decimal | None = None,
         reject_payload: TonSdkCell | None = None,
+        max_slippage_bps: int | None = None,
+        max_staleness: float | None = None,
         **_,
     ) -> dict[str, TonSdkCell | str | int]:
         if response_address is None:
             response_address = self.wallet_address
+        if max_slippage_bps is not None:
+            limits = await self.slippage_limits(
+                [pool_address],
+                offer_asset,
+                offer_amount,
+                max_slippage_bps,
+                max_staleness=max_staleness,
+                ref_fee=self.referral_fee(referral_gas, referral_address),
+            )
+            min_ask_amount = max(min_ask_amount, limits[-1])
         return await self._create_jetton_swap_transfer_message(
             pool_address=pool_address,
             ask_asset=ask_asset,
@@ -632,7 +646,7 @@ class StonfiV2Provider(Provider):
     async def create_ton_multi_swap_transfer_message(
         self,
         pools: list[str],
-        offer_amount: Decimal,
+        offer_amount: int | Decimal,
         query_id: int,
         offer_asset: Asset = Asset(
             _type=AssetType.JETTON, address=pTON_ADDRESS_V2, decimals=9
@@ -640,19 +654,33 @@ class StonfiV2Provider(Provider):
         deadline: datetime | None = None,
         response_address: str = None,
         min_ask_amount: int = 0,
-        gas_amount: Decimal | None = None,
+        gas_amount: int | Decimal | None = None,
         refund_address: str | None = None,
         excesses_address: str | None = None,
-        referral_gas: Decimal | None = None,
+        referral_gas: int | Decimal | None = None,
         referral_address: str = None,
-        fulfill_gas: Decimal | None = None,
+        fulfill_gas: int | Decimal | None = None,
         fulfill_payload: TonSdkCell | None = None,
-        reject_gas: Decimal | None = None,
+        reject_gas: int | Decimal | None = None,
         reject_payload: TonSdkCell | None = None,
+        max_slippage_bps: int | None = None,
+        max_staleness: float | None = None,
         **_,
     ) -> dict[str, TonSdkCell | str | int]:
         if response_address is None:
             response_address = self.wallet_address
+        min_ask_amounts = None
+        if max_slippage_bps is not None:
+            min_ask_amounts = await self.slippage_limits(
+                pools,
+                offer_asset,
+                offer_amount,
+                max_slippage_bps,
+                max_staleness=max_staleness,
+                ref_fee=self.referral_fee(referral_gas, referral_address),
+            )
+            min_ask_amount = max(min_ask_amount, min_ask_amounts[-1])
+            min_ask_amounts[-1] = min_ask_amount
 
         return await self._create_ton_multi_swap_transfer_message(
             pool_addresses=pools,
@@ -677,31 +705,46 @@ class StonfiV2Provider(Provider):
             fulfill_payload=fulfill_payload,
             reject_gas=0 if reject_gas is None else int(reject_gas),
             reject_payload=reject_payload,
+            min_ask_amounts=min_ask_amounts,
         )
 
     async def create_jetton_multi_swap_transfer_message(
         self,
         pools: list[str],
         offer_asset: Asset,
-        offer_amount: Decimal,
+        offer_amount: int | Decimal,
         query_id: int,
         deadline: datetime | None = None,
         response_address: str = None,
         min_ask_amount: int = 0,
-        forward_amount: Decimal | None = None,
-        gas_amount: Decimal | None = None,
+        forward_amount: int | Decimal | None = None,
+        gas_amount: int | Decimal | None = None,
         refund_address: str | None = None,
         excesses_address: str | None = None,
-        referral_gas: Decimal | None = None,
+        referral_gas: int | Decimal | None = None,
         referral_address: str = None,
-        fulfill_gas: Decimal | None = None,
+        fulfill_gas: int | Decimal | None = None,
         fulfill_payload: TonSdkCell | None = None,
-        reject_gas: Decimal | None = None,
+        reject_gas: int | Decimal | None = None,
         reject_payload: TonSdkCell | None = None,
+        max_slippage_bps: int | None = None,
+        max_staleness: float | None = None,
         **_,
     ) -> dict[str, TonSdkCell | str | int]:
         if response_address is None:
             response_address = self.wallet_address
+        min_ask_amounts = None
+        if max_slippage_bps is not None:
+            min_ask_amounts = await self.slippage_limits(
+                pools,
+                offer_asset,
+                offer_amount,
+                max_slippage_bps,
+                max_staleness=max_staleness,
+                ref_fee=self.referral_fee(referral_gas, referral_address),
+            )
+            min_ask_amount = max(min_ask_amount, min_ask_amounts[-1])
+            min_ask_amounts[-1] = min_ask_amount
 
         return await self._create_jetton_multi_swap_transfer_message(
             pool_addresses=pools,
@@ -727,4 +770,5 @@ class StonfiV2Provider(Provider):
             fulfill_payload=fulfill_payload,
             reject_gas=0 if reject_gas is None else int(reject_gas),
             reject_payload=reject_payload,
+            min_ask_amounts=min_ask_amounts,
         )
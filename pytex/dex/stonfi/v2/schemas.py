@@ -0,0 +1,24 @@
+from pytex.stack import StackSchema, address, boolean, num, optional
+
+GET_POOL_DATA = StackSchema(
+    "get_pool_data",
+    is_locked=boolean,
+    router_address=address,
+    total_supply=num,
+    reserve0=num,
+    reserve1=num,
+    token0_wallet_address=address,
+    token1_wallet_address=address,
+    lp_fee=num,
+    protocol_fee=num,
+    protocol_fee_address=address,
+    collected_token0_protocol_fee=num,
+    collected_token1_protocol_fee=num,
+    # stableswap pools only
+    amp=optional(num),
+)
+
+# the pool contract's own quote, used to record reference swaps
+GET_EXPECTED_OUTPUTS = StackSchema(
+    "get_expected_outputs", out=num, protocol_fee_out=num, ref_fee_out=num
+)
@@ -1,2 +1,24 @@
+from tonsdk.provider import ToncenterWrongResult
+
+
 class OperatorError(Exception):
     pass
+
+
+class ToncenterError(ToncenterWrongResult):
+    def __init__(
+        self, code: int, retry_after: float | None = None, error: str | None = None
+    ):
+        super().__init__(code)
+        self.retry_after = retry_after
+        self.error = error
+
+    def __str__(self):
+        return f"{self.code}" if self.error is None else f"{self.code} {self.error}"
+
+
+class StackError(OperatorError):
+    def __init__(self, method: str, reason: str):
+        super().__init__(f"{method} | {reason}")
+        self.method = method
+        self.reason = reason
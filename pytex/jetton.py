@@ -0,0 +1,125 @@
+from typing import Callable
+
+from tonsdk.boc import Cell as TonSdkCell
+from tonsdk.utils import Address as TonSdkAddress
+
+from pytex.cache import Cache, MEMORY_CACHE
+from pytex.state_init import (
+    CellHash,
+    address_bits,
+    bits_hash,
+    cell_hash,
+    parse_address,
+    state_init_address,
+)
+
+
+def _standard_wallet_data(
+    owner: TonSdkAddress, master: TonSdkAddress, code: CellHash
+) -> CellHash:
+    # TEP-74 reference wallet: balance:Coins(0) owner master ^wallet_code
+    value = address_bits(owner) << 267 | address_bits(master)
+    return bits_hash(value, 4 + 267 * 2, [code])
+
+
+def _status_wallet_data(
+    owner: TonSdkAddress, master: TonSdkAddress, code: CellHash
+) -> CellHash:
+    # governed (stablecoin) wallet: status:uint4 balance:Coins(0) owner master
+    value = address_bits(owner) << 267 | address_bits(master)
+    return bits_hash(value, 4 + 4 + 267 * 2, [])
+
+
+JETTON_WALLET_LAYOUTS: dict[
+    str, Callable[[TonSdkAddress, TonSdkAddress, CellHash], CellHash]
+] = {
+    "standard": _standard_wallet_data,
+    "status": _status_wallet_data,
+}
+
+
+class JettonWalletRegistry:
+    def __init__(self, cache: Cache = MEMORY_CACHE):
+        # master -> [code hash, code depth, layout], None once no layout matched
+        self._wallets = cache.namespace("jetton_wallet_code")
+        # "master owner" -> wallet address fetched for masters without a layout
+        self.addresses = cache.namespace("jetton_wallet_address")
+        self._decoded: dict[str, tuple[CellHash, str]] = {}
+        self._failed: set[str] = set()
+
+    @staticmethod
+    def _key(jetton_master_address: str) -> str:
+        return parse_address(jetton_master_address).to_string(False)
+
+    def _known(self, key: str) -> tuple[CellHash, str] | None:
+        known = self._decoded.get(key)
+        if known is None:
+            stored = self._wallets.get(key)
+            if stored is None:
+                return None
+            code_hash, depth, layout = stored
+            known = self._decoded[key] = ((bytes.fromhex(code_hash), depth), layout)
+        return known
+
+    def register(
+        self, jetton_master_address: str, code: TonSdkCell, layout: str = "standard"
+    ):
+        if layout not in JETTON_WALLET_LAYOUTS:
+            raise ValueError(f"unknown jetton wallet layout: {layout}")
+        key = self._key(jetton_master_address)
+        code_hash, depth = cell_hash(code)
+        self._wallets[key] = [code_hash.hex(), depth, layout]
+        self._decoded[key] = ((code_hash, depth), layout)
+        self._failed.discard(key)
+
+    def is_known(self, jetton_master_address: str) -> bool:
+        return self._known(self._key(jetton_master_address)) is not None
+
+    def should_learn(self, jetton_master_address: str) -> bool:
+        key = self._key(jetton_master_address)
+        return key not in self._wallets and key not in self._failed
+
+    def derive(self, jetton_master_address: str, wallet_address: str) -> str | None:
+        known = self._known(self._key(jetton_master_address))
+        if known is None:
+            return self.addresses.get(
+                self.address_key(jetton_master_address, wallet_address)
+            )
+        code, layout = known
+        master = parse_address(jetton_master_address)
+        data = JETTON_WALLET_LAYOUTS[layout](
+            parse_address(wallet_address), master, code
+        )
+        return state_init_address(code, data, master.wc)
+
+    def address_key(self, jetton_master_address: str, wallet_address: str) -> str:
+        owner = parse_address(wallet_address).to_string(False)
+        return f"{self._key(jetton_master_address)} {owner}"
+
+    def learn(
+        self,
+        jetton_master_address: str,
+        wallet_address: str,
+        code: TonSdkCell | None,
+        jetton_wallet_address: str,
+    ) -> bool:
+        # keeps the layout only if it reproduces the address the chain returned
+        key = self._key(jetton_master_address)
+        expected = TonSdkAddress(jetton_wallet_address).to_string(False)
+        if code is not None:
+            for layout in JETTON_WALLET_LAYOUTS:
+                try:
+                    self.register(jetton_master_address, code, layout)
+                    derived = self.derive(jetton_master_address, wallet_address)
+                except Exception:
+                    # e.g. library cells tonsdk cannot hash
+                    break
+                if TonSdkAddress(derived).to_string(False) == expected:
+                    return True
+        self._decoded.pop(key, None)
+        if code is not None:
+            self._wallets[key] = None
+        else:
+            self._wallets.pop(key, None)
+            self._failed.add(key)
+        return False
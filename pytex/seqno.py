@@ -0,0 +1,69 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from pytex.exceptions import OperatorError
+
+T = TypeVar("T")
+
+# tonsdk signs wallet v4 externals valid for 60 s
+EXTERNAL_TIMEOUT = 60
+
+
+class SeqnoManager:
+    # next seqno of one wallet kept locally, sends serialized under a lock;
+    # the chain is read once at start and again only when a send is
+    # rejected, so back to back sends cost no seqno reads
+    def __init__(
+        self,
+        read_seqno: Callable[[], Awaitable[int | None]],
+        timeout: float = EXTERNAL_TIMEOUT,
+        poll_interval: float = 1.0,
+    ):
+        self.read_seqno = read_seqno
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.lock = asyncio.Lock()
+        self.next_seqno: int | None = None
+        # wall clock time until which the last sent external may still land
+        self.valid_until = 0.0
+        self.reads = 0
+
+    async def read(self) -> int:
+        self.reads += 1
+        seqno = await self.read_seqno()
+        # an uninitialized wallet deploys with seqno 0
+        return 0 if seqno is None else seqno
+
+    async def send(self, submit: Callable[[int], Awaitable[T]]) -> T:
+        # submit signs and sends one external with the given seqno
+        async with self.lock:
+            if self.next_seqno is None:
+                self.next_seqno = await self.read()
+            try:
+                result = await submit(self.next_seqno)
+            except OperatorError:
+                if not await self.resync():
+                    raise
+                result = await submit(self.next_seqno)
+            self.next_seqno += 1
+            self.valid_until = time.time() + self.timeout
+            return result
+
+    async def resync(self) -> bool:
+        # true when the rejection was on seqno and a retry may pass: the
+        # chain is behind while earlier externals are still in flight (they
+        # land or expire), or another sender moved the wallet ahead
+        expected = self.next_seqno
+        seqno = await self.read()
+        if seqno == expected:
+            return False
+        while seqno < expected and time.time() < self.valid_until:
+            await asyncio.sleep(self.poll_interval)
+            seqno = await self.read()
+        self.next_seqno = seqno
+        return True
+
+    def reset(self):
+        # the next send reads the seqno from chain
+        self.next_seqno = None
@@ -0,0 +1,82 @@
+import base64
+import math
+
+from tonsdk.boc import Cell as TonSdkCell
+
+from pytex.state_init import friendly_address
+
+
+class Slice:
+    # reads cell bits at a bit offset from one int, no per-bit calls
+    def __init__(self, cell: TonSdkCell):
+        self.cell = cell
+        self.length = cell.bits.cursor
+        size = math.ceil(self.length / 8)
+        self._value = int.from_bytes(cell.bits.array[:size], "big")
+        self._size = size * 8
+        self.position = 0
+        self.ref_position = 0
+
+    @classmethod
+    def from_boc(cls, boc: bytes | str) -> "Slice":
+        if isinstance(boc, str):
+            boc = base64.b64decode(boc)
+        return cls(TonSdkCell.one_from_boc(boc))
+
+    @property
+    def remaining_bits(self) -> int:
+        return self.length - self.position
+
+    @property
+    def remaining_refs(self) -> int:
+        return len(self.cell.refs) - self.ref_position
+
+    def skip(self, bits: int) -> "Slice":
+        if bits > self.remaining_bits:
+            raise ValueError(f"slice underflow: skip {bits} of {self.remaining_bits}")
+        self.position += bits
+        return self
+
+    def load_uint(self, bits: int) -> int:
+        if bits > self.remaining_bits:
+            raise ValueError(f"slice underflow: load {bits} of {self.remaining_bits}")
+        self.position += bits
+        return (self._value >> (self._size - self.position)) & ((1 << bits) - 1)
+
+    def load_int(self, bits: int) -> int:
+        value = self.load_uint(bits)
+        if bits and value >> (bits - 1):
+            value -= 1 << bits
+        return value
+
+    def load_bit(self) -> bool:
+        return self.load_uint(1) == 1
+
+    def load_bytes(self, size: int) -> bytes:
+        return self.load_uint(size * 8).to_bytes(size, "big")
+
+    def load_coins(self) -> int:
+        # var_uint$_ {n:#} len:(#< 16) value:(uint (len * 8))
+        return self.load_uint(self.load_uint(4) * 8)
+
+    def load_address(self) -> str | None:
+        # addr_none$00 or addr_std$10 anycast:(Maybe Anycast) workchain_id:int8
+        # address:bits256, as a bounceable friendly address
+        tag = self.load_uint(2)
+        if tag == 0b00:
+            return None
+        if tag != 0b10:
+            raise ValueError(f"unsupported address tag: {tag:02b}")
+        if self.load_bit():
+            raise ValueError("anycast addresses are not supported")
+        wc = self.load_int(8)
+        return friendly_address(wc, self.load_bytes(32))
+
+    def load_ref(self) -> TonSdkCell:
+        if self.ref_position >= len(self.cell.refs):
+            raise ValueError("slice underflow: no refs left")
+        self.ref_position += 1
+        return self.cell.refs[self.ref_position - 1]
+
+    def load_maybe_ref(self) -> TonSdkCell | None:
+        return self.load_ref() if self.load_bit() else None
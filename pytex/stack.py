@@ -0,0 +1,127 @@
+import base64
+from collections import namedtuple
+from typing import Any, Callable
+
+from tonsdk.boc import Cell as TonSdkCell
+
+from pytex.exceptions import StackError
+from pytex.slice import Slice
+from pytex.state_init import friendly_address
+from pytex.units import Asset, AssetType
+
+# exit code 1 is the alternative success code of TVM
+SUCCESS_EXIT_CODES = frozenset({0, 1})
+
+# decoders of single toncenter stack entries such as ["num", "0x1"]
+# or ["cell", {"bytes": "<base64 boc>"}]
+StackDecoder = Callable[[list], Any]
+
+
+def optional(decoder: StackDecoder) -> StackDecoder:
+    # trailing entry only some pool versions return, None when missing
+    def decode(entry: list) -> Any:
+        return decoder(entry)
+
+    decode.optional = True
+    return decode
+
+
+def _boc(entry: list) -> bytes:
+    tag, value = entry
+    if tag not in ("cell", "slice"):
+        raise ValueError(f"expected cell, got {tag}")
+    return base64.b64decode(value["bytes"])
+
+
+def num(entry: list) -> int:
+    tag, value = entry
+    if tag != "num":
+        raise ValueError(f"expected num, got {tag}")
+    return int(value, 16)
+
+
+def boolean(entry: list) -> bool:
+    return num(entry) != 0
+
+
+def cell(entry: list) -> TonSdkCell:
+    return TonSdkCell.one_from_boc(_boc(entry))
+
+
+def address(entry: list) -> str | None:
+    return Slice.from_boc(_boc(entry)).load_address()
+
+
+def asset(entry: list) -> Asset:
+    # native$0000 | jetton$0001 workchain_id:int8 address:bits256
+    cs = Slice.from_boc(_boc(entry))
+    _type = cs.load_uint(4)
+    if _type == 0:
+        return Asset(_type=AssetType.NATIVE)
+    if _type == 1:
+        wc = cs.load_int(8)
+        return Asset(
+            _type=AssetType.JETTON, address=friendly_address(wc, cs.load_bytes(32))
+        )
+    raise ValueError(f"unknown asset type: {_type}")
+
+
+class StackSchema:
+    def __init__(self, method: str, **fields: StackDecoder):
+        self.method = method
+        self.names = tuple(fields)
+        self.decoders = tuple(fields.values())
+        self.required = sum(
+            not getattr(decoder, "optional", False) for decoder in self.decoders
+        )
+        self.record = namedtuple(
+            "".join(part.title() for part in method.split("_")), self.names
+        )
+
+    def task(self, client, address: str, stack_data: list | None = None) -> dict:
+        return client.raw_run_method(
+            method=self.method, address=address, stack_data=stack_data or []
+        )
+
+    def decode(self, result: dict | None) -> tuple:
+        # one runGetMethod result, single or from a batched response
+        if not isinstance(result, dict):
+            raise StackError(self.method, "no result")
+        exit_code = result.get("exit_code", 0)
+        if exit_code not in SUCCESS_EXIT_CODES:
+            raise StackError(self.method, f"exit code {exit_code}")
+        stack = result.get("stack")
+        if not isinstance(stack, list) or len(stack) < self.required:
+            size = len(stack) if isinstance(stack, list) else None
+            raise StackError(self.method, f"stack size {size}")
+
+        values = []
+        for name, decode, entry in zip(self.names, self.decoders, stack):
+            try:
+                values.append(decode(entry))
+            except Exception as e:
+                raise StackError(self.method, f"{name}: {e!r}") from e
+        values += [None] * (len(self.decoders) - len(values))
+        return self.record._make(values)
+
+
+SEQNO = StackSchema("seqno", seqno=num)
+
+GET_WALLET_ADDRESS = StackSchema("get_wallet_address", wallet_address=address)
+
+GET_WALLET_DATA = StackSchema(
+    "get_wallet_data",
+    balance=num,
+    owner_address=address,
+    jetton_master_address=address,
+    wallet_code=cell,
+)
+
+GET_JETTON_DATA = StackSchema(
+    "get_jetton_data",
+    total_supply=num,
+    mintable=boolean,
+    admin_address=address,
+    content=cell,
+    wallet_code=cell,
+)
@@ -0,0 +1,159 @@
+import base64
+import math
+from binascii import crc_hqx
+from functools import lru_cache
+from hashlib import sha256
+
+from tonsdk.boc import Cell as TonSdkCell
+from tonsdk.utils import Address as TonSdkAddress
+
+# (representation hash, depth) of an already hashed cell
+CellHash = tuple[bytes, int]
+
+
+def cell_hash(cell: TonSdkCell, refs: list[CellHash] | None = None) -> CellHash:
+    # hashes an ordinary cell whose refs are given as precomputed hashes,
+    # so a large code cell is hashed once instead of on every derivation
+    if refs is None:
+        refs = [(ref.bytes_hash(), ref.get_max_depth()) for ref in cell.refs]
+    bits = cell.bits.cursor
+    repr_bytes = bytearray((len(refs), math.ceil(bits / 8) + bits // 8))
+    repr_bytes += cell.bits.get_top_upped_array()
+    for _, depth in refs:
+        repr_bytes += depth.to_bytes(2, "big")
+    for ref_hash, _ in refs:
+        repr_bytes += ref_hash
+    depth = max(depth for _, depth in refs) + 1 if refs else 0
+    return sha256(repr_bytes).digest(), depth
+
+
+def bits_hash(value: int, length: int, refs: list[CellHash]) -> CellHash:
+    # same as cell_hash for a cell whose data bits are given as an int
+    remainder = length % 8
+    if remainder:
+        value = (value << (8 - remainder)) | (1 << (7 - remainder))
+    repr_bytes = bytearray((len(refs), math.ceil(length / 8) + length // 8))
+    repr_bytes += value.to_bytes(math.ceil(length / 8), "big")
+    for _, depth in refs:
+        repr_bytes += depth.to_bytes(2, "big")
+    for ref_hash, _ in refs:
+        repr_bytes += ref_hash
+    depth = max(depth for _, depth in refs) + 1 if refs else 0
+    return sha256(repr_bytes).digest(), depth
+
+
+def address_bits(address: TonSdkAddress) -> int:
+    # addr_std$10 anycast:0 workchain_id:int8 address:bits256, 267 bits
+    return ((0b100 << 8 | address.wc & 0xFF) << 256) | int.from_bytes(
+        address.hash_part, "big"
+    )
+
+
+def state_init_hash(code: CellHash, data: CellHash) -> bytes:
+    return bits_hash(0b00110, 5, [code, data])[0]  # code and data only
+
+
+def state_init_address(code: CellHash, data: CellHash, wc: int = 0) -> str:
+    return friendly_address(wc, state_init_hash(code, data))
+
+
+@lru_cache(maxsize=4096)
+def parse_address(address: str) -> TonSdkAddress:
+    # parsing a friendly address checks its crc, worth doing once per address
+    return TonSdkAddress(address)
+
+
+def friendly_address(wc: int, hash_part: bytes, bounceable: bool = True) -> str:
+    # same as TonSdkAddress.to_string(True, True, bounceable), crc16 in C
+    raw = bytes((0x11 if bounceable else 0x51, wc & 0xFF)) + hash_part
+    return base64.urlsafe_b64encode(raw + crc_hqx(raw, 0).to_bytes(2, "big")).decode()
+
+
+def cell_bits(cell: TonSdkCell) -> tuple[int, int]:
+    length = cell.bits.cursor
+    array = cell.bits.array[: math.ceil(length / 8)]
+    return int.from_bytes(array, "big") >> (len(array) * 8 - length), length
+
+
+class StateInitTemplate:
+    def __init__(
+        self,
+        code: CellHash,
+        segments: list[tuple[int, int] | None],
+        refs: list[CellHash],
+        wc: int = 0,
+    ):
+        # data cell bits as fixed segments, None marks a slot filled on derive
+        self.code = code
+        self.segments = segments
+        self.refs = refs
+        self.wc = wc
+
+    def address(self, *slots: tuple[int, int]) -> str:
+        slots = iter(slots)
+        value = length = 0
+        for segment in self.segments:
+            segment_value, segment_length = next(slots) if segment is None else segment
+            value = value << segment_length | segment_value
+            length += segment_length
+        return state_init_address(
+            self.code, bits_hash(value, length, self.refs), self.wc
+        )
+
+    @classmethod
+    def learn(
+        cls,
+        code: TonSdkCell,
+        data: TonSdkCell,
+        address: str,
+        slots: list[tuple[int, int]],
+    ) -> "StateInitTemplate | None":
+        # only initial data reproduces the address; slots must appear in
+        # the data bits exactly once and in the given order
+        expected = parse_address(address)
+        code_hash, data_hash = cell_hash(code), cell_hash(data)
+        if state_init_hash(code_hash, data_hash) != expected.hash_part:
+            return None
+
+        value, length = cell_bits(data)
+        bits = format(value, f"0{length}b") if length else ""
+        segments: list[tuple[int, int] | None] = []
+        position = 0
+        for slot_value, slot_length in slots:
+            slot = format(slot_value, f"0{slot_length}b")
+            found = bits.find(slot, position)
+            if found < 0 or bits.find(slot, found + 1) >= 0:
+                return None
+            if found > position:
+                segments.append((int(bits[position:found], 2), found - position))
+            segments.append(None)
+            position = found + slot_length
+        if position < length:
+            segments.append((int(bits[position:], 2), length - position))
+
+        refs = [(ref.bytes_hash(), ref.get_max_depth()) for ref in data.refs]
+        return cls(code_hash, segments, refs, expected.wc)
+
+    def dump(self) -> dict:
+        return {
+            "code": [self.code[0].hex(), self.code[1]],
+            "segments": [
+                None if segment is None else [hex(segment[0]), segment[1]]
+                for segment in self.segments
+            ],
+            "refs": [[ref_hash.hex(), depth] for ref_hash, depth in self.refs],
+            "wc": self.wc,
+        }
+
+    @classmethod
+    def load(cls, dumped: dict) -> "StateInitTemplate":
+        code_hash, code_depth = dumped["code"]
+        return cls(
+            (bytes.fromhex(code_hash), code_depth),
+            [
+                None if segment is None else (int(segment[0], 16), segment[1])
+                for segment in dumped["segments"]
+            ],
+            [(bytes.fromhex(ref_hash), depth) for ref_hash, depth in dumped["refs"]],
+            dumped["wc"],
+        )
@@ -0,0 +1,111 @@
+import asyncio
+from typing import Awaitable, Callable
+
+import aiohttp
+
+from pytex.transport.endpoints import EndpointPool
+from pytex.transport.limiter import Priority
+
+
+class BatchTransport:
+    def __init__(
+        self,
+        endpoints: EndpointPool,
+        get_session: Callable[[], Awaitable[aiohttp.ClientSession]],
+        window: float = 0.005,
+        max_size: int = 50,
+    ):
+        self.endpoints = endpoints
+        self.get_session = get_session
+        self.window = window
+        self.max_size = max_size
+        self.requests = 0
+        self.calls = 0
+
+        self._pending: list[tuple[str, dict, asyncio.Future]] = []
+        self._priority = Priority.LOW
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._senders: set[asyncio.Task] = set()
+
+    async def call(
+        self, method: str, params: dict, priority: Priority = Priority.NORMAL
+    ):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((method, params, future))
+        # the batch is as urgent as its most urgent call
+        self._priority = min(self._priority, priority)
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await future
+
+    async def call_many(
+        self, calls: list[tuple[str, dict]], priority: Priority = Priority.NORMAL
+    ) -> list:
+        loop = asyncio.get_running_loop()
+        pending = [(method, params, loop.create_future()) for method, params in calls]
+        for i in range(0, len(pending), self.max_size):
+            self._spawn(pending[i : i + self.max_size], priority)
+        return await asyncio.gather(
+            *(future for _, _, future in pending), return_exceptions=True
+        )
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        priority, self._priority = self._priority, Priority.LOW
+        if pending:
+            self._spawn(pending, priority)
+
+    def _spawn(
+        self, pending: list[tuple[str, dict, asyncio.Future]], priority: Priority
+    ):
+        sender = asyncio.ensure_future(self._send(pending, priority))
+        self._senders.add(sender)
+        sender.add_done_callback(self._senders.discard)
+
+    async def _send(
+        self, pending: list[tuple[str, dict, asyncio.Future]], priority: Priority
+    ):
+        # callers that gave up while waiting for the window are not sent at all
+        pending = [item for item in pending if not item[2].done()]
+        if not pending:
+            return
+
+        self.requests += 1
+        self.calls += len(pending)
+        try:
+            session = await self.get_session()
+            if len(pending) == 1:
+                method, params, _ = pending[0]
+                result = await self.endpoints.request(
+                    lambda client: client.rpc_request(session, method, params),
+                    priority,
+                    hedge=True,
+                )
+                results = [result]
+            else:
+                calls = [(method, params) for method, params, _ in pending]
+                results = await self.endpoints.request(
+                    lambda client: client.rpc_batch_request(session, calls),
+                    priority,
+                    hedge=True,
+                )
+        except asyncio.CancelledError:
+            for _, _, future in pending:
+                future.cancel()
+            raise
+        except Exception as e:
+            results = [e] * len(pending)
+
+        for (_, _, future), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
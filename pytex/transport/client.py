@@ -0,0 +1,110 @@
+import codecs
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+from tonsdk.provider import ToncenterClient as TonSdkToncenterClient
+
+from pytex.exceptions import ToncenterError
+
+
+class ToncenterClient(TonSdkToncenterClient):
+    # every task goes through /jsonRPC and carries its (method, params) in "rpc",
+    # so the operator can batch or coalesce it instead of calling "func" directly
+    def raw_send_message(self, serialized_boc):
+        boc = codecs.decode(codecs.encode(serialized_boc, "base64"), "utf-8")
+        return self.rpc_task("sendBoc", {"boc": boc.replace("\n", "")})
+
+    def raw_run_method(self, address, method, stack_data, output_layout=None):
+        return self.rpc_task(
+            "runGetMethod", {"address": address, "method": method, "stack": stack_data}
+        )
+
+    def raw_get_account_state(self, prepared_address: str):
+        return self.rpc_task("getAddressInformation", {"address": prepared_address})
+
+    def rpc_task(self, method: str, params: dict) -> dict:
+        return {
+            "func": self.rpc_request,
+            "args": [method],
+            "kwargs": {"params": params},
+            "rpc": (method, params),
+        }
+
+    async def rpc_request(
+        self, session: aiohttp.ClientSession, method: str, params: dict
+    ):
+        payload = {"id": 0, "jsonrpc": "2.0", "method": method, "params": params}
+        async with session.post(
+            self.base_url + "jsonRPC", json=payload, headers=self._headers()
+        ) as resp:
+            data = await self._read_json(resp)
+        return self._parse_result(data, self._retry_after(resp))
+
+    async def rpc_batch_request(
+        self, session: aiohttp.ClientSession, calls: list[tuple[str, dict]]
+    ) -> list:
+        payload = [
+            {"id": i, "jsonrpc": "2.0", "method": method, "params": params}
+            for i, (method, params) in enumerate(calls)
+        ]
+        async with session.post(
+            self.base_url + "jsonRPC", json=payload, headers=self._headers()
+        ) as resp:
+            data = await self._read_json(resp)
+        retry_after = self._retry_after(resp)
+
+        if not isinstance(data, list):
+            # the whole batch was rejected
+            self._parse_result(data, retry_after, resp.status)
+            raise ToncenterError(resp.status, retry_after, "not a batch response")
+
+        results: list = [
+            ToncenterError(resp.status, retry_after, "missing in batch response")
+            for _ in calls
+        ]
+        for item in data:
+            try:
+                results[int(item["id"])] = self._parse_result(item, retry_after)
+            except ToncenterError as e:
+                results[int(item["id"])] = e
+        return results
+
+    def _headers(self) -> dict:
+        headers = {
+            "Content-Type": "application/json",
+            "accept": "application/json",
+        }
+        if self.api_key:
+            headers["X-API-Key"] = self.api_key
+        return headers
+
+    @classmethod
+    async def _read_json(cls, resp: aiohttp.ClientResponse):
+        try:
+            return await resp.json(content_type=None)
+        except ValueError:
+            raise ToncenterError(resp.status, cls._retry_after(resp), resp.reason)
+
+    @staticmethod
+    def _retry_after(resp: aiohttp.ClientResponse) -> float | None:
+        value = resp.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    @staticmethod
+    def _parse_result(data: dict, retry_after: float | None = None, status: int = 0):
+        if not data.get("ok"):
+            raise ToncenterError(
+                data.get("code", status), retry_after, data.get("error")
+            )
+        return data["result"]
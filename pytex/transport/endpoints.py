@@ -0,0 +1,211 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from pytex.transport.client import ToncenterClient
+from pytex.transport.limiter import Priority, RateLimiter
+from pytex.transport.retry import ErrorKind, RetryPolicy
+
+TONCENTER_URL = "https://toncenter.com/api/v2/"
+# toncenter requests per second with and without an api key
+TONCENTER_RPS = 10.0
+TONCENTER_KEYLESS_RPS = 1.0
+
+
+class Endpoint:
+    EWMA_ALPHA = 0.2
+    LATENCY_WINDOW = 100
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str | None = None,
+        rps: float | None = None,
+        burst: int | None = None,
+    ):
+        self.client = ToncenterClient(base_url=base_url, api_key=api_key)
+        self.api_key = api_key
+        # quota of this endpoint, None leaves it unlimited
+        self.rps = rps
+        self.burst = burst
+        if rps is not None:
+            RateLimiter.declare(self.quota_key, rps, burst)
+
+        self.latency: float | None = None
+        self.latencies: deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+        self.failures = 0
+        self.requests = 0
+        self.errors = 0
+        self.opened_at: float | None = None
+
+    def __repr__(self):
+        return "<Endpoint %s latency: %s failures: %s>" % (
+            self.client.base_url,
+            self.latency,
+            self.failures,
+        )
+
+    @classmethod
+    def toncenter(cls, api_key: str | None, rps: float | None = None) -> "Endpoint":
+        # limited to the quota of the key unless rps is given
+        if rps is None:
+            rps = TONCENTER_RPS if api_key else TONCENTER_KEYLESS_RPS
+        return cls(TONCENTER_URL, api_key, rps)
+
+    @property
+    def limiter(self) -> RateLimiter | None:
+        # resolved in the running loop; a quota belongs to a key at one
+        # service, endpoints share it only when both url and key match
+        if self.rps is None:
+            return None
+        return RateLimiter.for_key(self.quota_key, self.rps, self.burst)
+
+    @property
+    def quota_key(self) -> tuple[str, str]:
+        return self.client.base_url, self.api_key or ""
+
+    @property
+    def score(self) -> float:
+        return (self.latency or 0.0) * (1 + self.failures)
+
+    def p95(self) -> float | None:
+        if len(self.latencies) < 20:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[int(0.95 * (len(latencies) - 1))]
+
+    def is_available(self, now: float, cooldown: float) -> bool:
+        # an open circuit lets traffic through again (half-open) after cooldown
+        return self.opened_at is None or now - self.opened_at >= cooldown
+
+    def record_latency(self, latency: float):
+        self.latencies.append(latency)
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.EWMA_ALPHA * (latency - self.latency)
+
+    def record_success(self, latency: float):
+        self.requests += 1
+        self.record_latency(latency)
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self, threshold: int):
+        self.requests += 1
+        self.errors += 1
+        self.failures += 1
+        if self.failures >= threshold:
+            self.opened_at = time.monotonic()
+
+
+class EndpointPool:
+    def __init__(
+        self,
+        endpoints: list[Endpoint],
+        failure_threshold: int = 5,
+        cooldown: float = 10.0,
+        hedge: bool = False,
+        hedge_delay: float | None = None,
+        min_hedge_delay: float = 0.05,
+    ):
+        if not endpoints:
+            raise ValueError("at least one endpoint is required")
+        self.endpoints = endpoints
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.hedged = 0
+
+    def ranked(self) -> list[Endpoint]:
+        now = time.monotonic()
+        available = [e for e in self.endpoints if e.is_available(now, self.cooldown)]
+        if not available:
+            # everything is open: probe the one that failed longest ago
+            return sorted(self.endpoints, key=lambda e: e.opened_at)
+        return sorted(available, key=lambda e: e.score)
+
+    async def request(
+        self,
+        send: Callable[[ToncenterClient], Awaitable[Any]],
+        priority: Priority = Priority.NORMAL,
+        hedge: bool = False,
+    ):
+        endpoints = self.ranked()
+        if hedge and self.hedge and len(endpoints) > 1:
+            return await self._hedged(send, priority, endpoints[0], endpoints[1])
+
+        exception = None
+        for endpoint in endpoints:
+            try:
+                return await self._attempt(endpoint, send, priority)
+            except Exception as e:
+                if RetryPolicy.classify(e) == ErrorKind.PERMANENT:
+                    raise
+                exception = e
+        raise exception
+
+    async def _attempt(
+        self,
+        endpoint: Endpoint,
+        send: Callable[[ToncenterClient], Awaitable[Any]],
+        priority: Priority,
+    ):
+        if endpoint.limiter is not None:
+            await endpoint.limiter.acquire(priority)
+        started = time.monotonic()
+        try:
+            result = await send(endpoint.client)
+        except asyncio.CancelledError:
+            # lost a hedge race: the elapsed time is still a lower bound
+            endpoint.record_latency(time.monotonic() - started)
+            raise
+        except Exception as e:
+            if RetryPolicy.classify(e) != ErrorKind.PERMANENT:
+                endpoint.record_failure(self.failure_threshold)
+            raise
+        endpoint.record_success(time.monotonic() - started)
+        return result
+
+    async def _hedged(
+        self,
+        send: Callable[[ToncenterClient], Awaitable[Any]],
+        priority: Priority,
+        primary: Endpoint,
+        secondary: Endpoint,
+    ):
+        delay = self.hedge_delay or primary.p95()
+        if delay is None:
+            delay = (primary.latency or 0.0) * 2
+        delay = max(delay, self.min_hedge_delay)
+
+        first = asyncio.ensure_future(self._attempt(primary, send, priority))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                exception = first.exception()
+                if exception is None:
+                    return first.result()
+                if RetryPolicy.classify(exception) == ErrorKind.PERMANENT:
+                    raise exception
+                return await self._attempt(secondary, send, priority)
+
+            self.hedged += 1
+            pending.add(asyncio.ensure_future(self._attempt(secondary, send, priority)))
+            exception = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    exception = task.exception()
+            raise exception
+        finally:
+            for task in pending:
+                task.cancel()
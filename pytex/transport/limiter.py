@@ -0,0 +1,120 @@
+import asyncio
+import heapq
+import itertools
+import time
+import weakref
+from enum import IntEnum
+from typing import Hashable
+
+
+class Priority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class WaitStats:
+    def __init__(self):
+        self.count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def add(self, wait: float):
+        self.count += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.count if self.count else 0.0
+
+
+class RateLimiter:
+    # event loop -> quota key -> limiter; waiters and timers belong to the
+    # loop they were created on, a new loop starts with fresh buckets
+    _shared: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+    # quota key -> (rate, burst) for the whole process, fixed by the first
+    # client declaring the key
+    _quotas: dict[Hashable, tuple[float, int]] = {}
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.stats = {priority: WaitStats() for priority in Priority}
+
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._seq = itertools.count()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._wakeup: asyncio.TimerHandle | None = None
+
+    @classmethod
+    def declare(cls, key: Hashable, rate: float, burst: int | None = None):
+        # one key has one quota: called when a client is built, so a client
+        # asking another rate for a key fails there, not on its first request
+        quota = (rate, burst or max(1, int(rate)))
+        declared = cls._quotas.setdefault(key, quota)
+        if declared != quota:
+            raise ValueError(
+                f"rate limit for {key!r} is {declared[0]} rps, burst {declared[1]}"
+            )
+
+    @classmethod
+    def for_key(
+        cls, key: Hashable, rate: float, burst: int | None = None
+    ) -> "RateLimiter":
+        # one bucket per quota key in the running loop: the quota is enforced
+        # per key, not per client
+        cls.declare(key, rate, burst)
+        limiters = cls._shared.setdefault(asyncio.get_running_loop(), {})
+        limiter = limiters.get(key)
+        if limiter is None:
+            limiter = limiters[key] = cls(rate, burst)
+        return limiter
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, priority: Priority = Priority.NORMAL):
+        started = time.monotonic()
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            self.stats[priority].add(0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the token was granted right before cancellation, give it back
+                self._tokens += 1
+                self._dispatch()
+            raise
+        self.stats[priority].add(time.monotonic() - started)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _dispatch(self):
+        self._wakeup = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        self._schedule()
+
+    def _schedule(self):
+        if self._wakeup is not None or not self._waiters:
+            return
+        delay = max(0.0, (1 - self._tokens) / self.rate)
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
@@ -0,0 +1,96 @@
+import asyncio
+import random
+from enum import IntEnum
+
+import aiohttp
+from tonsdk.provider import ToncenterWrongResult
+
+from pytex.exceptions import ToncenterError
+
+
+class ErrorKind(IntEnum):
+    RATE_LIMITED = 0
+    UNAVAILABLE = 1
+    TIMEOUT = 2
+    PERMANENT = 3
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = 10,
+        deadline: float = 30.0,
+        attempt_timeout: float = 5.0,
+        base_delay: float = 0.25,
+        max_delay: float = 5.0,
+        multiplier: float = 2.0,
+        jitter: float = 1.0,
+        retry_on: frozenset[ErrorKind] = frozenset(
+            {ErrorKind.RATE_LIMITED, ErrorKind.UNAVAILABLE, ErrorKind.TIMEOUT}
+        ),
+    ):
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = min(1.0, max(0.0, jitter))
+        self.retry_on = retry_on
+
+    @staticmethod
+    def classify(exception: BaseException) -> ErrorKind:
+        if isinstance(exception, ToncenterWrongResult):
+            if exception.code == 429:
+                return ErrorKind.RATE_LIMITED
+            if exception.code >= 500 or exception.code == 0:
+                return ErrorKind.UNAVAILABLE
+            return ErrorKind.PERMANENT
+        if isinstance(exception, (asyncio.TimeoutError, aiohttp.ServerTimeoutError)):
+            return ErrorKind.TIMEOUT
+        if isinstance(exception, aiohttp.ClientResponseError):
+            if exception.status == 429:
+                return ErrorKind.RATE_LIMITED
+            if exception.status >= 500:
+                return ErrorKind.UNAVAILABLE
+            return ErrorKind.PERMANENT
+        if isinstance(exception, (aiohttp.ClientConnectionError, ConnectionError)):
+            return ErrorKind.UNAVAILABLE
+        return ErrorKind.PERMANENT
+
+    def backoff(self, attempt: int, exception: BaseException) -> float:
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        delay -= random.uniform(0, delay * self.jitter)
+        if isinstance(exception, ToncenterError) and exception.retry_after is not None:
+            delay = max(delay, exception.retry_after)
+        return delay
+
+    def next_delay(
+        self, attempt: int, exception: BaseException, remaining: float
+    ) -> float | None:
+        if attempt >= self.max_attempts:
+            return None
+        if self.classify(exception) not in self.retry_on:
+            return None
+        delay = self.backoff(attempt, exception)
+        if delay >= remaining:
+            return None
+        return delay
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+# swap building: fail fast rather than quote against a stale view
+FAST_RETRY_POLICY = RetryPolicy(
+    max_attempts=3,
+    deadline=3.0,
+    attempt_timeout=1.5,
+    base_delay=0.05,
+    max_delay=0.5,
+)
+BACKGROUND_RETRY_POLICY = RetryPolicy(
+    max_attempts=20,
+    deadline=120.0,
+    attempt_timeout=15.0,
+    base_delay=0.5,
+    max_delay=15.0,
+)
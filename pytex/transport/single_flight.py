@@ -0,0 +1,28 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        self.calls = 0
+        self.saved = 0
+
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable], *args: Any):
+        self.calls += 1
+        future = self._inflight.get(key)
+        if future is not None:
+            self.saved += 1
+        else:
+            future = asyncio.ensure_future(func(*args))
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._done(key, f))
+        # one caller giving up must not cancel the call for the others
+        return await asyncio.shield(future)
+
+    def _done(self, key: Hashable, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()  # retrieved even if every caller was cancelled
@@ -37,10 +37,8 @@ class Asset:
                 self.tag = "ton" if tag is None else tag
             else:
                 _type = AssetType.JETTON
-                if decimals is not None:
-                    self.decimals = decimals
-                if tag is not None:
-                    self.tag = tag
+                self.decimals = decimals
+                self.tag = tag
         else:
             raise ValueError("Address is required for JETTON asset")
 
@@ -49,8 +47,6 @@ class Asset:
             if address is not None
             else TonSdkAddress(TON_ZERO_ADDRESS)
         )
-        self.decimals = decimals
-        self.tag = tag
         self.type = _type
         # self.cell: TonSdkCell | None = None
         self.cell = None
@@ -64,17 +60,149 @@ class Asset:
         elif self.type == AssetType.JETTON:
             asset_jetton_cell = TonSdkCell()
             asset_jetton_cell.bits.write_uint(1, 4)  # Asset type is jetton
-            asset_jetton_cell.bits.write_uint(self.address.wc, 8)
+            asset_jetton_cell.bits.write_int(self.address.wc, 8)
             asset_jetton_cell.bits.write_bytes(self.address.hash_part)
             self.cell = asset_jetton_cell
 
 
+class Amount:
+    # raw integer units of an asset, Decimal only at the edges; amounts of
+    # different decimals never compare or add, rescale with to_nano first
+    __slots__ = ("nano", "decimals")
+
+    def __init__(self, nano: int, decimals: int | None = 9):
+        self.nano = int(nano)
+        # None for jettons read from chain without their metadata
+        self.decimals = decimals
+
+    @classmethod
+    def from_decimal(cls, value: Decimal | str | int, decimals: int = 9) -> "Amount":
+        # human readable value, truncated to the smallest unit
+        return cls(int(Decimal(value).scaleb(decimals)), decimals)
+
+    def _decimals(self) -> int:
+        if self.decimals is None:
+            raise ValueError("decimals of the amount unknown, rescale it first")
+        return self.decimals
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.nano).scaleb(-self._decimals())
+
+    def to_nano(self, decimals: int = 9) -> int:
+        # the same value in units of decimals, rounded down
+        shift = decimals - self._decimals()
+        if shift >= 0:
+            return self.nano * 10**shift
+        return self.nano // 10**-shift
+
+    def _units(self, other: "Amount | int") -> int:
+        if isinstance(other, Amount):
+            if other.decimals != self.decimals:
+                raise ValueError(
+                    "amounts of %s and %s decimals" % (self.decimals, other.decimals)
+                )
+            return other.nano
+        if isinstance(other, int):
+            return other
+        return NotImplemented
+
+    def _amount_units(self, other: "Amount") -> int:
+        # comparisons take amounts only, a bare int has no decimals
+        if not isinstance(other, Amount):
+            return NotImplemented
+        return self._units(other)
+
+    def __int__(self) -> int:
+        return self.nano
+
+    __index__ = __int__
+
+    def __add__(self, other: "Amount | int") -> "Amount":
+        units = self._units(other)
+        if units is NotImplemented:
+            return units
+        return Amount(self.nano + units, self.decimals)
+
+    __radd__ = __add__
+
+    def __sub__(self, other: "Amount | int") -> "Amount":
+        units = self._units(other)
+        if units is NotImplemented:
+            return units
+        return Amount(self.nano - units, self.decimals)
+
+    def __rsub__(self, other: int) -> "Amount":
+        units = self._units(other)
+        if units is NotImplemented:
+            return units
+        return Amount(units - self.nano, self.decimals)
+
+    def __mul__(self, other: int) -> "Amount":
+        if not isinstance(other, int):
+            return NotImplemented
+        return Amount(self.nano * other, self.decimals)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Amount):
+            return self.nano == other.nano and self.decimals == other.decimals
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.nano, self.decimals))
+
+    def __lt__(self, other: "Amount") -> bool:
+        units = self._amount_units(other)
+        if units is NotImplemented:
+            return units
+        return self.nano < units
+
+    def __le__(self, other: "Amount") -> bool:
+        units = self._amount_units(other)
+        if units is NotImplemented:
+            return units
+        return self.nano <= units
+
+    def __gt__(self, other: "Amount") -> bool:
+        units = self._amount_units(other)
+        if units is NotImplemented:
+            return units
+        return self.nano > units
+
+    def __ge__(self, other: "Amount") -> bool:
+        units = self._amount_units(other)
+        if units is NotImplemented:
+            return units
+        return self.nano >= units
+
+    def __bool__(self) -> bool:
+        return self.nano != 0
+
+    def __repr__(self) -> str:
+        return f"Amount({self.nano}, decimals={self.decimals})"
+
+
 class Reserve:
-    def __init__(self, asset: Asset, reserve: Decimal):
+    def __init__(self, asset: Asset, reserve: int | Decimal | Amount):
         self.asset = asset
-        self.reserve = reserve
+        # raw units of the asset as int, Decimal reserves are still accepted
+        self.reserve = int(reserve)
+
+    @property
+    def amount(self) -> Amount:
+        return Amount(self.reserve, self.asset.decimals)
 
-    def reserve_nano(self, decimals: int | None = None) -> Decimal:
-        if decimals is not None:
+    def reserve_nano(self, decimals: int | None = None) -> int | Decimal:
+        # int unless the asset has more than 9 decimals
+        if decimals is None:
+            decimals = self.asset.decimals
+        if decimals is None:
+            # jettons read from chain carry no decimals
+            raise ValueError(
+                "decimals of %s unknown, pass decimals"
+                % self.asset.address.to_string(True, True, True)
+            )
+        if decimals <= 9:
             return self.reserve * 10 ** (9 - decimals)
-        return self.reserve * 10 ** (9 - self.asset.decimals)
+        return Decimal(self.reserve).scaleb(9 - decimals)
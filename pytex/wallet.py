@@ -1,14 +1,48 @@
+import secrets
+import time
 from typing import Any
 
 from tonsdk.boc import Cell
 from tonsdk.contract import Contract
 from tonsdk.contract.wallet import WalletV4ContractR2, SendModeEnum
+from tonsdk.utils import sign_message
+
+HIGHLOAD_WALLET_V3_CODE = (
+    "b5ee9c7241021001000228000114ff00f4a413f4bcf2c80b01020120020d02014803040078d0"
+    "20d74bc00101c060b0915be101d0d3030171b0915be0fa4030f828c705b39130e0d31f018210"
+    "ae42e5a4ba9d8040d721d74cf82a01ed55fb04e030020120050a02027306070011adce76a268"
+    "6b85ffc00201200809001aabb6ed44d0810122d721d70b3f0018aa3bed44d08307d721d70b1f"
+    "0201200b0c001bb9a6eed44d0810162d721d70b15800e5b8bf2eda2edfb21ab09028409b0ed4"
+    "4d0810120d721f404f404d33fd315d1058e1bf82325a15210b99f326df82305aa0015a112b99"
+    "2306dde923033e2923033e25230800df40f6fa19ed021d721d70a00955f037fdb31e09130e25"
+    "9800df40f6fa19cd001d721d70a00937fdb31e0915be270801f6f2d48308d718d121f900ed44"
+    "d0d3ffd31ff404f404d33fd315d1f82321a15220b98e12336df82324aa00a112b9926d32de58"
+    "f82301de541675f910f2a106d0d31fd4d307d30cd309d33fd315d15168baf2a2515abaf2a6f8"
+    "232aa15250bcf2a304f823bbf2a35304800df40f6fa199d024d721d70a00f2649130e20e01fe"
+    "5309800df40f6fa18e13d05004d718d20001f264c858cf16cf8301cf168e1030c824cf40cf83"
+    "84095005a1a514cf40e2f800c94039800df41704c8cbff13cb1ff40012f40012cb3f12cb15c9"
+    "ed54f80f21d0d30001f265d3020171b0925f03e0fa4001d70b01c000f2a5fa4031fa0031f401"
+    "fa0031fa00318060d721d300010f0020f265d2000193d431d19130e272b1fb00b585bf03"
+)
 
 
 class ContractMulti(Contract):
+    # out messages of one external message
+    MAX_MESSAGES = 1
+
     def __init__(self, **kwargs: Any):
         super().__init__(**kwargs)
 
+    @classmethod
+    def pack_messages(
+        cls, messages: list[dict[str, Any]]
+    ) -> list[list[dict[str, Any]]]:
+        # fewest create_transfer_messages batches for the messages
+        return [
+            messages[i : i + cls.MAX_MESSAGES]
+            for i in range(0, len(messages), cls.MAX_MESSAGES)
+        ]
+
     @classmethod
     def create_out_msg(
         cls,
@@ -35,6 +69,8 @@ class ContractMulti(Contract):
 
 class WalletContractMulti(WalletV4ContractR2, ContractMulti):
     DEFAULT_SEND_MODE = SendModeEnum.ignore_errors | SendModeEnum.pay_gas_separately
+    # out messages of one external message
+    MAX_MESSAGES = 4
 
     def __init__(self, **kwargs: Any):
         super().__init__(**kwargs)
@@ -72,8 +108,8 @@ class WalletContractMulti(WalletV4ContractR2, ContractMulti):
     ):
         if seqno < 0:
             raise ValueError("seqno must be integer >= 0")
-        if not (1 <= len(messages) <= 4):
-            raise ValueError("expected 1-4 messages")
+        if not (1 <= len(messages) <= self.MAX_MESSAGES):
+            raise ValueError(f"expected 1-{self.MAX_MESSAGES} messages")
         signing_message = self.create_signing_message(seqno)
         for msg in messages:
             send_mode = msg.get("send_mode", send_mode)
@@ -87,3 +123,206 @@ class WalletContractMulti(WalletV4ContractR2, ContractMulti):
                 )
             )
         return self.create_external_message(signing_message, seqno, dummy_signature)
+
+
+class HighloadQueryId:
+    # 13 bit shift and 10 bit bit number; the wallet rejects an id seen within
+    # its timeout, ids are free again after two timeouts
+    MAX_SHIFT = (1 << 13) - 1
+    MAX_BIT_NUMBER = 1022
+
+    def __init__(self, shift: int = 0, bit_number: int = 0):
+        if not 0 <= shift <= self.MAX_SHIFT:
+            raise ValueError(f"shift must be 0-{self.MAX_SHIFT}")
+        if not 0 <= bit_number <= self.MAX_BIT_NUMBER:
+            raise ValueError(f"bit_number must be 0-{self.MAX_BIT_NUMBER}")
+        self.shift = shift
+        self.bit_number = bit_number
+
+    @classmethod
+    def from_query_id(cls, query_id: int) -> "HighloadQueryId":
+        return cls(query_id >> 10, query_id & 1023)
+
+    @property
+    def query_id(self) -> int:
+        return self.shift << 10 | self.bit_number
+
+    def next(self) -> "HighloadQueryId":
+        if self.bit_number < self.MAX_BIT_NUMBER:
+            return HighloadQueryId(self.shift, self.bit_number + 1)
+        return HighloadQueryId((self.shift + 1) % (self.MAX_SHIFT + 1), 0)
+
+    def __repr__(self) -> str:
+        return f"HighloadQueryId({self.shift}, {self.bit_number})"
+
+
+class HighloadWalletV3(ContractMulti):
+    DEFAULT_SEND_MODE = SendModeEnum.ignore_errors | SendModeEnum.pay_gas_separately
+    # the contract takes 254 out actions, but they chain one cell deep each
+    # and tonsdk copies and walks cells recursively: to_boc hits the
+    # recursion limit from about 160 messages, 100 leaves the caller's stack
+    # a margin
+    MAX_MESSAGES = 100
+    DEFAULT_SUBWALLET_ID = 0x10AD
+    DEFAULT_TIMEOUT = 60 * 60
+    # created_at is taken this far in the past, validator clocks may lag ours
+    CREATED_AT_LAG = 30
+    INTERNAL_TRANSFER_OP = 0xAE42E5A4
+    ACTION_SEND_MSG_TAG = 0x0EC3C86D
+
+    def __init__(self, **kwargs: Any):
+        # subwallet_id and timeout are part of the address; query_id is the
+        # first id to send with
+        kwargs.setdefault("subwallet_id", self.DEFAULT_SUBWALLET_ID)
+        kwargs.setdefault("timeout", self.DEFAULT_TIMEOUT)
+        if not self.CREATED_AT_LAG < kwargs["timeout"] < 1 << 22:
+            raise ValueError(
+                f"timeout must be {self.CREATED_AT_LAG + 1}-{(1 << 22) - 1}"
+            )
+        kwargs["code"] = Cell.one_from_boc(HIGHLOAD_WALLET_V3_CODE)
+        super().__init__(**kwargs)
+        # a random start keeps a restarted process off the ids it sent
+        # within the timeout
+        query_id = kwargs.get("query_id")
+        if query_id is None:
+            query_id = HighloadQueryId(secrets.randbelow(HighloadQueryId.MAX_SHIFT + 1))
+        self.query_id: HighloadQueryId = query_id
+
+    def create_data_cell(self) -> Cell:
+        cell = Cell()
+        cell.bits.write_bytes(self.options["public_key"])
+        cell.bits.write_uint(self.options["subwallet_id"], 32)
+        # old_queries and queries, empty dicts
+        cell.bits.write_bit(0)
+        cell.bits.write_bit(0)
+        # last_clean_time
+        cell.bits.write_uint(0, 64)
+        cell.bits.write_uint(self.options["timeout"], 22)
+        return cell
+
+    def allocate_query_id(self) -> HighloadQueryId:
+        query_id = self.query_id
+        self.query_id = query_id.next()
+        return query_id
+
+    def create_transfer_message(
+        self,
+        to_addr: str,
+        amount: int,
+        payload: Cell | str | bytes | None = None,
+        send_mode: int = DEFAULT_SEND_MODE,
+        dummy_signature: bool = False,
+        state_init: Cell | None = None,
+    ):
+        return self.create_transfer_messages(
+            messages=[
+                {
+                    "to_address": to_addr,
+                    "amount": amount,
+                    "payload": payload,
+                    "state_init": state_init,
+                }
+            ],
+            send_mode=send_mode,
+            dummy_signature=dummy_signature,
+        )
+
+    def create_transfer_messages(
+        self,
+        messages: list[dict[str, Any]],
+        send_mode: int = DEFAULT_SEND_MODE,
+        dummy_signature: bool = False,
+        query_id: HighloadQueryId | None = None,
+        created_at: int | None = None,
+        deploy: bool = False,
+    ):
+        # no seqno, externals with distinct query ids may be in flight at
+        # once; more than one message goes out through an internal transfer
+        if not (1 <= len(messages) <= self.MAX_MESSAGES):
+            raise ValueError(f"expected 1-{self.MAX_MESSAGES} messages")
+        if query_id is None:
+            query_id = self.allocate_query_id()
+        if created_at is None:
+            created_at = int(time.time()) - self.CREATED_AT_LAG
+
+        if len(messages) == 1:
+            message_to_send = self.create_message_cell(messages[0])
+            mode = messages[0].get("send_mode", send_mode)
+        else:
+            message_to_send = self.create_internal_transfer(
+                messages, send_mode, query_id.query_id
+            )
+            mode = SendModeEnum.carry_all_remaining_balance.value
+
+        signing_message = Cell()
+        signing_message.bits.write_uint(self.options["subwallet_id"], 32)
+        signing_message.refs.append(message_to_send)
+        signing_message.bits.write_uint8(mode)
+        signing_message.bits.write_uint(query_id.query_id, 23)
+        signing_message.bits.write_uint(created_at, 64)
+        signing_message.bits.write_uint(self.options["timeout"], 22)
+
+        signature = (
+            bytes(64)
+            if dummy_signature
+            else sign_message(
+                bytes(signing_message.bytes_hash()), self.options["private_key"]
+            ).signature
+        )
+        body = Cell()
+        body.bits.write_bytes(signature)
+        body.refs.append(signing_message)
+
+        state_init = self.create_state_init()["state_init"] if deploy else None
+        header = Contract.create_external_message_header(self.address)
+        return {
+            "address": self.address,
+            "message": Contract.create_common_msg_info(header, state_init, body),
+            "body": body,
+            "signature": signature,
+            "signing_message": signing_message,
+            "query_id": query_id,
+            "created_at": created_at,
+            "state_init": state_init,
+        }
+
+    def create_init_external_message(self):
+        # the wallet takes signed externals only, it deploys with an empty
+        # message to itself
+        return self.create_transfer_messages(
+            messages=[
+                {
+                    "to_address": self.address.to_string(True, True, False),
+                    "amount": 0,
+                }
+            ],
+            deploy=True,
+        )
+
+    def create_message_cell(self, msg: dict[str, Any]) -> Cell:
+        return self.create_out_msg(
+            msg["to_address"],
+            msg["amount"],
+            msg.get("payload"),
+            msg.get("state_init"),
+        )
+
+    def create_internal_transfer(
+        self, messages: list[dict[str, Any]], send_mode: int, query_id: int
+    ) -> Cell:
+        # a message to itself carrying the out action list, which the wallet
+        # installs as the actions of that transaction
+        actions = Cell()
+        for msg in messages:
+            action = Cell()
+            action.refs.append(actions)
+            action.bits.write_uint(self.ACTION_SEND_MSG_TAG, 32)
+            action.bits.write_uint8(msg.get("send_mode", send_mode))
+            action.refs.append(self.create_message_cell(msg))
+            actions = action
+
+        payload = Cell()
+        payload.bits.write_uint(self.INTERNAL_TRANSFER_OP, 32)
+        payload.bits.write_uint(query_id, 64)
+        payload.refs.append(actions)
+        return self.create_out_msg(self.address.to_string(True, True, True), 0, payload)
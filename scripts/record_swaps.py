@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+
+from tonsdk.boc import Cell as TonSdkCell
+from tonsdk.utils import Address as TonSdkAddress, bytes_to_b64str
+
+from pytex.dex.dedust.op import DedustOperator
+from pytex.dex.dedust.schemas import ESTIMATE_SWAP_OUT
+from pytex.dex.quote import Pool
+from pytex.dex.stonfi.v1.op import StonfiV1Operator
+from pytex.dex.stonfi.v1.schemas import GET_EXPECTED_OUTPUTS as V1_EXPECTED_OUTPUTS
+from pytex.dex.stonfi.v2.op import StonfiV2Operator
+from pytex.dex.stonfi.v2.schemas import GET_EXPECTED_OUTPUTS as V2_EXPECTED_OUTPUTS
+
+# records pool snapshots together with the pool contract's own quote for
+# them, read at one last transaction lt, as fixtures for tests/test_quote.py:
+#
+#   TONCENTER_API_KEY=... python scripts/record_swaps.py dedust <pool> ...
+#
+# an estimate is kept only when the pool had no transaction between the
+# snapshot and the estimate, so both describe the same state
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures" / "recorded_swaps.json"
+
+POOL_PARAMETERS = (
+    "lp_fee",
+    "protocol_fee",
+    "ref_fee",
+    "amp",
+    "trade_fee_numerator",
+    "trade_fee_denominator",
+)
+
+
+def address_slice(address: str) -> list:
+    cell = TonSdkCell()
+    cell.bits.write_address(TonSdkAddress(address))
+    return ["tvm.Slice", bytes_to_b64str(cell.to_boc(False))]
+
+
+def pool_record(dex: str, pool: Pool, lt: int) -> dict:
+    return {
+        "dex": dex,
+        "type": type(pool).__name__,
+        "pool": pool.address,
+        "lt": lt,
+        "assets": list(pool.assets),
+        "reserves": list(pool.reserves),
+        "parameters": {
+            name: getattr(pool, name)
+            for name in POOL_PARAMETERS
+            if getattr(pool, name, None) is not None
+        },
+    }
+
+
+async def estimate_stonfi(operator, pool_address: str, offer_index: int, amount: int):
+    schema = (
+        V1_EXPECTED_OUTPUTS
+        if isinstance(operator, StonfiV1Operator)
+        else V2_EXPECTED_OUTPUTS
+    )
+    state = await operator.get_pool_state(pool_address)
+    token_wallet = (state.token0_wallet_address, state.token1_wallet_address)[
+        offer_index
+    ]
+    outputs = await operator.run_get_method(
+        schema, pool_address, [["num", amount], address_slice(token_wallet)]
+    )
+    return outputs.out, outputs.ref_fee_out
+
+
+async def estimate_dedust(operator, pool_address: str, offer_index: int, amount: int):
+    assets = await operator.get_pool_assets(pool_address)
+    outputs = await operator.run_get_method(
+        ESTIMATE_SWAP_OUT,
+        pool_address,
+        [
+            ["tvm.Slice", bytes_to_b64str(assets[offer_index].cell.to_boc(False))],
+            ["num", amount],
+        ],
+    )
+    return outputs.amount_out, 0
+
+
+async def record_pool(dex: str, operator, pool_address: str, amounts: list[int]):
+    lt = await operator.get_last_transaction_lt(pool_address)
+    if dex == "stonfi_v1":
+        pool = await operator.get_quote_pool(pool_address, referral=True)
+    else:
+        pool = await operator.get_quote_pool(pool_address)
+    estimate = estimate_dedust if dex == "dedust" else estimate_stonfi
+    records = []
+    for offer_index in (0, 1):
+        for amount in amounts:
+            amount_out, ref_fee_out = await estimate(
+                operator, pool_address, offer_index, amount
+            )
+            record = pool_record(dex, pool, lt)
+            if ref_fee_out == 0 and "ref_fee" in record["parameters"]:
+                # the getter quoted without a referral
+                record["parameters"]["ref_fee"] = 0
+            elif ref_fee_out and dex == "stonfi_v2":
+                # v2 takes the referral fee per swap, unknown to the snapshot
+                print(f"{pool_address}: estimate with a referral fee, skipped")
+                continue
+            record.update(offer_index=offer_index, amount_in=amount)
+            record["amount_out"] = amount_out
+            records.append(record)
+    if await operator.get_last_transaction_lt(pool_address) != lt:
+        print(f"{pool_address}: traded while recording, skipped")
+        return []
+    return records
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dex", choices=("stonfi_v1", "stonfi_v2", "dedust"))
+    parser.add_argument("pools", nargs="+")
+    parser.add_argument(
+        "--amounts",
+        default="1000,1000000,1000000000,1000000000000",
+        help="offer amounts in the smallest units, comma separated",
+    )
+    args = parser.parse_args()
+    amounts = [int(amount) for amount in args.amounts.split(",")]
+
+    operator_class = {
+        "stonfi_v1": StonfiV1Operator,
+        "stonfi_v2": StonfiV2Operator,
+        "dedust": DedustOperator,
+    }[args.dex]
+    records = json.loads(FIXTURES.read_text()) if FIXTURES.exists() else []
+    seen = {(r["pool"], r["lt"], r["offer_index"], r["amount_in"]) for r in records}
+    async with operator_class(os.environ.get("TONCENTER_API_KEY", "")) as operator:
+        for pool_address in args.pools:
+            for record in await record_pool(args.dex, operator, pool_address, amounts):
+                key = (
+                    record["pool"],
+                    record["lt"],
+                    record["offer_index"],
+                    record["amount_in"],
+                )
+                if key not in seen:
+                    seen.add(key)
+                    records.append(record)
+    FIXTURES.parent.mkdir(parents=True, exist_ok=True)
+    FIXTURES.write_text(json.dumps(records, indent=1) + "\n")
+    print(f"{len(records)} records in {FIXTURES}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+import asyncio
+
+from pytex.dex.arbitrage import ArbitrageDetector
+from pytex.dex.quote import StonfiPool
+from pytex.dex.routing import PoolGraph, pool_key
+
+TON = "0:" + "00" * 32
+B = "0:" + "11" * 32
+C = "0:" + "22" * 32
+
+
+class Venue:
+    def __init__(self, multi_swap: bool):
+        self.MULTI_SWAP = multi_swap
+
+
+def pool(n: int, assets: tuple[str, str], reserves: tuple[int, int]) -> StonfiPool:
+    return StonfiPool("0:%064x" % n, assets, reserves, lp_fee=20, protocol_fee=10)
+
+
+def triangle(first: int) -> list[StonfiPool]:
+    # TON -> B -> C -> TON pays about 1.5x before fees
+    return [
+        pool(first, (TON, B), (10**12, 10**12)),
+        pool(first + 1, (B, C), (10**12, 10**12)),
+        pool(first + 2, (C, TON), (10**12, 3 * 10**12 // 2)),
+    ]
+
+
+def track(graph: PoolGraph, venue, pools: list[StonfiPool]):
+    for item in pools:
+        graph.update(item)
+        graph.sources[pool_key(item.address)] = (venue, item.address)
+
+
+def test_finds_a_profitable_cycle():
+    graph = PoolGraph()
+    venue = Venue(multi_swap=True)
+    track(graph, venue, triangle(1))
+    opportunities = ArbitrageDetector(graph, TON).rebuild()
+    assert opportunities and opportunities[0].operator is venue
+    assert opportunities[0].profit > 0
+
+
+def test_skips_venues_without_multi_swaps():
+    graph = PoolGraph()
+    track(graph, Venue(multi_swap=False), triangle(1))
+    detector = ArbitrageDetector(graph, TON)
+    assert detector.rebuild() == []
+    assert detector.cycles == set()
+    assert detector.indexed == set(graph.pools)
+
+
+class TrackedVenue(Venue):
+    def __init__(self, pools: list[StonfiPool]):
+        super().__init__(multi_swap=True)
+        self.pools = {item.address: item for item in pools}
+
+    async def get_quote_pool(self, pool_address: str, max_staleness=None):
+        return self.pools[pool_address]
+
+
+def test_indexes_pools_tracked_later():
+    pools = triangle(1)
+    venue = TrackedVenue(pools)
+    graph = PoolGraph()
+    detector = ArbitrageDetector(graph, TON)
+    assert detector.rebuild() == []
+
+    added = asyncio.run(graph.track(venue, list(venue.pools)))
+    assert added == [item.address for item in pools]
+    # nothing changed on refresh, the new pools are still indexed
+    opportunities = asyncio.run(detector.refresh())
+    assert opportunities and opportunities[0].operator is venue
+    assert detector.indexed == set(graph.pools)
+
+
+def test_track_through_the_detector():
+    venue = TrackedVenue(triangle(1))
+    detector = ArbitrageDetector(PoolGraph(), TON)
+    opportunities = asyncio.run(detector.track(venue, list(venue.pools)))
+    assert opportunities and opportunities[0].profit > 0
+
+
+def test_forgets_pools_removed_from_the_graph():
+    graph = PoolGraph()
+    pools = triangle(1)
+    track(graph, Venue(multi_swap=True), pools)
+    detector = ArbitrageDetector(graph, TON)
+    assert detector.rebuild()
+    graph.remove(pools[1].address)
+    assert detector.update([]) == []
+    assert detector.cycles == set() and detector.indexed == set(graph.pools)
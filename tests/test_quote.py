@@ -0,0 +1,202 @@
+import json
+import random
+from fractions import Fraction
+from math import ceil, floor
+from pathlib import Path
+
+import pytest
+
+from pytex.dex import quote as quote_module
+from pytex.dex.quote import (
+    DedustStablePool,
+    DedustVolatilePool,
+    StonfiPool,
+    StonfiStablePool,
+    solidly_k,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# recorded by scripts/record_swaps.py: pool snapshots with the pool
+# contract's own quote for them, read at one last transaction lt
+RECORDED_SWAPS = json.loads((FIXTURES / "recorded_swaps.json").read_text())
+
+CONSTANT_PRODUCT = ("StonfiPool", "DedustVolatilePool")
+STABLE = ("StonfiStablePool", "DedustStablePool")
+
+A = "0:" + "00" * 32
+B = "0:" + "11" * 32
+
+
+def pool_from_record(record: dict):
+    pool_class = getattr(quote_module, record["type"])
+    return pool_class(
+        record["pool"],
+        tuple(record["assets"]),
+        tuple(record["reserves"]),
+        **record["parameters"],
+    )
+
+
+def record_id(record: dict) -> str:
+    return "%s-%s-%s-%s" % (
+        record["dex"],
+        record["lt"],
+        record["offer_index"],
+        record["amount_in"],
+    )
+
+
+@pytest.mark.parametrize(
+    "record",
+    [record for record in RECORDED_SWAPS if record["type"] in CONSTANT_PRODUCT],
+    ids=record_id,
+)
+def test_constant_product_matches_recorded(record):
+    pool = pool_from_record(record)
+    assert pool.quote(record["offer_index"], record["amount_in"]).out == (
+        record["amount_out"]
+    )
+
+
+@pytest.mark.parametrize(
+    "record",
+    [record for record in RECORDED_SWAPS if record["type"] in STABLE],
+    ids=record_id,
+)
+def test_stable_matches_recorded(record):
+    pool = pool_from_record(record)
+    assert pool.quote(record["offer_index"], record["amount_in"]).out == (
+        record["amount_out"]
+    )
+
+
+def stonfi_get_amount_out(
+    amount_in, reserve_in, reserve_out, lp_fee, protocol_fee, ref_fee
+):
+    # get_amount_out of the stonfi pool contract, in exact fractions
+    amount_in_with_fee = amount_in * (10000 - lp_fee)
+    base_out = floor(
+        Fraction(amount_in_with_fee * reserve_out)
+        / (reserve_in * 10000 + amount_in_with_fee)
+    )
+    protocol_fee_out = ceil(Fraction(base_out * protocol_fee, 10000))
+    ref_fee_out = ceil(Fraction(base_out * ref_fee, 10000))
+    return base_out - protocol_fee_out - ref_fee_out
+
+
+def dedust_volatile_out(amount_in, reserve_in, reserve_out, numerator, denominator):
+    amount_in -= ceil(Fraction(amount_in * numerator, denominator))
+    return floor(Fraction(amount_in * reserve_out, reserve_in + amount_in))
+
+
+def random_cases(seed: int, count: int = 300):
+    rng = random.Random(seed)
+    for _ in range(count):
+        reserve_in = rng.randint(10**3, 10**18)
+        reserve_out = rng.randint(10**3, 10**18)
+        amount = rng.randint(1, reserve_in * 2)
+        yield reserve_in, reserve_out, amount
+
+
+def test_stonfi_matches_contract_formula():
+    for reserve_in, reserve_out, amount in random_cases(16):
+        for lp_fee, protocol_fee, ref_fee in ((20, 10, 0), (20, 10, 10), (30, 0, 0)):
+            pool = StonfiPool(
+                "p", (A, B), (reserve_in, reserve_out), lp_fee, protocol_fee, ref_fee
+            )
+            assert pool.quote(0, amount).out == stonfi_get_amount_out(
+                amount, reserve_in, reserve_out, lp_fee, protocol_fee, ref_fee
+            )
+
+
+def test_dedust_volatile_matches_contract_formula():
+    for reserve_in, reserve_out, amount in random_cases(17):
+        pool = DedustVolatilePool("p", (B, A), (reserve_out, reserve_in), 25, 10000)
+        assert pool.quote(1, amount).out == dedust_volatile_out(
+            amount, reserve_in, reserve_out, 25, 10000
+        )
+
+
+@pytest.mark.parametrize(
+    "pool",
+    [
+        StonfiPool("p", (A, B), (10**12, 3 * 10**12), 20, 10, 10),
+        DedustVolatilePool("p", (A, B), (10**12, 3 * 10**12), 25, 10000),
+    ],
+    ids=lambda pool: type(pool).__name__,
+)
+def test_amount_in_is_the_smallest_input(pool):
+    for out in (1, 10**3, 10**9, 10**11, 10**12):
+        amount = pool.amount_in(0, out)
+        assert pool.quote(0, amount).out >= out
+        assert pool.quote(0, amount - 1).out < out
+
+
+def test_quote_reports_fees_and_impact():
+    pool = StonfiPool("p", (A, B), (10**12, 10**12), 20, 10)
+    small, large = pool.quote(0, 10**6), pool.quote(0, 10**11)
+    assert small.fee > 0 and large.fee > 0
+    assert 0 < small.price_impact < large.price_impact < 1
+    assert pool.quote(0, 0).out == 0
+
+
+def stableswap_y(x: int, d: int, amp: int) -> Fraction:
+    # exact balance keeping the 2 asset stableswap invariant, by bisection on
+    # ann * (x + y) + d == ann * d + d ** 3 / (4 * x * y), amp = A * n ** (n - 1)
+    ann = amp * 2
+
+    def excess(y: Fraction) -> Fraction:
+        return ann * (x + y) + d - ann * d - Fraction(d**3, 4 * x) / y
+
+    low, high = Fraction(1, 10**6), Fraction(d)
+    for _ in range(200):
+        middle = (low + high) / 2
+        if excess(middle) < 0:
+            low = middle
+        else:
+            high = middle
+    return high
+
+
+def test_stonfi_stable_rounds_in_favor_of_the_pool():
+    rng = random.Random(171)
+    for _ in range(40):
+        reserve_in = rng.randint(10**9, 10**16)
+        reserve_out = reserve_in * rng.randint(50, 200) // 100
+        amp = rng.choice((10, 100, 2000))
+        amount = rng.randint(1, reserve_in)
+        pool = StonfiStablePool("p", (A, B), (reserve_in, reserve_out), 0, 0, amp)
+        d = pool.invariant(reserve_in, reserve_out)
+        exact = reserve_out - stableswap_y(reserve_in + amount, d, amp)
+        out = pool.quote(0, amount).out
+        # never above the exact curve, the contract rounds down and keeps a unit
+        assert floor(exact) - 2 <= out <= floor(exact)
+
+
+def test_dedust_stable_out_is_the_largest_keeping_k():
+    rng = random.Random(172)
+    for _ in range(200):
+        reserve_in = rng.randint(10**6, 10**16)
+        reserve_out = reserve_in * rng.randint(50, 200) // 100
+        amount = rng.randint(1, reserve_in)
+        pool = DedustStablePool("p", (A, B), (reserve_in, reserve_out), 0, 10000)
+        out = pool.quote(0, amount).out
+        k = solidly_k(reserve_in, reserve_out)
+        assert solidly_k(reserve_in + amount, reserve_out - out) >= k
+        assert solidly_k(reserve_in + amount, reserve_out - out - 1) < k
+
+
+@pytest.mark.parametrize(
+    "pool",
+    [
+        StonfiStablePool("p", (A, B), (10**13, 12 * 10**12), 10, 5, 200),
+        DedustStablePool("p", (A, B), (10**13, 12 * 10**12), 5, 10000),
+    ],
+    ids=lambda pool: type(pool).__name__,
+)
+def test_stable_amount_in_is_the_smallest_input(pool):
+    for out in (1, 10**3, 10**9, 10**12):
+        amount = pool.amount_in(0, out)
+        assert pool.quote(0, amount).out >= out
+        assert pool.quote(0, amount - 1).out < out
@@ -0,0 +1,71 @@
+from pytex.dex.quote import StonfiPool
+from pytex.dex.routing import PoolGraph, pool_key
+
+A = "0:" + "00" * 32
+B = "0:" + "11" * 32
+C = "0:" + "22" * 32
+
+
+def pool(n: int, assets: tuple[str, str], reserves: tuple[int, int]) -> StonfiPool:
+    return StonfiPool("0:%064x" % n, assets, reserves, lp_fee=20, protocol_fee=10)
+
+
+def graph_with(venues: dict) -> PoolGraph:
+    # venues maps an operator to its pools
+    graph = PoolGraph()
+    for venue, pools in venues.items():
+        for item in pools:
+            graph.update(item)
+            graph.sources[pool_key(item.address)] = (venue, item.address)
+    return graph
+
+
+def test_best_route_stays_within_one_venue():
+    stonfi, dedust = object(), object()
+    # the best mixed route is A -> B on one venue, B -> C on the other
+    graph = graph_with(
+        {
+            stonfi: [
+                pool(1, (A, B), (10**12, 2 * 10**12)),
+                pool(2, (B, C), (10**12, 10**12)),
+            ],
+            dedust: [
+                pool(3, (A, B), (10**12, 10**12)),
+                pool(4, (B, C), (10**12, 2 * 10**12)),
+            ],
+        }
+    )
+    route = graph.best_route(A, C, 10**9)
+    venues = {graph.venue(pool_key(address)) for address in route.pool_addresses}
+    assert len(venues) == 1
+    for venue in (stonfi, dedust):
+        single = graph.best_route(A, C, 10**9, venue=venue)
+        assert {graph.venue(pool_key(a)) for a in single.pool_addresses} == {venue}
+        assert route.amount_out >= single.amount_out
+
+
+def test_best_route_picks_the_better_venue():
+    stonfi, dedust = object(), object()
+    graph = graph_with(
+        {
+            stonfi: [pool(1, (A, C), (10**12, 10**12))],
+            dedust: [
+                pool(2, (A, B), (10**12, 10**12)),
+                pool(3, (B, C), (10**12, 2 * 10**12)),
+            ],
+        }
+    )
+    route = graph.best_route(A, C, 10**9)
+    assert [pool_key(a) for a in route.pool_addresses] == [
+        "0:%064x" % 2,
+        "0:%064x" % 3,
+    ]
+    assert graph.best_route(A, C, 10**9, venue=stonfi).amount_out < route.amount_out
+
+
+def test_best_route_without_sources():
+    graph = PoolGraph()
+    graph.update(pool(1, (A, B), (10**12, 10**12)))
+    graph.update(pool(2, (B, C), (10**12, 10**12)))
+    route = graph.best_route(A, C, 10**9)
+    assert route is not None and len(route.hops) == 2
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from pytex.dex.quote import StonfiPool
+from pytex.dex.routing import pool_key
+from pytex.dex.split import Allocation, create_split_messages
+from pytex.wallet import HighloadWalletV3, WalletContractMulti
+
+A = "0:" + "00" * 32
+B = "0:" + "11" * 32
+
+
+class FakeProvider:
+    def __init__(self, wallet_address: str, wallet_multi):
+        self.wallet_address = wallet_address
+        self.wallet_multi = wallet_multi
+
+    async def create_swap_message(self, pool_address: str, query_id: int, **kwargs):
+        return {"to_address": pool_address, "query_id": query_id}
+
+
+def allocations(count: int) -> list[Allocation]:
+    return [
+        Allocation(
+            StonfiPool("0:%064x" % n, (A, B), (10**12, 10**12), 20, 10), 0, 10**9, 0
+        )
+        for n in range(1, count + 1)
+    ]
+
+
+def split(items: list[Allocation], providers: list[FakeProvider], **kwargs):
+    venues = {
+        pool_key(allocation.pool.address): provider
+        for allocation, provider in zip(items, providers)
+    }
+    return asyncio.run(
+        create_split_messages(items, venues, "create_swap_message", 7, **kwargs)
+    )
+
+
+def test_packs_for_the_shared_wallet():
+    items = allocations(6)
+    providers = [
+        FakeProvider("wallet", HighloadWalletV3),
+        FakeProvider("wallet", HighloadWalletV3),
+    ] * 3
+    batches = split(items, providers)
+    assert len(batches) == 1
+    assert [message["query_id"] for message in batches[0]] == list(range(7, 13))
+
+
+def test_rejects_providers_of_different_wallets():
+    items = allocations(2)
+    providers = [
+        FakeProvider("highload", HighloadWalletV3),
+        FakeProvider("v4r2", WalletContractMulti),
+    ]
+    with pytest.raises(ValueError, match="different wallets"):
+        split(items, providers)
+    # a given wallet is the caller's choice
+    assert len(split(items, providers, wallet=WalletContractMulti)) == 1
@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+import pytest
+
+from pytex.units import Amount, Asset, AssetType, Reserve
+
+JETTON = "EQCxE6mUtQJKFnGfaROTKOt1lZbDiiX1kCixRv7Nw2Id_sDs"
+
+
+def test_decimal_round_trip():
+    amount = Amount.from_decimal("1.2345678", 6)
+    assert amount.nano == 1234567
+    assert amount.to_decimal() == Decimal("1.234567")
+    assert amount.to_nano(9) == 1234567000
+    assert Amount(1234567999, 9).to_nano(6) == 1234567
+
+
+def test_amounts_of_equal_decimals():
+    one, two = Amount(1, 6), Amount(2, 6)
+    assert one + two == Amount(3, 6)
+    assert two - 1 == one and 3 - two == one
+    assert one < two and two >= one
+    assert int(one * 5) == 5
+    assert len({Amount(1, 6), Amount(1, 6)}) == 1
+
+
+def test_amounts_of_different_decimals():
+    micro, nano = Amount(1000, 6), Amount(10**6, 9)
+    assert micro.to_nano(9) == nano.nano
+    # equal value, still different amounts, as their hashes say
+    assert micro != nano
+    with pytest.raises(ValueError):
+        micro < nano
+    with pytest.raises(ValueError):
+        micro + nano
+
+
+def test_no_int_equality_or_ordering():
+    # an int has no decimals, 1 == Amount(1, 6) == Amount(1, 9) would not be
+    # transitive
+    assert Amount(1, 6) != 1
+    with pytest.raises(TypeError):
+        Amount(1, 6) < 2
+
+
+def test_unknown_decimals():
+    amount = Reserve(Asset(address=JETTON), 10**6).amount
+    assert amount.decimals is None
+    with pytest.raises(ValueError, match="decimals"):
+        amount.to_decimal()
+    with pytest.raises(ValueError, match="decimals"):
+        amount.to_nano()
+
+
+def test_reserve_amount():
+    reserve = Reserve(Asset(AssetType.NATIVE), Amount.from_decimal("1.5"))
+    assert reserve.reserve == 1500000000
+    assert reserve.amount == Amount(1500000000, 9)
+    assert reserve.reserve_nano() == 1500000000
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from tonsdk.boc import Cell
+from tonsdk.crypto import mnemonic_new, mnemonic_to_wallet_key
+
+from pytex.wallet import HighloadWalletV3
+
+PUBLIC_KEY, PRIVATE_KEY = mnemonic_to_wallet_key(mnemonic_new())
+
+
+def highload_wallet() -> HighloadWalletV3:
+    return HighloadWalletV3(public_key=PUBLIC_KEY, private_key=PRIVATE_KEY, wc=0)
+
+
+def jetton_transfer(wallet: HighloadWalletV3) -> dict:
+    # a jetton transfer with a forward payload, as swaps send
+    forward = Cell()
+    forward.bits.write_uint(0xEA06185D, 32)
+    forward.bits.write_uint(0, 64)
+    payload = Cell()
+    payload.bits.write_uint(0xF8A7EA5, 32)
+    payload.bits.write_uint(0, 64)
+    payload.bits.write_coins(10**9)
+    payload.bits.write_address(wallet.address)
+    payload.bits.write_address(wallet.address)
+    payload.bits.write_bit(0)
+    payload.bits.write_coins(10**8)
+    payload.bits.write_bit(1)
+    payload.refs.append(forward)
+    return {
+        "to_address": wallet.address.to_string(True, True, True),
+        "amount": 3 * 10**8,
+        "payload": payload,
+    }
+
+
+def full_batch() -> Cell:
+    wallet = highload_wallet()
+    messages = [jetton_transfer(wallet)] * HighloadWalletV3.MAX_MESSAGES
+    return wallet.create_transfer_messages(messages)["message"]
+
+
+def test_full_batch_serializes():
+    boc = full_batch().to_boc(False)
+    assert boc[:4] == Cell.REACH_BOC_MAGIC_PREFIX
+
+
+def test_full_batch_serializes_in_a_task():
+    # providers send from tasks, with the event loop's frames on the stack
+    async def send() -> bytes:
+        return full_batch().to_boc(False)
+
+    async def main() -> bytes:
+        return await asyncio.create_task(send())
+
+    assert asyncio.run(main())[:4] == Cell.REACH_BOC_MAGIC_PREFIX
+
+
+def test_rejects_more_than_max_messages():
+    wallet = highload_wallet()
+    messages = [jetton_transfer(wallet)] * (HighloadWalletV3.MAX_MESSAGES + 1)
+    with pytest.raises(ValueError):
+        wallet.create_transfer_messages(messages)